@@ -34,6 +34,7 @@ bl_info = {
     "category"    : "Render"
 }
 
+from vb30 import debug
 from vb30 import plugins
 from vb30 import preset
 from vb30 import operators
@@ -48,22 +49,22 @@ from vb30 import utils
 
 
 def register():
-    engine.init()
+    debug.ClearStartupTimings()
 
-    plugins.register()
-    operators.register()
-    ui.register()
-    nodes.register()
-    proxy.register()
-    keymap.register()
-    events.register()
-    preset.register()
-    utils.register()
-    compat.register()
+    with debug.StartupPhase("engine.init"):
+        engine.init()
+
+    for module in (plugins, operators, ui, nodes, proxy, keymap, events, preset, utils, compat):
+        with debug.StartupPhase("%s.register" % module.__name__.split('.')[-1]):
+            module.register()
 
     # NOTE: Register engine at the end,
     # to be sure all used data is registered.
-    engine.register()
+    with debug.StartupPhase("engine.register"):
+        engine.register()
+
+    if debug.IsStartupReport():
+        debug.PrintStartupReport()
 
 
 def unregister():
@@ -0,0 +1,977 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+# Benchmarks for the Python side of the exporter.
+#
+# Could be run with plain Python (minimal stand-ins for "bpy", "mathutils"
+# and "_vray_for_blender" are used then):
+#
+#   python benchmark.py --plugins 100000 --frames 1000
+#
+# or inside Blender using real modules:
+#
+#   blender -b -P benchmark.py -- --plugins 100000
+#
+# No V-Ray binary is needed, data is written into a temporary directory.
+#
+
+import argparse
+import importlib.util
+import json
+import os
+import pathlib
+import random
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+
+ExporterDir = os.path.dirname(os.path.abspath(__file__))
+
+
+ ######  ########    ###    ##    ## ########          #### ##    ##  ######
+##    ##    ##      ## ##   ###   ## ##     ##          ##  ###   ## ##    ##
+##          ##     ##   ##  ####  ## ##     ##          ##  ####  ## ##
+ ######     ##    ##     ## ## ## ## ##     ## #######  ##  ## ## ##  ######
+      ##    ##    ######### ##  #### ##     ##          ##  ##  ####       ##
+##    ##    ##    ##     ## ##   ### ##     ##          ##  ##   ### ##    ##
+ ######     ##    ##     ## ##    ## ########          #### ##    ##  ######
+
+class StandInVector(tuple):
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return tuple.__new__(cls, values)
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+
+class StandInColor(tuple):
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return tuple.__new__(cls, values)
+
+    r = property(lambda self: self[0])
+    g = property(lambda self: self[1])
+    b = property(lambda self: self[2])
+
+
+class StandInMatrix(list):
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+        list.__init__(self, [list(row) for row in rows])
+
+    @property
+    def col(self):
+        return [[row[c] for row in self] for c in range(len(self[0]))]
+
+    def copy(self):
+        return StandInMatrix(self)
+
+
+def StandInTransformHex(tm):
+    data = struct.pack("fffffffffddd",
+        tm[0][0], tm[1][0], tm[2][0],
+        tm[0][1], tm[1][1], tm[2][1],
+        tm[0][2], tm[1][2], tm[2][2],
+        tm[0][3], tm[1][3], tm[2][3])
+    return 'TransformHex("%s")' % data.hex().upper()
+
+
+def Namespace(**kwargs):
+    return types.SimpleNamespace(**kwargs)
+
+
+def InstallStandIns():
+    bpy = types.ModuleType('bpy')
+
+    class BlendData:
+        pass
+
+    class PropsStandIn:
+        def __getattr__(self, name):
+            return lambda **kwargs: (name, kwargs)
+
+    bpy.types = Namespace(BlendData=BlendData)
+    bpy.props = PropsStandIn()
+    bpy.data  = Namespace(filepath="", objects={}, groups={})
+    bpy.path  = Namespace(abspath=lambda filepath, library=None: filepath[2:] if filepath.startswith("//") else filepath)
+    bpy.context = Namespace(
+        scene = Namespace(
+            name   = "Scene",
+            camera = None,
+            render = Namespace(engine='VRAY_RENDER'),
+            vray   = Namespace(Exporter=Namespace(debug=False)),
+        ),
+    )
+
+    mathutils = types.ModuleType('mathutils')
+    mathutils.Vector = StandInVector
+    mathutils.Color  = StandInColor
+    mathutils.Matrix = StandInMatrix
+
+    vray = types.ModuleType('_vray_for_blender')
+    vray.getTransformHex = StandInTransformHex
+
+    sys.modules['bpy'] = bpy
+    sys.modules['mathutils'] = mathutils
+    sys.modules['_vray_for_blender'] = vray
+
+
+# Makes "vb30" package importable without running add-on registration code
+#
+def LoadExporterPackage():
+    if 'vb30' in sys.modules:
+        return
+    spec = importlib.util.spec_from_loader('vb30', loader=None, is_package=True)
+    vb30 = importlib.util.module_from_spec(spec)
+    vb30.__path__ = [ExporterDir]
+    sys.modules['vb30'] = vb30
+
+
+def Setup():
+    try:
+        import bpy
+    except ImportError:
+        InstallStandIns()
+    LoadExporterPackage()
+
+
+########     ###    ########    ###
+##     ##   ## ##      ##      ## ##
+##     ##  ##   ##     ##     ##   ##
+##     ## ##     ##    ##    ##     ##
+##     ## #########    ##    #########
+##     ## ##     ##    ##    ##     ##
+########  ##     ##    ##    ##     ##
+
+def GetRandomValue(rnd, valueType):
+    import mathutils
+
+    if valueType == 'BOOL':
+        return rnd.random() > 0.5
+    elif valueType == 'INT':
+        return rnd.randint(0, 1000)
+    elif valueType == 'FLOAT':
+        return rnd.random() * 100.0
+    elif valueType == 'COLOR':
+        return mathutils.Color((rnd.random(), rnd.random(), rnd.random()))
+    elif valueType == 'VECTOR':
+        return mathutils.Vector((rnd.random(), rnd.random(), rnd.random()))
+    elif valueType == 'TRANSFORM':
+        m = mathutils.Matrix()
+        for c in range(3):
+            m[c][3] = rnd.random()
+        return m
+    return '"%s"' % GetRandomName(rnd)
+
+
+def GetRandomName(rnd, length=16):
+    chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .-+|@#"
+    return "".join(rnd.choice(chars) for i in range(length))
+
+
+ValueTypes = ('BOOL', 'INT', 'FLOAT', 'COLOR', 'VECTOR', 'STRING')
+
+
+# Synthetic plugin module and its property group
+#
+def GetPluginModule(numParams=16):
+    pluginParams = []
+    for i in range(numParams):
+        attrType = ValueTypes[i % len(ValueTypes)]
+        pluginParams.append({
+            'attr'    : "param_%.2i" % i,
+            'type'    : attrType,
+            'default' : None,
+        })
+    return Namespace(ID='BenchmarkPlugin', TYPE='TEXTURE', PluginParams=pluginParams)
+
+
+def GetPropGroup(rnd, pluginModule):
+    values = {}
+    for attrDesc in pluginModule.PluginParams:
+        values[attrDesc['attr']] = GetRandomValue(rnd, attrDesc['type'])
+    return Namespace(**values)
+
+
+def GetPluginStream(rnd, numPlugins, numAttrs=8):
+    for i in range(numPlugins):
+        attrs = {}
+        for a in range(numAttrs):
+            attrs["attr_%.2i" % a] = GetRandomValue(rnd, ValueTypes[a % len(ValueTypes)])
+        yield 'TEXTURE', 'TexBenchmark', "TexBenchmark%i" % i, attrs
+
+
+def GetBus(o):
+    scene = Namespace(vray=Namespace(VRayDR=Namespace(on=False)))
+    return {
+        'scene'  : scene,
+        'output' : o,
+    }
+
+
+# Attribute types of the synthetic plugin descriptions;
+# covers every branch of the plugin parameters export
+#
+SchemaValueTypes = ('BOOL', 'INT', 'FLOAT', 'ENUM', 'COLOR', 'ACOLOR', 'STRING')
+
+
+def GetSchemaTypes():
+    from vb30.lib import AttributeUtils
+
+    return sorted(set(SchemaValueTypes) |
+                  AttributeUtils.PluginTypes |
+                  AttributeUtils.SkippedTypes |
+                  AttributeUtils.InputTypes |
+                  AttributeUtils.OutputTypes)
+
+
+def GetSchemaParamDesc(rnd, attrName, attrType):
+    attrDesc = {
+        'attr' : attrName,
+        'type' : attrType,
+    }
+    if attrType == 'STRING':
+        attrDesc['subtype'] = rnd.choice(('NONE', 'FILE_PATH', 'DIR_PATH'))
+    if rnd.random() < 0.1:
+        attrDesc['skip'] = True
+    if rnd.random() < 0.1:
+        attrDesc['options'] = 'EXPORT_AS_IS'
+    return attrDesc
+
+
+def GetSyntheticPluginModules(rnd, numPlugins=200, numParams=32):
+    schemaTypes = GetSchemaTypes()
+
+    pluginModules = []
+    for i in range(numPlugins):
+        pluginParams = []
+        for a in range(numParams):
+            attrType = schemaTypes[(i + a) % len(schemaTypes)]
+            pluginParams.append(GetSchemaParamDesc(rnd, "param_%.2i" % a, attrType))
+        pluginModules.append(Namespace(ID="SchemaPlugin%i" % i, TYPE='TEXTURE', PluginParams=pluginParams))
+    return pluginModules
+
+
+# Registered plugin modules: PLUGINS_ID when running inside Blender,
+# otherwise modules built from the plugin descriptions (the same JSON
+# PLUGINS_ID modules get their PluginParams from).
+# Synthetic modules are used if descriptions are not available.
+#
+def GetSchemaPluginModules(rnd):
+    from vb30.lib import PluginUtils
+
+    # Add-on is registered
+    if 'vb30.plugins' in sys.modules:
+        PLUGINS_ID = sys.modules['vb30.plugins'].PLUGINS_ID
+        pluginModules = [m for m in PLUGINS_ID.values() if hasattr(m, 'PluginParams')]
+        if pluginModules:
+            return sorted(pluginModules, key=lambda m: m.ID), 'PLUGINS_ID'
+
+    pluginModules = []
+    for filePath in sorted(pathlib.Path(ExporterDir, "plugins_desc").glob("*/*.json")):
+        pluginID, pluginDesc = PluginUtils.ReadPluginDesc(filePath)
+        if pluginDesc['PluginParams'] is not None:
+            pluginModules.append(Namespace(ID=pluginID, TYPE=pluginDesc['TYPE'], PluginParams=pluginDesc['PluginParams']))
+    if pluginModules:
+        return pluginModules, 'plugins_desc'
+
+    return GetSyntheticPluginModules(rnd), 'synthetic'
+
+
+def GetSchemaValue(rnd, attrDesc, tmpDir):
+    import mathutils
+
+    attrType = attrDesc['type']
+
+    if attrType == 'BOOL':
+        return rnd.random() > 0.5
+    elif attrType == 'INT':
+        return rnd.randint(0, 1000)
+    elif attrType in {'FLOAT', 'FLOAT_TEXTURE'}:
+        return rnd.random() * 100.0
+    elif attrType == 'ENUM':
+        return str(rnd.randint(0, 3))
+    elif attrType in {'COLOR', 'ACOLOR', 'TEXTURE'}:
+        return mathutils.Color((rnd.random(), rnd.random(), rnd.random()))
+    elif attrType == 'VECTOR':
+        return rnd.choice((mathutils.Vector((rnd.random(), 0.0, 1.0)), ""))
+    elif attrType in {'TRANSFORM', 'MATRIX'}:
+        return rnd.choice(("", "TransformHex(\"00\")"))
+    elif attrType == 'STRING':
+        if rnd.random() < 0.2:
+            return ""
+        subtype = attrDesc.get('subtype')
+        if subtype == 'FILE_PATH':
+            return os.path.join(tmpDir, "assets", "%s.png" % GetRandomName(rnd, 8).replace(" ", "_"))
+        elif subtype == 'DIR_PATH':
+            return os.path.join(tmpDir, "cache")
+        return GetRandomName(rnd, 12)
+    elif attrType in {'BRDF', 'MATERIAL', 'PLUGIN', 'UVWGEN', 'GEOMETRY'}:
+        return rnd.choice(("", "Plugin%i" % rnd.randint(0, 100)))
+    return "List()"
+
+
+# Property group and override params for every plugin module
+#
+def GetSchemaPlugins(rnd, pluginModules, tmpDir, numInstances=1):
+    plugins = []
+    for pluginModule in pluginModules:
+        for i in range(numInstances):
+            values = {'auto_save' : rnd.random() > 0.5}
+            overrideParams = {}
+            for attrDesc in pluginModule.PluginParams:
+                values[attrDesc['attr']] = GetSchemaValue(rnd, attrDesc, tmpDir)
+                r = rnd.random()
+                if r < 0.1:
+                    overrideParams[attrDesc['attr']] = None
+                elif r < 0.3:
+                    overrideParams[attrDesc['attr']] = GetSchemaValue(rnd, attrDesc, tmpDir)
+            pluginName = pluginModule.ID if i == 0 else "%s%i" % (pluginModule.ID, i)
+            plugins.append((pluginModule, pluginName, Namespace(**values), overrideParams))
+    return plugins
+
+
+# WritePluginParams before the export schema:
+# every attribute description is checked on every call
+#
+def LegacyWritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
+    from vb30.lib import AttributeUtils
+    from vb30.lib import BlenderUtils
+    from vb30.lib import PathUtils
+
+    scene = bus['scene']
+    o     = bus['output']
+
+    VRayScene = scene.vray
+    VRayDR    = VRayScene.VRayDR
+
+    for attrDesc in sorted(pluginModule.PluginParams, key=lambda t: t['attr']):
+        attrName = attrDesc['attr']
+        skip     = attrDesc.get('skip', False)
+
+        if skip and attrDesc['attr'] not in mappedParams:
+            continue
+
+        if attrDesc['type'] in AttributeUtils.OutputTypes:
+            continue
+
+        if attrDesc['type'] in AttributeUtils.SkippedTypes and attrDesc['attr'] not in mappedParams:
+            continue
+
+        if attrDesc['type'] in AttributeUtils.InputTypes and attrDesc['attr'] not in mappedParams:
+            continue
+
+        value = None
+
+        if attrName in mappedParams:
+            value = mappedParams[attrName]
+            if value is None:
+                continue
+
+        if 'options' in attrDesc:
+            if 'EXPORT_AS_IS' in attrDesc['options']:
+                o.writeAttibute(attrName, value)
+                continue
+
+        if value is None:
+            value = getattr(propGroup, attrName)
+
+        if value is None:
+            continue
+
+        if attrDesc['type'] in AttributeUtils.PluginTypes and not value:
+            continue
+
+        if attrDesc['type'] in {'TRANSFORM', 'MATRIX', 'VECTOR'}:
+            if not value:
+                continue
+
+        if attrDesc['type'] in {'STRING'}:
+            if not value:
+                continue
+
+            subtype = attrDesc.get('subtype')
+            if subtype in {'FILE_PATH', 'DIR_PATH'}:
+                value = BlenderUtils.GetFullFilepath(value)
+
+                if subtype == 'FILE_PATH':
+                    if VRayDR.on:
+                        if VRayDR.assetSharing == 'SHARE':
+                            value = PathUtils.CopyDRAsset(bus, value)
+
+                elif subtype == 'DIR_PATH':
+                    value = os.path.normpath(value) + os.sep
+
+                needCreateDir = True
+                if pluginName in {'SettingsCaustics',
+                                  'SettingsIrradianceMap',
+                                  'SettingsLightCache'}:
+                    if not getattr(propGroup, 'auto_save'):
+                        needCreateDir = False
+
+                if needCreateDir:
+                    value = PathUtils.CreateDirectoryFromFilepath(value)
+
+            value = '"%s"' % value
+
+        o.writeAttibute(attrName, value)
+
+
+# Writes plugins with the given WritePluginParams implementation
+#
+def WriteSchemaPlugins(filepath, plugins, writePluginParams):
+    from vb30.lib import VRayStream
+
+    o = VRayStream.VRaySimplePluginExporter(filepath)
+
+    bus = GetBus(o)
+
+    for pluginModule, pluginName, propGroup, overrideParams in plugins:
+        o.set(pluginModule.TYPE, pluginModule.ID, pluginName)
+        o.writeHeader()
+        writePluginParams(bus, pluginModule, pluginName, propGroup, overrideParams)
+        o.writeFooter()
+
+    o.done()
+
+
+# Synthetic material library as returned by ParseVrscene:
+# UVWGenChannel -> TexBitmap -> BRDFVRayMtl -> MtlSingleBRDF chains
+#
+VismatPluginTypes = ('UVWGenChannel', 'TexBitmap', 'BRDFVRayMtl', 'MtlSingleBRDF')
+
+
+def GetVismatPluginParams(numParams=48):
+    pluginParams = {}
+    for pluginID in VismatPluginTypes:
+        pluginParams[pluginID] = [{'attr' : "param_%.2i" % i, 'type' : 'FLOAT'} for i in range(numParams)]
+        pluginParams[pluginID].append({'attr' : 'input', 'type' : 'PLUGIN'})
+    return pluginParams
+
+
+def GetVismatPlugins(rnd, numPlugins):
+    pluginDescs = []
+    for i in range(numPlugins):
+        pluginID = VismatPluginTypes[i % len(VismatPluginTypes)]
+        attrs = {"param_%.2i" % a : rnd.random() for a in range(8)}
+        if i % len(VismatPluginTypes):
+            attrs['input'] = pluginDescs[-1]['Name']
+        pluginDescs.append({
+            'ID'         : pluginID,
+            'Name'       : "/%s@%i" % (pluginID, i),
+            'Attributes' : attrs,
+        })
+    # Materials come first in the exported files
+    pluginDescs.reverse()
+    return pluginDescs
+
+
+# List scans used by the importer before VRaySceneDict
+#
+def ScanPluginByName(vrsceneDict, pluginName):
+    for pluginDesc in vrsceneDict:
+        if pluginDesc['Name'] == pluginName:
+            return pluginDesc
+    return None
+
+
+def ScanParamDesc(pluginParams, attrName):
+    for paramDesc in pluginParams:
+        if paramDesc['attr'] == attrName:
+            return paramDesc
+    return None
+
+
+# Mimics nodes.importing.createNode() lookups
+#
+def ImportVismatPlugin(lookups, vrsceneDict, pluginParams, pluginDesc, imported):
+    getPluginByName, getParamDesc = lookups
+
+    if pluginDesc['Name'] in imported:
+        return
+    imported.add(pluginDesc['Name'])
+
+    params = pluginParams[pluginDesc['ID']]
+    for attrName, attrValue in pluginDesc['Attributes'].items():
+        attrDesc = getParamDesc(params, attrName)
+        if attrDesc['type'] == 'PLUGIN':
+            inputDesc = getPluginByName(vrsceneDict, attrValue)
+            ImportVismatPlugin(lookups, vrsceneDict, pluginParams, inputDesc, imported)
+
+
+# Minimal VRayFilePaths replacement
+#
+class BenchmarkFilePaths:
+    def __init__(self, dirpath):
+        self.dirpath = dirpath
+
+    def getExportDirectory(self):
+        return self.dirpath
+
+    def getExportFilename(self):
+        return "benchmark"
+
+    def useSeparateFiles(self):
+        return True
+
+
+# Plugin writer before buffered output and compact animation cache:
+# default file buffering, string concatenation per attribute and
+# formatted values stored in a dict of dicts.
+# Used as a reference for the VRayPluginExporter benchmarks.
+#
+def GetLegacyPluginExporter():
+    from vb30.lib import LibUtils
+    from vb30.lib import VRayStream
+
+    class LegacyPluginExporter(VRayStream.VRayPluginExporter):
+        def __init__(self):
+            VRayStream.VRayPluginExporter.__init__(self)
+            self.pluginCache = dict()
+
+        def setFrame(self, frame):
+            self.frameNumber = frame
+            self.namesCache  = set()
+
+        def _getCachedValue(self, attrName):
+            if self.pluginName not in self.pluginCache:
+                self.pluginCache[self.pluginName] = {}
+                return None,None
+            if attrName in self.pluginCache[self.pluginName]:
+                attrCache = self.pluginCache[self.pluginName][attrName]
+                return attrCache[0], attrCache[1]
+            return None,None
+
+        def _storeValueInCache(self, attrName, attrValue):
+            self.pluginCache[self.pluginName][attrName] = (self.frameNumber, attrValue)
+
+        def writeAttibute(self, attrName, val):
+            if not self.pluginID and not self.pluginName:
+                return
+
+            if not self.isAnimation:
+                self.pluginAttrs[attrName] = LibUtils.FormatValue(val)
+
+            else:
+                newValue = LibUtils.FormatValue(val)
+                cFrame, cValue = self._getCachedValue(attrName)
+
+                attrValue = None
+
+                if cValue is None:
+                    attrValue  = "interpolate((%i,%s))" % (self.frameNumber, newValue)
+                else:
+                    if newValue == cValue:
+                        return
+                    else:
+                        prevFrame = self.frameNumber - self.frameStep
+
+                        if cFrame < prevFrame:
+                            attrValue  = "interpolate("
+                            attrValue += "(%i,%s)," % (prevFrame,        cValue)
+                            attrValue += "(%i,%s)"  % (self.frameNumber, newValue)
+                            attrValue += ")"
+                        else:
+                            attrValue  = "interpolate((%i,%s))" % (self.frameNumber, newValue)
+
+                self._storeValueInCache(attrName, newValue)
+
+                self.pluginAttrs[attrName] = attrValue
+
+        def writeFooter(self):
+            if not self.pluginID and not self.pluginName:
+                return
+
+            if not self.pluginAttrs and self.pluginID not in VRayStream.NoAttrPlugins:
+                return
+
+            p = "\n%s %s {" % (self.pluginID, self.pluginName)
+            for attrName in sorted(self.pluginAttrs.keys()):
+                p += "\n\t%s=%s;" % (attrName, self.pluginAttrs[attrName])
+            p += "\n}\n"
+
+            self.fileManager.getOutputFile(self.pluginType).write(p)
+
+            self.pluginType  = None
+            self.pluginID    = None
+            self.pluginName  = None
+            self.pluginAttrs = None
+
+    return LegacyPluginExporter()
+
+
+######## ########  ######  ########  ######
+   ##    ##       ##    ##    ##    ##    ##
+   ##    ##       ##          ##    ##
+   ##    ######    ######     ##     ######
+   ##    ##             ##    ##          ##
+   ##    ##       ##    ##    ##    ##    ##
+   ##    ########  ######     ##     ######
+
+def BenchFormatValue(rnd, args, tmpDir):
+    from vb30.lib import LibUtils
+
+    values = [GetRandomValue(rnd, ValueTypes[i % 5]) for i in range(args.plugins)]
+
+    yield len(values)
+
+    for v in values:
+        LibUtils.FormatValue(v)
+
+
+def GetNumericValues(rnd, args):
+    return [GetRandomValue(rnd, ('FLOAT', 'VECTOR', 'COLOR', 'TRANSFORM')[i % 4]) for i in range(args.plugins)]
+
+
+def BenchFormatValueLoop(rnd, args, tmpDir):
+    from vb30.lib import LibUtils
+
+    values = GetNumericValues(rnd, args)
+
+    yield len(values)
+
+    for i in range(4):
+        ",".join(LibUtils.FormatValue(v) for v in values[i::4])
+
+
+def BenchFormatValues(rnd, args, tmpDir):
+    from vb30.lib import LibUtils
+
+    values = GetNumericValues(rnd, args)
+
+    yield len(values)
+
+    for i in range(4):
+        LibUtils.FormatValues(values[i::4])
+
+
+def BenchCleanString(rnd, args, tmpDir):
+    from vb30.lib import LibUtils
+
+    names = [GetRandomName(rnd, 24) for i in range(args.plugins)]
+
+    yield len(names)
+
+    for name in names:
+        LibUtils.CleanString(name)
+
+
+def BenchGetObjectName(rnd, args, tmpDir):
+    from vb30.lib import BlenderUtils
+
+    library = Namespace(filepath="//library/assets.blend")
+
+    objects = []
+    for i in range(args.plugins):
+        objects.append(Namespace(
+            name    = GetRandomName(rnd, 24),
+            type    = 'MESH',
+            library = library if i % 10 == 0 else None,
+        ))
+
+    BlenderUtils.ClearObjectNameCache()
+
+    yield len(objects) * 2
+
+    # Names are requested every frame
+    for i in range(2):
+        for ob in objects:
+            BlenderUtils.GetObjectName(ob)
+
+
+# Exporter and its file manager; legacy one uses default file buffering
+#
+def GetPluginExporter(tmpDir, legacy=False):
+    from vb30.lib import VRayStream
+
+    fm = VRayStream.VRayExportFiles(BenchmarkFilePaths(tmpDir))
+    if legacy:
+        fm.setBufferSize(-1)
+    fm.init()
+
+    o = GetLegacyPluginExporter() if legacy else VRayStream.VRayPluginExporter()
+    o.setFileManager(fm)
+
+    return o
+
+
+def BenchPluginExporter(rnd, args, tmpDir, legacy=False):
+    stream = list(GetPluginStream(rnd, args.plugins))
+
+    o = GetPluginExporter(tmpDir, legacy)
+
+    yield len(stream)
+
+    for pluginType, pluginID, pluginName, attrs in stream:
+        o.set(pluginType, pluginID, pluginName)
+        o.writeHeader()
+        for attrName in attrs:
+            o.writeAttibute(attrName, attrs[attrName])
+        o.writeFooter()
+
+    o.done()
+
+
+def BenchPluginExporterAnimation(rnd, args, tmpDir, legacy=False):
+    stream = list(GetPluginStream(rnd, args.anim_plugins))
+
+    o = GetPluginExporter(tmpDir, legacy)
+    o.setAnimation(True)
+    o.setFrameStart(1)
+    o.setFrameEnd(args.frames)
+    o.setFrameStep(1)
+
+    yield len(stream) * args.frames
+
+    for f in range(1, args.frames+1):
+        o.setFrame(f)
+        for pluginType, pluginID, pluginName, attrs in stream:
+            o.set(pluginType, pluginID, pluginName)
+            o.writeHeader()
+            for attrName in attrs:
+                value = attrs[attrName]
+                # Animate every second frame
+                if type(value) is float and f % 2:
+                    value += f
+                o.writeAttibute(attrName, value)
+            o.writeFooter()
+
+    o.done()
+
+
+def BenchPluginExporterLegacy(rnd, args, tmpDir):
+    return BenchPluginExporter(rnd, args, tmpDir, legacy=True)
+
+
+def BenchPluginExporterAnimationLegacy(rnd, args, tmpDir):
+    return BenchPluginExporterAnimation(rnd, args, tmpDir, legacy=True)
+
+
+def BenchSimplePluginExporter(rnd, args, tmpDir):
+    from vb30.lib import VRayStream
+
+    stream = list(GetPluginStream(rnd, args.plugins))
+
+    o = VRayStream.VRaySimplePluginExporter(os.path.join(tmpDir, "simple.vrscene"))
+
+    yield len(stream)
+
+    for pluginType, pluginID, pluginName, attrs in stream:
+        o.set(pluginType, pluginID, pluginName)
+        o.writeHeader()
+        for attrName in attrs:
+            o.writeAttibute(attrName, attrs[attrName])
+        o.writeFooter()
+
+    o.done()
+
+
+def BenchWritePluginParams(rnd, args, tmpDir):
+    from vb30.lib import ExportUtils
+    from vb30.lib import VRayStream
+
+    pluginModule = GetPluginModule()
+    propGroups   = [GetPropGroup(rnd, pluginModule) for i in range(args.plugins // 10)]
+
+    o = VRayStream.VRaySimplePluginExporter(os.path.join(tmpDir, "params.vrscene"))
+
+    bus = GetBus(o)
+
+    yield len(propGroups)
+
+    for i, propGroup in enumerate(propGroups):
+        ExportUtils.WritePluginCustom(bus, pluginModule, "Plugin%i" % i, propGroup, {})
+
+    o.done()
+
+
+# WritePluginParams over all registered plugin modules
+#
+def BenchPluginSchema(rnd, args, tmpDir, legacy=False):
+    from vb30.lib import ExportUtils
+
+    pluginModules, source = GetSchemaPluginModules(rnd)
+    numInstances = max(1, args.plugins // (len(pluginModules) * 10))
+
+    plugins = GetSchemaPlugins(rnd, pluginModules, tmpDir, numInstances)
+
+    writePluginParams = LegacyWritePluginParams if legacy else ExportUtils.WritePluginParams
+
+    ExportUtils.ClearExportSchemas()
+
+    yield len(plugins)
+
+    WriteSchemaPlugins(os.path.join(tmpDir, "schema.vrscene"), plugins, writePluginParams)
+
+
+def BenchPluginSchemaLegacy(rnd, args, tmpDir):
+    return BenchPluginSchema(rnd, args, tmpDir, legacy=True)
+
+
+def BenchImportVismat(rnd, args, tmpDir, indexed=True):
+    from vb30.lib import VRaySceneDict
+
+    pluginParams = GetVismatPluginParams()
+    pluginDescs  = GetVismatPlugins(rnd, min(args.plugins, 10000))
+
+    yield len(pluginDescs)
+
+    if indexed:
+        lookups = (VRaySceneDict.GetPluginByName, VRaySceneDict.GetParamDesc)
+        vrsceneDict = VRaySceneDict.VRaySceneDict(pluginDescs)
+    else:
+        lookups = (ScanPluginByName, ScanParamDesc)
+        vrsceneDict = pluginDescs
+
+    imported = set()
+    for pluginDesc in vrsceneDict:
+        if pluginDesc['ID'] == 'MtlSingleBRDF':
+            ImportVismatPlugin(lookups, vrsceneDict, pluginParams, pluginDesc, imported)
+
+
+def BenchImportVismatScan(rnd, args, tmpDir):
+    return BenchImportVismat(rnd, args, tmpDir, indexed=False)
+
+
+Benchmarks = (
+    ('FormatValue',                 BenchFormatValue),
+    ('FormatValue (list loop)',     BenchFormatValueLoop),
+    ('FormatValues (list batch)',   BenchFormatValues),
+    ('CleanString',                 BenchCleanString),
+    ('GetObjectName',               BenchGetObjectName),
+    ('VRayPluginExporter (old)',    BenchPluginExporterLegacy),
+    ('VRayPluginExporter',          BenchPluginExporter),
+    ('VRayPluginExporter (anim, old)', BenchPluginExporterAnimationLegacy),
+    ('VRayPluginExporter (anim)',   BenchPluginExporterAnimation),
+    ('VRaySimplePluginExporter',    BenchSimplePluginExporter),
+    ('WritePluginParams',           BenchWritePluginParams),
+    ('All plugins (per-call walk)', BenchPluginSchemaLegacy),
+    ('All plugins (cached schema)', BenchPluginSchema),
+    ('Import vismat (list scan)',   BenchImportVismatScan),
+    ('Import vismat (indexed)',     BenchImportVismat),
+)
+
+# (new, old) benchmark pairs to report speedup for
+Comparisons = (
+    ('VRayPluginExporter',          'VRayPluginExporter (old)'),
+    ('VRayPluginExporter (anim)',   'VRayPluginExporter (anim, old)'),
+    ('All plugins (cached schema)', 'All plugins (per-call walk)'),
+    ('Import vismat (indexed)',     'Import vismat (list scan)'),
+)
+
+
+# Runs benchmark generator: first step prepares data and returns
+# number of processed items, second step runs the measured code
+#
+def RunBenchmarkPass(func, args, traceMemory=False):
+    rnd = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="vb30_benchmark_") as tmpDir:
+        bench = func(rnd, args, tmpDir)
+        numItems = next(bench)
+
+        if traceMemory:
+            tracemalloc.start()
+        ts = time.perf_counter()
+        for _ in bench:
+            pass
+        te = time.perf_counter() - ts
+        peak = 0
+        if traceMemory:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    return numItems, te, peak
+
+
+# Time and memory are measured in separate passes,
+# since memory tracing slows down execution a lot.
+# Best time of the repeated passes is used to reduce noise.
+#
+def RunBenchmark(name, func, args):
+    numItems, te, peak = RunBenchmarkPass(func, args)
+    for i in range(args.repeat - 1):
+        te = min(te, RunBenchmarkPass(func, args)[1])
+    if args.memory:
+        _, _, peak = RunBenchmarkPass(func, args, traceMemory=True)
+
+    return {
+        'name'       : name,
+        'items'      : numItems,
+        'time'       : te,
+        'throughput' : numItems / te if te else 0.0,
+        'peakMemory' : peak,
+    }
+
+
+def GetArgs():
+    argv = sys.argv[1:]
+    if '--' in sys.argv:
+        argv = sys.argv[sys.argv.index('--')+1:]
+
+    parser = argparse.ArgumentParser(description="V-Ray For Blender exporter benchmarks")
+    parser.add_argument('--plugins', type=int, default=100000, help="Number of plugins / values")
+    parser.add_argument('--anim-plugins', type=int, default=100, help="Number of animated plugins")
+    parser.add_argument('--frames', type=int, default=1000, help="Number of animation frames")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of timed passes (best time is reported)")
+    parser.add_argument('--memory', action='store_true', help="Measure peak memory (additional pass)")
+    parser.add_argument('--only', default="", help="Run only benchmarks containing this string")
+    parser.add_argument('--json', default="", help="Save results into JSON file")
+
+    return parser.parse_args(argv)
+
+
+def main():
+    args = GetArgs()
+
+    Setup()
+
+    results = []
+    for name, func in Benchmarks:
+        if args.only and args.only.lower() not in name.lower():
+            continue
+        result = RunBenchmark(name, func, args)
+        results.append(result)
+
+        print("%-32s %10i items %10.3f sec %12.1f items/sec %10.1f MiB peak" % (
+            result['name'], result['items'], result['time'], result['throughput'], result['peakMemory'] / (1024.0 * 1024.0)))
+
+    times = {result['name'] : result['time'] for result in results}
+    for newName, oldName in Comparisons:
+        if times.get(newName) and oldName in times:
+            print("%-32s %10.2fx faster than \"%s\"" % (newName, times[oldName] / times[newName], oldName))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            f.write(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
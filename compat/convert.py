@@ -34,6 +34,7 @@ from vb30.nodes import tools as NodesTools
 from vb30.nodes import importing as NodesImport
 from vb30.nodes import export as NodesExport
 from vb30.nodes import utils as NodesUtils
+from vb30.nodes import nodes as NodesNodes
 
 from vb30.nodes.sockets import AddInput, AddOutput
 
@@ -400,6 +401,8 @@ def _createVRayNode(ntree, vrayNodeType, nodeName=None):
     if nodeName is not None:
         if nodeName in ntree.nodes:
             return ntree.nodes[nodeName]
+    NodesNodes.EnsureNodeTypes(('VRayNode%s' % vrayNodeType,))
+
     node = ntree.nodes.new('VRayNode%s' % vrayNodeType)
     if nodeName is not None:
         node.name = nodeName
@@ -22,7 +22,9 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import contextlib
 import inspect
+import json
 import os
 import sys
 import traceback
@@ -143,20 +145,163 @@ def ExceptionInfo(e):
     traceback.print_tb(exc_traceback)
 
 
+########  ########   #######  ######## #### ##       ######## ########
+##     ## ##     ## ##     ## ##        ##  ##       ##       ##     ##
+##     ## ##     ## ##     ## ##        ##  ##       ##       ##     ##
+########  ########  ##     ## ######    ##  ##       ######   ########
+##        ##   ##   ##     ## ##        ##  ##       ##       ##   ##
+##        ##    ##  ##     ## ##        ##  ##       ##       ##    ##
+##        ##     ##  #######  ##       #### ######## ######## ##     ##
+
+# Collects export statistics per frame:
+#   stage timings (functions decorated with TimeIt; nested stages are inclusive),
+#   number of plugins and bytes written from Python per plugin type.
+#
+class ExportProfiler:
+    def __init__(self):
+        self.frame  = "scene"
+        self.frames = {}
+        self.timeStart = time.perf_counter()
+
+    def _getFrameStats(self):
+        if self.frame not in self.frames:
+            self.frames[self.frame] = {
+                'stages'  : {},
+                'plugins' : {},
+                'data'    : {},
+            }
+        return self.frames[self.frame]
+
+    def setFrame(self, frame):
+        self.frame = "%s" % frame
+
+    def addStageTime(self, stageName, seconds):
+        stages = self._getFrameStats()['stages']
+        if stageName not in stages:
+            stages[stageName] = {'calls' : 0, 'time' : 0.0}
+        stages[stageName]['calls'] += 1
+        stages[stageName]['time']  += seconds
+
+    def addPluginWrite(self, pluginID, size):
+        plugins = self._getFrameStats()['plugins']
+        if pluginID not in plugins:
+            plugins[pluginID] = {'count' : 0, 'bytes' : 0}
+        plugins[pluginID]['count'] += 1
+        plugins[pluginID]['bytes'] += size
+
+    def addDataWrite(self, pluginType, size):
+        data = self._getFrameStats()['data']
+        data[pluginType] = data.get(pluginType, 0) + size
+
+    def getReport(self):
+        totals = {
+            'stages'  : {},
+            'plugins' : {},
+            'data'    : {},
+        }
+        for frameStats in self.frames.values():
+            for stageName, stage in frameStats['stages'].items():
+                total = totals['stages'].setdefault(stageName, {'calls' : 0, 'time' : 0.0})
+                total['calls'] += stage['calls']
+                total['time']  += stage['time']
+            for pluginID, plugin in frameStats['plugins'].items():
+                total = totals['plugins'].setdefault(pluginID, {'count' : 0, 'bytes' : 0})
+                total['count'] += plugin['count']
+                total['bytes'] += plugin['bytes']
+            for pluginType, size in frameStats['data'].items():
+                totals['data'][pluginType] = totals['data'].get(pluginType, 0) + size
+
+        return {
+            'time'   : time.perf_counter() - self.timeStart,
+            'totals' : totals,
+            'frames' : self.frames,
+        }
+
+    def save(self, filepath):
+        with open(filepath, 'w') as f:
+            f.write(json.dumps(self.getReport(), indent=2, sort_keys=True))
+        PrintInfo("Export profile is saved to \"%s\"" % filepath)
+
+
+# Currently active profiler
+Profiler = None
+
+
+def StartProfiler():
+    global Profiler
+    Profiler = ExportProfiler()
+    return Profiler
+
+
+def StopProfiler():
+    global Profiler
+    profiler = Profiler
+    Profiler = None
+    return profiler
+
+
+def GetProfiler():
+    return Profiler
+
+
 def TimeIt(method):
     def timed(*args, **kw):
         if IsDebugMode():
             sys.stdout.write(Color("V-Ray For Blender", 'green'))
             sys.stdout.write(": %s()...\n" % method.__name__)
             sys.stdout.flush()
-        ts = time.time()
+        ts = time.perf_counter()
         result = method(*args, **kw)
-        te = time.time() - ts
+        te = time.perf_counter() - ts
+        if Profiler:
+            Profiler.addStageTime(method.__name__, te)
         td = datetime.timedelta(seconds=te)
         d  = datetime.datetime(1,1,1) + td
         if IsDebugMode():
             sys.stdout.write(Color("V-Ray For Blender", 'green'))
-            sys.stdout.write(": %s() done [%.2i:%.2i:%.2i]\n" % (method.__name__, d.hour, d.minute, d.second))
+            sys.stdout.write(": %s() done [%.2i:%.2i:%.2i.%.3i]\n" % (method.__name__, d.hour, d.minute, d.second, d.microsecond // 1000))
             sys.stdout.flush()
         return result
     return timed
+
+
+# Add-on registration timings: [phaseName, depth, seconds]
+# Phases are stored in the order they start, nested phases have depth > 0.
+#
+StartupTimings = []
+StartupDepth   = 0
+
+
+def ClearStartupTimings():
+    global StartupDepth
+    StartupTimings.clear()
+    StartupDepth = 0
+
+
+@contextlib.contextmanager
+def StartupPhase(phaseName):
+    global StartupDepth
+    phase = [phaseName, StartupDepth, 0.0]
+    StartupTimings.append(phase)
+    StartupDepth += 1
+    ts = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase[2] = time.perf_counter() - ts
+        StartupDepth -= 1
+
+
+def IsStartupReport():
+    return bpy.app.debug or os.environ.get('VRAY_FOR_BLENDER_STARTUP_REPORT', '0') not in {'', '0'}
+
+
+def PrintStartupReport():
+    total = sum(seconds for phaseName, depth, seconds in StartupTimings if depth == 0)
+    PrintInfo("Registration took %.3f sec:" % total)
+    for phaseName, depth, seconds in StartupTimings:
+        PrintInfo("  %s%-*s %9.2f ms %5.1f%%" % (
+            '  ' * depth, 40 - 2 * depth, phaseName,
+            seconds * 1000.0,
+            100.0 * seconds / total if total else 0.0,
+        ), msgType='NORMAL')
@@ -42,6 +42,11 @@ def dr_nodes_restore(e):
     bpy.ops.vray.dr_nodes_load()
 
 
+@bpy.app.handlers.persistent
+def clear_name_cache(e):
+    BlenderUtils.ClearObjectNameCache()
+
+
 @bpy.app.handlers.persistent
 def event_shutdown(e):
     engine.shutdown()
@@ -76,6 +81,8 @@ def update_material_preview(sce):
 def register():
     BlenderUtils.AddEvent(bpy.app.handlers.save_post, dr_nodes_store)
     BlenderUtils.AddEvent(bpy.app.handlers.load_post, dr_nodes_restore)
+    BlenderUtils.AddEvent(bpy.app.handlers.load_post, clear_name_cache)
+    BlenderUtils.AddEvent(bpy.app.handlers.save_post, clear_name_cache)
     BlenderUtils.AddEvent(bpy.app.handlers.exit,      event_shutdown)
 
     BlenderUtils.AddEvent(bpy.app.handlers.new_material, new_material_ntree)
@@ -88,6 +95,8 @@ def register():
 def unregister():
     BlenderUtils.DelEvent(bpy.app.handlers.save_post, dr_nodes_store)
     BlenderUtils.DelEvent(bpy.app.handlers.load_post, dr_nodes_restore)
+    BlenderUtils.DelEvent(bpy.app.handlers.load_post, clear_name_cache)
+    BlenderUtils.DelEvent(bpy.app.handlers.save_post, clear_name_cache)
     BlenderUtils.DelEvent(bpy.app.handlers.exit,      event_shutdown)
 
     BlenderUtils.DelEvent(bpy.app.handlers.new_material, new_material_ntree)
@@ -31,8 +31,11 @@ import bpy
 from vb30.lib.VRayStream import VRayExportFiles
 from vb30.lib.VRayStream import VRayPluginExporter
 from vb30.lib.VRayStream import VRayFilePaths
+from vb30.lib.VRayStream import EvictGeometryCache
+from vb30.lib.VRayProcess import VRayProcessPool
+from vb30.lib.VRayAssetSync import VRayAssetSync
 
-from vb30.lib import SysUtils, BlenderUtils
+from vb30.lib import SysUtils, BlenderUtils, PathUtils, LibUtils
 
 from vb30.nodes import export as NodesExport
 
@@ -41,6 +44,7 @@ from vb30.exporting import exp_settings
 from vb30.exporting import exp_channels
 from vb30.exporting import exp_frame
 from vb30.exporting import exp_run
+from vb30.exporting import exp_bake
 from vb30.exporting import exp_anim_full
 from vb30.exporting import exp_anim_camera_loop
 
@@ -91,6 +95,9 @@ def Export(bus, scene, engine, isPreview=False):
                 o.write('MAIN', '\n#include "%s" // %s' % (filepath, includeFile.name))
             o.write('MAIN', '\n')
 
+    # Write keyframes held back by keyframe reduction
+    o.writePendingKeyframes()
+
     # No need for interpolate() anymore
     o.setAnimation(False)
     exp_settings.ExportSettings(bus)
@@ -105,6 +112,18 @@ def Export(bus, scene, engine, isPreview=False):
     return err
 
 
+def GetGeometryCacheDir(pm):
+    return os.path.join(pm.getExportDirectory(), "geometry_cache")
+
+
+# Returns geometry cache size limit in bytes or None
+#
+def GetGeometryCacheSize(VRayExporter):
+    if not VRayExporter.geometry_cache_size:
+        return None
+    return VRayExporter.geometry_cache_size * 1024 * 1024
+
+
 def ExportEx(bus):
     debug.Debug("ExportEx()")
 
@@ -126,10 +145,22 @@ def ExportEx(bus):
     pm.setSeparateFiles(VRayExporter.useSeparateFiles)
 
     pm.initFromScene(engine, scene)
+
+    # Frames are rendered while the next one is exported,
+    # so every frame needs its own set of files
+    if bus.get('processPool'):
+        pm.setExportFilename("%s_%.4i" % (pm.getExportFilename(), scene.frame_current))
+
     pm.printInfo()
 
     fm = VRayExportFiles(pm)
-    fm.setOverwriteGeometry(VRayExporter.auto_meshes)
+    fm.setOverwriteGeometry(VRayExporter.auto_meshes or bool(bus.get('processPool')))
+    if VRayExporter.use_geometry_cache and not engine.is_preview:
+        fm.setGeometryCacheDir(GetGeometryCacheDir(pm))
+        # Frames rendered in background could use any of the cached
+        # geometry, so the cache is trimmed after they are finished
+        if not bus.get('processPool'):
+            fm.setGeometryCacheSize(GetGeometryCacheSize(VRayExporter))
 
     try:
         fm.init()
@@ -139,6 +170,27 @@ def ExportEx(bus):
 
     o.setFileManager(fm)
     o.setPreview(engine.is_preview)
+    o.setDataFormat(VRayExporter.data_format)
+
+    if VRayExporter.use_keyframe_reduction and not engine.is_preview:
+        o.setKeyframeReduction(VRayExporter.keyframe_reduction_epsilon)
+    else:
+        o.setKeyframeTolerance(VRayExporter.keyframe_tolerance)
+
+    profiler = None
+    if VRayExporter.export_profile and not engine.is_preview:
+        profiler = debug.StartProfiler()
+
+    # Assets are copied to the shared directory in background
+    # while export continues
+    assetSync = None
+    if VRayDR.on and VRayDR.assetSharing == 'SHARE' and not engine.is_preview:
+        sharedDir = PathUtils.CreateDirectory(bpy.path.abspath(VRayDR.shared_dir))
+        assetSync = VRayAssetSync(sharedDir, VRayDR.asset_sync_threads)
+        bus['assetSync'] = assetSync
+
+    # Render engine doesn't change during export
+    LibUtils.SetAsciiTransform(engine.bl_idname == 'VRAY_RENDER_RT')
 
     bus['exporter'] = exp_init.InitExporter(bus)
 
@@ -197,10 +249,30 @@ def ExportEx(bus):
         exp_init.ShutdownExporter(bus)
         o.done()
 
+        LibUtils.SetAsciiTransform(None)
+
+        # Make sure assets are in place before V-Ray is started
+        if assetSync:
+            assetSync.wait()
+            bus.pop('assetSync')
+
+            # Scene references the shared copies,
+            # so render nodes can't render without them
+            if assetSync.hasErrors() and err is None:
+                err = "Error syncing DR assets: %s" % assetSync.getErrorsReport()
+
+        if profiler:
+            debug.StopProfiler()
+            profileFilepath = os.path.join(pm.getExportDirectory(), "%s_profile.json" % pm.getExportFilename())
+            try:
+                profiler.save(profileFilepath)
+            except Exception as e:
+                debug.ExceptionInfo(e)
+
     return err
 
 
-def ExportAndRun(engine, scene):
+def ExportAndRun(engine, scene, processPool=None, bakeJobs=None, visibilityIndex=None):
     if engine.test_break():
         return "Export is interrupted!"
 
@@ -222,6 +294,10 @@ def ExportAndRun(engine, scene):
 
         'preview'    : engine.is_preview,
 
+        # Used to run V-Ray without waiting for it
+        # in 'FRAMEBYFRAME' mode
+        'processPool' : processPool,
+
         # Used to pass nodes into plugin exporter
         # to access some special data like "fake" textures
         'context' : {
@@ -231,6 +307,10 @@ def ExportAndRun(engine, scene):
         'cache' : {
             'plugins' : set(),
             'mesh'    : set(),
+
+            # "Hide From View" lists resolved once per export
+            # (or once per animation in 'FRAMEBYFRAME' mode)
+            'visibility' : visibilityIndex or BlenderUtils.CameraVisibilityIndex(),
         },
 
         'defaults' : {
@@ -246,7 +326,11 @@ def ExportAndRun(engine, scene):
     if err is not None:
         return err
 
-    err = exp_run.RunEx(bus)
+    # Shared scene is rendered once per bake target
+    if bakeJobs:
+        err = exp_bake.RunBakeJobsEx(bus, bakeJobs)
+    else:
+        err = exp_run.RunEx(bus)
     if err is not None:
         return err
 
@@ -268,20 +352,53 @@ def RenderScene(engine, scene):
 
     err = None
 
-    if VRayExporter.animation_mode == 'FRAMEBYFRAME':
+    bakeJobs = exp_bake.GetBakeJobs()
+
+    if bakeJobs and not engine.is_preview:
+        err = ExportAndRun(engine, scene, bakeJobs=bakeJobs)
+
+    elif VRayExporter.animation_mode == 'FRAMEBYFRAME':
         # Store current frame
         selected_frame = scene.frame_current
 
+        # Export of the next frame is overlapped with
+        # rendering of the previous one
+        processPool = None
+        if VRayExporter.autorun and VRayExporter.frame_by_frame_pipeline:
+            processPool = VRayProcessPool(VRayExporter.frame_by_frame_processes)
+
+        # Every frame is a separate export, but "Hide From View"
+        # names are resolved only once
+        visibilityIndex = BlenderUtils.CameraVisibilityIndex()
+
         f = scene.frame_start
         while(f <= scene.frame_end):
             scene.frame_set(f)
 
-            err = ExportAndRun(engine, scene)
+            err = ExportAndRun(engine, scene, processPool, visibilityIndex=visibilityIndex)
             if err is not None:
                 break
 
+            # Don't render the rest of frames if V-Ray fails
+            if processPool and processPool.hasFailures():
+                break
+
             f += scene.frame_step
 
+        if processPool:
+            if err is None:
+                processPool.wait(engine.test_break)
+            processPool.kill()
+
+            if VRayExporter.use_geometry_cache and GetGeometryCacheSize(VRayExporter):
+                pm = VRayFilePaths()
+                pm.setSeparateFiles(VRayExporter.useSeparateFiles)
+                pm.initFromScene(engine, scene)
+                EvictGeometryCache(GetGeometryCacheDir(pm), GetGeometryCacheSize(VRayExporter))
+
+            if err is None and processPool.hasFailures():
+                err = "V-Ray failed: %s" % processPool.getFailuresReport()
+
         # Restore selected frame
         scene.frame_set(selected_frame)
 
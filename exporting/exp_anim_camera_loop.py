@@ -26,9 +26,11 @@ import bpy
 
 import _vray_for_blender
 
+from vb30.lib import BlenderUtils
+
 from vb30 import debug
 
-from . import exp_camera, exp_scene, exp_init
+from . import exp_camera, exp_scene, exp_init, exp_objects
 
 
 def GetLoopCameras(scene):
@@ -49,6 +51,58 @@ def IsHideFromViewUsed(cameras):
     return False
 
 
+# Exports all the nodes only for the first camera, then only the nodes
+# of the objects which visibility differs from the previous or the next
+# loop camera (see BlenderUtils.GetCameraLoopChanges()).
+#
+def ExportCameraLoopVisibilityDiff(bus, cameras):
+    scene = bus['scene']
+    o     = bus['output']
+
+    visibilityIndex = bus['cache'].get('visibility')
+
+    hideLists = [BlenderUtils.GetCameraHideLists(camera, visibilityIndex) for camera in cameras]
+
+    changes = BlenderUtils.GetCameraLoopChanges(hideLists)
+
+    objectsByPointer = {ob.as_pointer() : ob for ob in scene.objects}
+    instancers       = BlenderUtils.GetDupliGroupInstancers(scene.objects)
+
+    for i, camera in enumerate(cameras):
+        # Setup camera
+        bus['camera'] = camera
+
+        # Setup fake frame
+        frame = i+1
+        o.setFrame(frame)
+        _vray_for_blender.setFrame(frame)
+
+        if frame == 1:
+            exp_scene.ExportScene(bus, exportNodes=True, exportMeshes=True)
+            continue
+
+        err = exp_camera.ExportCamera(bus)
+        if err is not None:
+            return err
+
+        if not changes[i]:
+            continue
+
+        # Changed group objects are updated by re-exporting their instancers
+        exportObjects = {}
+        for p in changes[i]:
+            if p in objectsByPointer:
+                exportObjects[p] = objectsByPointer[p]
+            for instancer in instancers.get(p, ()):
+                exportObjects[instancer.as_pointer()] = instancer
+
+        debug.Debug("Camera \"%s\": updating %i objects" % (camera.name, len(exportObjects)))
+
+        exp_objects.ExportObjectList(bus, list(exportObjects.values()), hideLists[i])
+
+    return None
+
+
 @debug.TimeIt
 def ExportCameraLoop(bus):
     scene  = bus['scene']
@@ -78,6 +132,9 @@ def ExportCameraLoop(bus):
         # animation mode 
         exp_init.InitAnimation(bus, isAnimation=True)
 
+        if VRayExporter.camera_loop_visibility_diff:
+            return ExportCameraLoopVisibilityDiff(bus, cameras)
+
         for i, camera in enumerate(cameras):
             # Setup camera
             bus['camera'] = camera
@@ -25,10 +25,16 @@
 import _vray_for_blender
 
 from vb30 import debug
+from vb30.lib import BlenderUtils
 
 from . import exp_init
 from . import exp_scene
 from . import exp_camera
+from . import exp_objects
+
+
+def GetAnimatedObjects(scene):
+    return [ob for ob in scene.objects if BlenderUtils.IsObjectAnimated(ob)]
 
 
 def ExportCameraOnly(bus):
@@ -116,6 +122,8 @@ def ExportFullRange(bus):
     scene = bus['scene']
     o     = bus['output']
 
+    VRayExporter = scene.vray.Exporter
+
     err = None
 
     # Init exporter
@@ -124,13 +132,25 @@ def ExportFullRange(bus):
     # Store current frame
     selected_frame = scene.frame_current
 
+    # Static objects are exported only for the first frame
+    animatedObjects = None
+    if VRayExporter.export_animated_only:
+        animatedObjects = GetAnimatedObjects(scene)
+
+        debug.Debug("Animated objects: %i of %i" % (len(animatedObjects), len(scene.objects)))
+
     f = o.frameStart
     while(f <= o.frameEnd):
         scene.frame_set(f)
         o.setFrame(f)
         _vray_for_blender.setFrame(f)
 
-        err = exp_scene.ExportScene(bus)
+        if animatedObjects is None or f == o.frameStart:
+            err = exp_scene.ExportScene(bus)
+        else:
+            err = exp_camera.ExportCamera(bus)
+            if err is None and animatedObjects:
+                exp_objects.ExportObjectList(bus, animatedObjects)
         if err is not None:
             break
 
@@ -0,0 +1,172 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import os
+
+import bpy
+
+from vb30.lib.VRayProcess import VRayProcess, VRayProcessPool
+from vb30.lib.VRayStream import ImageFormatExtensions
+from vb30.lib import SysUtils, LibUtils, PathUtils, BlenderUtils
+
+from vb30 import debug
+
+
+# Batch bake: the scene is exported once and every bake target is rendered
+# from it with BakeView, UVWbakeView and the output image overridden
+# from the V-Ray command line:
+#
+#   {
+#     'name'       : object name (for messages),
+#     'bake_node'  : node plugin name of the baked object,
+#     'uv_channel' : bake UV channel index,
+#     'img_file'   : output image filepath,
+#   }
+#
+# Jobs are set by the batch bake operator before calling the render
+# and picked up by export.RenderScene().
+#
+
+BakeJobs = None
+
+
+def SetBakeJobs(jobs):
+    global BakeJobs
+    BakeJobs = jobs
+
+
+def GetBakeJobs():
+    return BakeJobs
+
+
+def GetBakeOutputFilepath(scene, imgDir, imgFile):
+    SettingsOutput = scene.vray.SettingsOutput
+
+    if not imgDir or not BlenderUtils.RelativePathValid(imgDir):
+        imgDir = PathUtils.GetTmpDirectory()
+
+    imgDir = PathUtils.CreateDirectory(LibUtils.FormatName(bpy.path.abspath(imgDir)))
+    imgFile = LibUtils.FormatName(imgFile or "render")
+
+    return os.path.join(imgDir, "%s.%s" % (imgFile, ImageFormatExtensions[SettingsOutput.img_format]))
+
+
+# Shared scene is not modified, plugins written by BakeView.writeDatablock()
+# are overridden instead of being redefined in an including scene file
+#
+def SetBakeJobOverrides(p, job):
+    p.addParameterOverride('UVWbakeView', 'uvw_channel', job['uv_channel'])
+    p.addParameterOverride('BakeView', 'bake_node', job['bake_node'])
+    p.setOutputFile(job['img_file'])
+
+
+def GetBakeProcess(bus, sceneFilepath, job, numProcesses):
+    scene = bus['scene']
+
+    VRayExporter = scene.vray.Exporter
+
+    vrayCmd = SysUtils.GetVRayStandalonePath()
+    if not vrayCmd:
+        raise Exception("V-Ray not found!")
+
+    p = VRayProcess()
+    p.setVRayStandalone(vrayCmd)
+    p.setSceneFile(sceneFilepath)
+    p.setAutorun(True)
+    p.setVerboseLevel(VRayExporter.verboseLevel)
+    p.setShowProgress(VRayExporter.showProgress)
+    p.setDisplaySRGB(VRayExporter.display_srgb)
+    p.setDisplayVFB(False)
+    p.setAutoclose(True)
+    p.setFrames(scene.frame_current)
+
+    # Split the machine between the simultaneous processes
+    if scene.render.threads_mode == 'AUTO':
+        if numProcesses > 1:
+            p.setThreads(max(1, (os.cpu_count() or 1) // numProcesses))
+    else:
+        p.setThreads(scene.render.threads)
+
+    SetBakeJobOverrides(p, job)
+
+    return p
+
+
+def RunBakeJobs(bus, jobs):
+    debug.Debug("RunBakeJobs()")
+
+    scene  = bus['scene']
+    engine = bus['engine']
+    o      = bus['output']
+
+    BatchBake = scene.vray.BatchBake
+
+    sceneFilepath = o.fileManager.getOutputFilepath()
+
+    numProcesses = min(BatchBake.processes, len(jobs))
+
+    processPool = VRayProcessPool(numProcesses)
+
+    aborted = False
+    for i, job in enumerate(jobs):
+        debug.PrintInfo("Baking: %s..." % job['name'])
+
+        engine.update_stats("", "V-Ray: Baking %s [%i/%i]" % (job['name'], i+1, len(jobs)))
+        engine.update_progress(i / len(jobs))
+
+        p = GetBakeProcess(bus, sceneFilepath, job, numProcesses)
+
+        processPool.run(p, engine.test_break, name=job['name'])
+
+        if engine.test_break():
+            aborted = True
+            break
+
+        # Don't start the rest of the jobs if V-Ray fails
+        if processPool.hasFailures():
+            break
+
+    if not aborted:
+        aborted = not processPool.wait(engine.test_break)
+
+    if aborted:
+        processPool.kill()
+        return "Baking is interrupted!"
+
+    if processPool.hasFailures():
+        return "V-Ray failed: %s" % processPool.getFailuresReport()
+
+    engine.update_progress(1.0)
+
+    return None
+
+
+def RunBakeJobsEx(bus, jobs):
+    debug.Debug("RunBakeJobsEx()")
+
+    try:
+        return RunBakeJobs(bus, jobs)
+    except Exception as e:
+        debug.ExceptionInfo(e)
+        return "Bake error: %s" % e
@@ -24,7 +24,10 @@
 
 from vb30.nodes import export as NodesExport
 
+from vb30 import debug
 
+
+@debug.TimeIt
 def ExportRenderElements(bus):
     scene = bus['scene']
     o     = bus['output']
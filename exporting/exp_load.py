@@ -25,9 +25,68 @@
 import time
 import os
 
+import bpy
+
 from vb30 import debug
 
 
+# Result region: (width, height, fileOffsetX, fileOffsetY)
+# With render border the result is the size of the border.
+# Offset is always set: RenderLayer.load_from_file() uses it only
+# if the image is larger than the layer, so both the cropped image ("-crop")
+# and the whole frame image ("-region") are loaded correctly.
+#
+def GetResultRegion(scene):
+    resolution_x = int(scene.render.resolution_x * scene.render.resolution_percentage * 0.01)
+    resolution_y = int(scene.render.resolution_y * scene.render.resolution_percentage * 0.01)
+
+    if not scene.render.use_border:
+        return resolution_x, resolution_y, 0, 0
+
+    x0 = int(resolution_x * scene.render.border_min_x)
+    y0 = int(resolution_y * scene.render.border_min_y)
+    x1 = int(resolution_x * scene.render.border_max_x)
+    y1 = int(resolution_y * scene.render.border_max_y)
+
+    return x1 - x0, y1 - y0, x0, y0
+
+
+# Watches image file for modifications;
+# file is considered ready when it's unchanged between two checks
+#
+class ImageWatcher:
+    def __init__(self, filepath):
+        self.filepath    = filepath
+        self.stamp       = None
+        self.loadedStamp = None
+
+    def getStamp(self):
+        try:
+            fileStat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return (fileStat.st_mtime_ns, fileStat.st_size)
+
+    def isReady(self):
+        stamp = self.getStamp()
+        stable = stamp is not None and stamp == self.stamp
+        self.stamp = stamp
+        return stable and stamp != self.loadedStamp
+
+    def setLoaded(self):
+        self.loadedStamp = self.stamp
+
+
+def LoadResultLayer(result, imageFile, offsetX, offsetY):
+    layer = result.layers[0]
+    try:
+        layer.load_from_file(imageFile, offsetX, offsetY)
+    except Exception as e:
+        debug.Debug("Error loading file! [%s]" % e, msgType='ERROR')
+        return False
+    return True
+
+
 def LoadImage(scene, engine, o, p):
     debug.Debug("LoadImage()")
 
@@ -48,22 +107,44 @@ def LoadImage(scene, engine, o, p):
     # There was some version that was always adding frame number
     imageFilePreviewCompat = imageFile.replace("preview.exr", "preview.000%i.exr" % scene.frame_current)
 
-    resolution_x = int(scene.render.resolution_x * scene.render.resolution_percentage * 0.01)
-    resolution_y = int(scene.render.resolution_y * scene.render.resolution_percentage * 0.01)
+    width, height, offsetX, offsetY = GetResultRegion(scene)
+
+    result = engine.begin_result(0, 0, width, height)
 
-    # TODO: Create VRayImage loader and load image while rendering
+    # Load image into the result while V-Ray is rendering
     #
-    while True:
-        if not p.is_running():
-            result = engine.begin_result(0, 0, resolution_x, resolution_y)
-            layer = result.layers[0]
-            try:
-                if os.path.exists(imageFile):
-                    layer.load_from_file(imageFile)
-                elif engine.is_preview and os.path.exists(imageFilePreviewCompat):
-                    layer.load_from_file(imageFilePreviewCompat)
-            except Exception as e:
-                debug.Debug("Error loading file! [%s]" % e, msgType='ERROR')
-            engine.end_result(result)
+    watcher = None
+    if imageToBlender and VRayExporter.image_to_blender_progressive:
+        watchFile = imageFile
+        if VRayExporter.image_to_blender_watch_file:
+            watchFile = bpy.path.abspath(VRayExporter.image_to_blender_watch_file)
+        watcher = ImageWatcher(watchFile)
+
+    lastUpdate = 0.0
+    aborted    = False
+
+    while p.is_running():
+        p.processEvents()
+
+        if engine.test_break():
+            p.kill()
+            aborted = True
             break
+
+        if watcher and time.perf_counter() - lastUpdate >= VRayExporter.image_to_blender_interval:
+            if watcher.isReady():
+                # File could still be partially written, will retry on the next change then
+                if LoadResultLayer(result, watcher.filepath, offsetX, offsetY):
+                    engine.update_result(result)
+                    watcher.setLoaded()
+                    lastUpdate = time.perf_counter()
+
         time.sleep(0.1)
+
+    if not aborted:
+        if os.path.exists(imageFile):
+            LoadResultLayer(result, imageFile, offsetX, offsetY)
+        elif engine.is_preview and os.path.exists(imageFilePreviewCompat):
+            LoadResultLayer(result, imageFilePreviewCompat, offsetX, offsetY)
+
+    engine.end_result(result)
@@ -22,6 +22,8 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import bpy
+
 import _vray_for_blender
 
 from vb30.lib import BlenderUtils
@@ -43,7 +45,7 @@ def ExportObjects(bus, exportNodes=True, exportMeshes=None):
     _vray_for_blender.setSkipObjects(bus['exporter'], skipObjects)
 
     # Setup "Hide From View"
-    hideFromView = BlenderUtils.GetCameraHideLists(camera)
+    hideFromView = BlenderUtils.GetCameraHideLists(camera, bus['cache'].get('visibility'))
     _vray_for_blender.setHideFromView(bus['exporter'], hideFromView)
 
     # In DR we export to a single file so we must force mesh re-export
@@ -63,3 +65,35 @@ def ExportObjects(bus, exportNodes=True, exportMeshes=None):
     bus['cache']['plugins'] = set()
     _vray_for_blender.clearCache()
     o.resetNamesCache()
+
+
+# Exports only the given objects (nodes and their geometry),
+# used when just a few objects change between frames
+#
+@debug.TimeIt
+def ExportObjectList(bus, objects, hideFromView=None):
+    o      = bus['output']
+    camera = bus['camera']
+
+    skipObjects = [ob.as_pointer() for ob in bus['skipObjects']]
+    _vray_for_blender.setSkipObjects(bus['exporter'], skipObjects)
+
+    if hideFromView is None:
+        hideFromView = BlenderUtils.GetCameraHideLists(camera, bus['cache'].get('visibility'))
+    _vray_for_blender.setHideFromView(bus['exporter'], hideFromView)
+
+    skipObjects = set(skipObjects)
+
+    # Init stuff for dupli / particles / etc
+    _vray_for_blender.exportObjectsPre(bus['exporter'])
+    for ob in objects:
+        if ob.as_pointer() in skipObjects:
+            continue
+        _vray_for_blender.exportObject(ob.as_pointer(), bpy.data.as_pointer(), bus['exporter'])
+    # Write dupli / particles / etc
+    _vray_for_blender.exportObjectsPost(bus['exporter'])
+
+    # Clean current frame name cache
+    bus['cache']['plugins'] = set()
+    _vray_for_blender.clearCache()
+    o.resetNamesCache()
@@ -22,10 +22,13 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import os
+
 import bpy
 
 from vb30.lib.VRayProcess import VRayProcess
 from vb30.lib import SysUtils
+from vb30.lib import VRayLog
 
 from vb30 import debug
 
@@ -48,7 +51,7 @@ def Run(bus):
     if not vrayCmd:
         raise Exception("V-Ray not found!")
 
-    imageToBlender = VRayExporter.animation_mode == 'NONE' and not scene.render.use_border and VRayExporter.auto_save_render and VRayExporter.image_to_blender
+    imageToBlender = VRayExporter.animation_mode == 'NONE' and VRayExporter.auto_save_render and VRayExporter.image_to_blender
 
     p = VRayProcess()
     p.setVRayStandalone(vrayCmd)
@@ -129,12 +132,36 @@ def Run(bus):
     if VRayExporter.gen_run_file:
         p.setGenRunFile(True)
 
-    p.run()
+    # Image is loaded while rendering, LoadImage() will wait for the process
+    if imageToBlender and VRayExporter.image_to_blender_progressive:
+        p.setWaitExit(False)
+
+    processPool = bus.get('processPool')
+
+    # Blender will wait for the process, so it's safe to read its output
+    waitProcess = p.waitExit or processPool or imageToBlender or engine.is_preview
+    if VRayExporter.capture_output and waitProcess:
+        logFilepath = None
+        if VRayExporter.render_log and not engine.is_preview:
+            logFilepath = "%s_render_log.json" % os.path.splitext(o.fileManager.getOutputFilepath())[0]
+        p.setCaptureOutput(True, logFilepath)
+        p.setProgressCallback(lambda event: ReportProgress(engine, event))
+
+    if processPool:
+        processPool.run(p, engine.test_break, "frame %i" % scene.frame_current)
+    else:
+        p.run()
 
     if imageToBlender or engine.is_preview:
         exp_load.LoadImage(scene, engine, o, p)
 
 
+def ReportProgress(engine, event):
+    if event['percent'] is not None:
+        engine.update_progress(event['percent'] / 100.0)
+    engine.update_stats("", "V-Ray: %s" % VRayLog.FormatEvent(event))
+
+
 def RunEx(bus):
     debug.Debug("RunEx()")
 
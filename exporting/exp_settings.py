@@ -28,6 +28,8 @@ from vb30.plugins import PLUGINS, PLUGINS_ID
 from vb30.lib     import ExportUtils
 from vb30.lib     import SysUtils
 
+from vb30 import debug
+
 
 # Exports global render settings
 # Must be called once before the object export
@@ -93,6 +95,7 @@ def ExportSettingsPlugin(bus, pluginType, pluginName):
     ExportUtils.WritePlugin(bus, pluginModule, pluginName, propGroup, overrideParams)
 
 
+@debug.TimeIt
 def ExportSettings(bus):
     scene = bus['scene']
 
@@ -22,6 +22,7 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import functools
 import math
 import os
 import tempfile
@@ -115,6 +116,135 @@ def IsDataAnimated(o):
     return False
 
 
+# Modifiers that depend on time or on other objects
+TimeDependentModifiers = {
+    'ARMATURE',
+    'CAST',
+    'CLOTH',
+    'COLLISION',
+    'CURVE',
+    'DYNAMIC_PAINT',
+    'EXPLODE',
+    'FLUID_SIMULATION',
+    'HOOK',
+    'LATTICE',
+    'MESH_CACHE',
+    'MESH_DEFORM',
+    'OCEAN',
+    'PARTICLE_INSTANCE',
+    'PARTICLE_SYSTEM',
+    'SHRINKWRAP',
+    'SMOKE',
+    'SOFT_BODY',
+    'SURFACE',
+    'WARP',
+    'WAVE',
+}
+
+# Modifier attributes referencing other objects:
+#   BOOLEAN, CAST, CURVE, DATA_TRANSFER, HOOK, LATTICE, SCREW, etc. - 'object'
+#   ARRAY - 'offset_object', 'start_cap', 'end_cap'
+#   MIRROR - 'mirror_object'
+#   SIMPLE_DEFORM - 'origin'
+#   SHRINKWRAP - 'target', 'auxiliary_target'
+#   DISPLACE, WAVE, WARP - 'texture_coords_object', 'object_from', 'object_to'
+#
+ModifierObjectAttrs = (
+    'object',
+    'offset_object',
+    'start_cap',
+    'end_cap',
+    'mirror_object',
+    'origin',
+    'target',
+    'auxiliary_target',
+    'texture_coords_object',
+    'object_from',
+    'object_to',
+)
+
+
+def HasAnimationData(idblock):
+    if idblock is None:
+        return False
+    animData = getattr(idblock, 'animation_data', None)
+    if not animData:
+        return False
+    return bool(animData.action or len(animData.drivers))
+
+
+def GetNodeTree(idblock):
+    VRayData = getattr(idblock, 'vray', None)
+    return getattr(VRayData, 'ntree', None) if VRayData else None
+
+
+# Returns objects the object geometry depends on:
+# modifier objects, UV projectors and curve bevel / taper objects
+#
+def GetDependencyObjects(ob):
+    for md in ob.modifiers:
+        for attr in ModifierObjectAttrs:
+            depOb = getattr(md, attr, None)
+            if depOb:
+                yield depOb
+        if md.type == 'UV_PROJECT':
+            for projector in md.projectors:
+                if projector.object:
+                    yield projector.object
+    if ob.type in {'CURVE', 'FONT'} and ob.data:
+        if ob.data.bevel_object:
+            yield ob.data.bevel_object
+        if ob.data.taper_object:
+            yield ob.data.taper_object
+
+
+# Checks if object could change over time.
+# Check is conservative: objects with constraints,
+# simulations, duplis, etc. are considered animated.
+# Object is also animated if any object its geometry
+# depends on is animated.
+#
+def IsObjectAnimated(ob, _visited=None):
+    if _visited is None:
+        _visited = set()
+    if ob.name in _visited:
+        return False
+    _visited.add(ob.name)
+
+    if HasAnimationData(ob) or HasAnimationData(GetNodeTree(ob)):
+        return True
+    if IsDataAnimated(ob):
+        return True
+    if ob.data:
+        if HasAnimationData(ob.data) or HasAnimationData(GetNodeTree(ob.data)):
+            return True
+        shapeKeys = getattr(ob.data, 'shape_keys', None)
+        if HasAnimationData(shapeKeys):
+            return True
+    if len(ob.constraints):
+        return True
+    if ob.rigid_body:
+        return True
+    if ob.dupli_type != 'NONE':
+        return True
+    if len(ob.particle_systems):
+        return True
+    for md in ob.modifiers:
+        if md.type in TimeDependentModifiers:
+            return True
+        if HasAnimationData(getattr(md, 'texture', None)):
+            return True
+    for ma in ObjectMaterialsIt([ob]):
+        if HasAnimationData(ma) or HasAnimationData(GetNodeTree(ma)):
+            return True
+    for depOb in GetDependencyObjects(ob):
+        if IsObjectAnimated(depOb, _visited):
+            return True
+    if ob.parent:
+        return IsObjectAnimated(ob.parent, _visited)
+    return False
+
+
 def GetObjectList(object_names_string=None, group_names_string=None):
     object_list = []
 
@@ -139,17 +269,124 @@ def GetObjectList(object_names_string=None, group_names_string=None):
     return object_list
 
 
-def GetCameraHideLists(camera):
+HideFromViewTypes = ('all', 'camera', 'gi', 'reflect', 'refract', 'shadows')
+
+
+# Resolves "Hide From View" object and group names into object pointer sets.
+# Index lives for one export or for all the frames of the frame by frame
+# animation: camera lists are rebuilt only when camera 'hf_*' properties
+# or the objects of the used groups change, including the dupli groups
+# of the hidden objects (frame change handlers could edit the groups).
+# Result is the same as with GetObjectList().
+#
+class CameraVisibilityIndex:
+    def __init__(self):
+        # Group name -> (group object names, pointers of the group objects)
+        self.groupPointers = {}
+
+        # Camera name -> (camera settings key, dupli groups key, visibility)
+        self.cameraHideLists = {}
+
+    def getGroupPointers(self, group):
+        groupObjectNames = tuple(ob.name for ob in group.objects)
+
+        cached = self.groupPointers.get(group.name)
+        if cached is None or cached[0] != groupObjectNames:
+            cached = (groupObjectNames, {ob.as_pointer() for ob in group.objects})
+            self.groupPointers[group.name] = cached
+
+        return cached
+
+    def getGroupObjectNames(self, groupName):
+        group = bpy.data.groups.get(groupName)
+        if not group:
+            return None
+        return self.getGroupPointers(group)[0]
+
+    def getCameraKey(self, camera):
+        VRayCamera = camera.data.vray
+
+        key = [VRayCamera.hide_from_view]
+        if VRayCamera.hide_from_view:
+            for hide_type in HideFromViewTypes:
+                if getattr(VRayCamera, 'hf_%s' % hide_type):
+                    if getattr(VRayCamera, 'hf_%s_auto' % hide_type):
+                        groupNames = ['hf_%s' % camera.name]
+                        key.append((hide_type, None, groupNames[0]))
+                    else:
+                        groupNames = getattr(VRayCamera, 'hf_%s_groups' % hide_type).split(';')
+                        key.append((hide_type, getattr(VRayCamera, 'hf_%s_objects' % hide_type), groupNames))
+
+                    # Group membership
+                    for groupName in groupNames:
+                        key.append(self.getGroupObjectNames(groupName))
+
+        return repr(key)
+
+    # Returns pointers of the objects with their dupli group objects;
+    # used dupli groups are stored into 'dupliGroups'
+    #
+    def getObjectListPointers(self, objects, dupliGroups):
+        pointers = set()
+        for ob in objects:
+            pointers.add(ob.as_pointer())
+            if ob.dupli_type == 'GROUP' and ob.dupli_group:
+                groupObjectNames, groupPointers = self.getGroupPointers(ob.dupli_group)
+                dupliGroups[ob.dupli_group.name] = groupObjectNames
+                pointers.update(groupPointers)
+        return pointers
+
+    def getCameraHideLists(self, camera):
+        key = self.getCameraKey(camera)
+
+        cached = self.cameraHideLists.get(camera.name)
+        if cached is not None and cached[0] == key:
+            if all(self.getGroupObjectNames(groupName) == groupObjectNames for groupName, groupObjectNames in cached[1].items()):
+                return cached[2]
+
+        VRayCamera = camera.data.vray
+
+        visibility  = {hide_type : set() for hide_type in HideFromViewTypes}
+        dupliGroups = {}
+
+        if VRayCamera.hide_from_view:
+            for hide_type in visibility:
+                if getattr(VRayCamera, 'hf_%s' % hide_type):
+                    if getattr(VRayCamera, 'hf_%s_auto' % hide_type):
+                        obNames    = ""
+                        groupNames = 'hf_%s' % camera.name
+                    else:
+                        obNames    = getattr(VRayCamera, 'hf_%s_objects' % hide_type)
+                        groupNames = getattr(VRayCamera, 'hf_%s_groups' % hide_type)
+
+                    objects = []
+                    if obNames:
+                        for obName in obNames.split(';'):
+                            ob = bpy.data.objects.get(obName)
+                            if ob:
+                                objects.append(ob)
+                    if groupNames:
+                        for groupName in groupNames.split(';'):
+                            group = bpy.data.groups.get(groupName)
+                            if group:
+                                objects.extend(group.objects)
+
+                    visibility[hide_type] = self.getObjectListPointers(objects, dupliGroups)
+
+        self.cameraHideLists[camera.name] = (key, dupliGroups, visibility)
+
+        return visibility
+
+
+# @visibilityIndex - CameraVisibilityIndex to reuse resolved names
+#
+def GetCameraHideLists(camera, visibilityIndex=None):
+    if visibilityIndex is not None:
+        return visibilityIndex.getCameraHideLists(camera)
+
     VRayCamera = camera.data.vray
 
-    visibility = {
-        'all'     : set(),
-        'camera'  : set(),
-        'gi'      : set(),
-        'reflect' : set(),
-        'refract' : set(),
-        'shadows' : set(),
-    }
+    visibility = {hide_type : set() for hide_type in HideFromViewTypes}
 
     if VRayCamera.hide_from_view:
         for hide_type in visibility:
@@ -165,6 +402,52 @@ def GetCameraHideLists(camera):
     return visibility
 
 
+# Returns pointers of the objects with different visibility
+# for the two "Hide From View" lists
+#
+def GetVisibilityChanges(hideLists, otherHideLists):
+    changed = set()
+    for hideType in hideLists:
+        changed |= hideLists[hideType] ^ otherHideLists[hideType]
+    return changed
+
+
+# Returns pointers of the objects to update for every loop camera:
+# objects which visibility differs from the previous or the next camera.
+# Key right before the change is needed, otherwise V-Ray would
+# interpolate the value from the last exported key.
+#
+def GetCameraLoopChanges(hideLists):
+    changes = [set()]
+    for i in range(1, len(hideLists)):
+        changes.append(GetVisibilityChanges(hideLists[i-1], hideLists[i]))
+    changes.append(set())
+
+    return [changes[i] | changes[i+1] for i in range(len(hideLists))]
+
+
+# Dupli group objects are exported by the objects instancing the group;
+# returns {group object pointer : [instancing scene objects]}
+#
+def GetDupliGroupInstancers(objects):
+    instancers = {}
+
+    def addGroup(instancer, group, visited):
+        if group.name in visited:
+            return
+        visited.add(group.name)
+        for ob in group.objects:
+            instancers.setdefault(ob.as_pointer(), []).append(instancer)
+            if ob.dupli_type == 'GROUP' and ob.dupli_group:
+                addGroup(instancer, ob.dupli_group, visited)
+
+    for ob in objects:
+        if ob.dupli_type == 'GROUP' and ob.dupli_group:
+            addGroup(ob, ob.dupli_group, set())
+
+    return instancers
+
+
 def GetEffectsExcludeList(scene):
     # TODO: Rewrite to nodes!
     #
@@ -187,13 +470,28 @@ def FilterObjectListByType(objectList, objectType):
     return filter(lambda x: x.type == objectType, objectList)
 
 
+# Object names are cached by (prefix, object name, library path);
+# renamed object simply gets a new cache entry.
+# Cache is cleared on file load, since relative library paths
+# depend on the blend-file location.
+#
+@functools.lru_cache(maxsize=262144)
+def _GetObjectName(prefix, obName, libraryFilepath):
+    name = prefix + obName
+    if libraryFilepath is not None:
+        name = 'LI' + PathUtils.GetFilename(libraryFilepath) + name
+    return LibUtils.CleanString(name)
+
+
+def ClearObjectNameCache():
+    _GetObjectName.cache_clear()
+
+
 def GetObjectName(ob, prefix=None):
     if prefix is None:
         prefix = ObjectPrefix.get(ob.type, 'OB')
-    name = prefix + ob.name
-    if ob.library:
-        name = 'LI' + PathUtils.GetFilename(ob.library.filepath) + name
-    return LibUtils.CleanString(name)
+    libraryFilepath = ob.library.filepath if ob.library else None
+    return _GetObjectName(prefix, ob.name, libraryFilepath)
 
 
 def GetGroupObjects(groupName):
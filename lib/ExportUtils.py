@@ -25,43 +25,202 @@
 import os
 
 import bpy
+import mathutils
 
 from vb30.debug import Debug, PrintDict
 
 from . import AttributeUtils, PathUtils, BlenderUtils
+from . import ListUtils
 
 
-def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
-    scene = bus['scene']
-    o     = bus['output']
+ ######   ######  ##     ## ######## ##     ##    ###
+##    ## ##    ## ##     ## ##       ###   ###   ## ##
+##       ##       ##     ## ##       #### ####  ##   ##
+ ######  ##       ######### ######   ## ### ## ##     ##
+      ## ##       ##     ## ##       ##     ## #########
+##    ## ##    ## ##     ## ##       ##     ## ##     ##
+ ######   ######  ##     ## ######## ##     ## ##     ##
 
-    VRayScene = scene.vray
-    VRayDR    = VRayScene.VRayDR
+# Numeric list attribute types;
+# written according to VRayExporter.data_format
+NumericListTypes = {
+    'INT_LIST'    : 'ListInt',
+    'FLOAT_LIST'  : 'ListFloat',
+    'VECTOR_LIST' : 'ListVector',
+    'COLOR_LIST'  : 'ListColor',
+}
 
-    if not hasattr(pluginModule, 'PluginParams'):
-        Debug("Module %s doesn't have PluginParams!" % pluginModule.ID, msgType='ERROR')
-        return
+VectorTypes = {
+    tuple,
+    list,
+    mathutils.Vector,
+    mathutils.Color,
+}
 
-    for attrDesc in sorted(pluginModule.PluginParams, key=lambda t: t['attr']):
-        attrName = attrDesc['attr']
-        skip     = attrDesc.get('skip', False)
+# Plugins with directory attributes created only if 'auto_save' is on
+AutoSavePlugins = {
+    'SettingsCaustics',
+    'SettingsIrradianceMap',
+    'SettingsLightCache',
+}
 
-        if skip and attrDesc['attr'] not in mappedParams:
-            continue
+
+def ExportPathValue(bus, pluginName, propGroup, value, subtype):
+    VRayDR = bus['scene'].vray.VRayDR
+
+    value = BlenderUtils.GetFullFilepath(value)
+
+    if subtype == 'FILE_PATH':
+        if VRayDR.on:
+            if VRayDR.assetSharing == 'SHARE':
+                value = PathUtils.CopyDRAsset(bus, value)
+
+    elif subtype == 'DIR_PATH':
+        # Ensure slash at the end of directory path
+        value = os.path.normpath(value) + os.sep
+
+    # NOTE: Additional check for some plugins with 'autosave'
+    # options. Create directories only if 'autosave' is on
+    needCreateDir = True
+    if pluginName in AutoSavePlugins:
+        if not getattr(propGroup, 'auto_save'):
+            needCreateDir = False
+
+    if needCreateDir:
+        value = PathUtils.CreateDirectoryFromFilepath(value)
+
+    return value
+
+
+# Value handlers return value to export or None to skip the attribute
+#
+def ExportPlainValue(bus, pluginName, propGroup, value):
+    return value
+
+
+def ExportNonEmptyValue(bus, pluginName, propGroup, value):
+    if not value:
+        return None
+    return value
+
+
+def ExportStringValue(bus, pluginName, propGroup, value):
+    if not value:
+        return None
+    return '"%s"' % value
+
+
+def ExportFilePathValue(bus, pluginName, propGroup, value):
+    if not value:
+        return None
+    return '"%s"' % ExportPathValue(bus, pluginName, propGroup, value, 'FILE_PATH')
+
+
+def ExportDirPathValue(bus, pluginName, propGroup, value):
+    if not value:
+        return None
+    return '"%s"' % ExportPathValue(bus, pluginName, propGroup, value, 'DIR_PATH')
+
+
+# Returns typed list for the sequence of numbers or vectors,
+# other values (already formatted lists, plugin lists, etc) are returned as is
+#
+def GetListValue(listType, value):
+    if type(value) not in {list, tuple}:
+        return value
+
+    if ListUtils.ListTypes[listType][1] == 1:
+        if not all(type(v) in {int, float, bool} for v in value):
+            return value
+    elif not all(type(v) in VectorTypes and len(v) >= 3 for v in value):
+        return value
+
+    return ListUtils.ListValue(listType, list(value))
+
+
+def GetListValueHandler(listType):
+    def ExportListValue(bus, pluginName, propGroup, value):
+        return GetListValue(listType, value)
+    return ExportListValue
+
+
+def GetValueHandler(attrDesc):
+    attrType = attrDesc['type']
+
+    if attrType in NumericListTypes:
+        return GetListValueHandler(NumericListTypes[attrType])
+
+    if attrType in AttributeUtils.PluginTypes or attrType in {'TRANSFORM', 'MATRIX', 'VECTOR'}:
+        return ExportNonEmptyValue
+
+    if attrType in {'STRING'}:
+        subtype = attrDesc.get('subtype')
+        if subtype == 'FILE_PATH':
+            return ExportFilePathValue
+        elif subtype == 'DIR_PATH':
+            return ExportDirPathValue
+        return ExportStringValue
+
+    # Enums and other simple types are exported as is
+    return ExportPlainValue
+
+
+# Export schema is a tuple of:
+#   (attrName, mappedOnly, exportAsIs, valueHandler)
+#
+# mappedOnly - attribute is exported only if its value is passed in 'mappedParams'
+# exportAsIs - value from 'mappedParams' is exported without any checks
+#
+def CompileExportSchema(pluginModule):
+    schema = []
+
+    for attrDesc in sorted(pluginModule.PluginParams, key=lambda t: t['attr']):
+        attrType = attrDesc['type']
 
         # Skip output attributes
-        if attrDesc['type'] in AttributeUtils.OutputTypes:
+        if attrType in AttributeUtils.OutputTypes:
             continue
 
-        # Type could be skipped, but mappedParams could contain a manually defined value for it
-        if attrDesc['type'] in AttributeUtils.SkippedTypes and attrDesc['attr'] not in mappedParams:
-            continue
+        # Skipped, list and input types are exported only with a manually defined value,
+        # otherwise parameter value is used
+        mappedOnly = attrDesc.get('skip', False) or \
+                     attrType in AttributeUtils.SkippedTypes or \
+                     attrType in AttributeUtils.InputTypes
 
-        # Skip attibutes that should be mapped, but are not mapped,
-        # we will use parameter value then
-        if attrDesc['type'] in AttributeUtils.InputTypes and attrDesc['attr'] not in mappedParams:
-            continue
+        exportAsIs = 'EXPORT_AS_IS' in attrDesc.get('options', "")
+
+        schema.append((attrDesc['attr'], mappedOnly, exportAsIs, GetValueHandler(attrDesc)))
+
+    return tuple(schema)
+
+
+# Plugin ID: (PluginParams, schema)
+ExportSchemas = {}
+
+
+def GetExportSchema(pluginModule):
+    pluginParams = pluginModule.PluginParams
+
+    cached = ExportSchemas.get(pluginModule.ID)
+    if cached is None or cached[0] is not pluginParams:
+        cached = (pluginParams, CompileExportSchema(pluginModule))
+        ExportSchemas[pluginModule.ID] = cached
+
+    return cached[1]
+
+
+def ClearExportSchemas():
+    ExportSchemas.clear()
+
+
+def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
+    o = bus['output']
 
+    if not hasattr(pluginModule, 'PluginParams'):
+        Debug("Module %s doesn't have PluginParams!" % pluginModule.ID, msgType='ERROR')
+        return
+
+    for attrName, mappedOnly, exportAsIs, valueHandler in GetExportSchema(pluginModule):
         value = None
 
         if attrName in mappedParams:
@@ -72,10 +231,12 @@ def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
             if value is None:
                 continue
 
-        if 'options' in attrDesc:
-            if 'EXPORT_AS_IS' in attrDesc['options']:
-                o.writeAttibute(attrName, value)
-                continue
+        elif mappedOnly:
+            continue
+
+        if exportAsIs:
+            o.writeAttibute(attrName, value)
+            continue
 
         if value is None:
             value = getattr(propGroup, attrName)
@@ -84,44 +245,10 @@ def WritePluginParams(bus, pluginModule, pluginName, propGroup, mappedParams):
             Debug("%s.%s value is None!" % (pluginName, attrName), msgType='ERROR')
             continue
 
-        if attrDesc['type'] in AttributeUtils.PluginTypes and not value:
+        value = valueHandler(bus, pluginName, propGroup, value)
+        if value is None:
             continue
 
-        if attrDesc['type'] in {'TRANSFORM', 'MATRIX', 'VECTOR'}:
-            if not value:
-                continue
-
-        if attrDesc['type'] in {'STRING'}:
-            if not value:
-                continue
-
-            subtype = attrDesc.get('subtype')
-            if subtype in {'FILE_PATH', 'DIR_PATH'}:
-                value = BlenderUtils.GetFullFilepath(value)
-
-                if subtype == 'FILE_PATH':
-                    if VRayDR.on:
-                        if VRayDR.assetSharing == 'SHARE':
-                            value = PathUtils.CopyDRAsset(bus, value)
-
-                elif subtype == 'DIR_PATH':
-                    # Ensure slash at the end of directory path
-                    value = os.path.normpath(value) + os.sep
-
-                # NOTE: Additional check for some plugins with 'autosave'
-                # options. Create directories only if 'autosave' is on
-                needCreateDir = True
-                if pluginName in {'SettingsCaustics',
-                                  'SettingsIrradianceMap',
-                                  'SettingsLightCache'}:
-                    if not getattr(propGroup, 'auto_save'):
-                        needCreateDir = False
-
-                if needCreateDir:
-                    value = PathUtils.CreateDirectoryFromFilepath(value)
-
-            value = '"%s"' % value
-
         o.writeAttibute(attrName, value)
 
 
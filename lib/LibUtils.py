@@ -89,21 +89,80 @@ def GetAsList(value):
     return l
 
 
+# Translation table for CleanString(): allowed chars are kept,
+# any other char is replaced with "_". Filled lazily, so any
+# unicode char is supported.
+#
+class CleanStringTable(dict):
+    def __init__(self, stripSigns):
+        dict.__init__(self)
+        if stripSigns:
+            self[ord("+")] = "p"
+            self[ord("-")] = "m"
+
+    def __missing__(self, code):
+        c = chr(code)
+        if c in "|@" or (c >= 'A' and c <= 'Z') or (c >= 'a' and c <= 'z') or (c >= '0' and c <= '9'):
+            value = code
+        else:
+            value = "_"
+        self[code] = value
+        return value
+
+
+CleanStringTables = {
+    True  : CleanStringTable(stripSigns=True),
+    False : CleanStringTable(stripSigns=False),
+}
+
+
 # Strips string from deprecated chars
 #
 # NOTE: Some unicode conversion support?
 #
 def CleanString(s, stripSigns=True):
-    if stripSigns:
-        s = s.replace("+", "p")
-        s = s.replace("-", "m")
-    for i in range(len(s)):
-        c = s[i]
-        if c in "|@":
-            continue
-        if not ((c >= 'A' and c <= 'Z') or (c >= 'a' and c <= 'z') or (c >= '0' and c <= '9')):
-            s = s.replace(c, "_")
-    return s
+    return s.translate(CleanStringTables[bool(stripSigns)])
+
+
+TransformFormat = "Transform(Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g)),Vector(%.12f,%.12f,%.12f))"
+MatrixFormat    = "Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g))"
+
+# Format of a single value by its type
+#
+ValueFormat = {
+    'BOOL'   : "%i",
+    'INT'    : "%i",
+    'FLOAT'  : "%.6g",
+    'VECTOR' : "Vector(%.3g,%.3g,%.3g)",
+    'COLOR'  : "Color(%.3g,%.3g,%.3g)",
+    'ACOLOR' : "AColor(%.3g,%.3g,%.3g,1.0)",
+}
+
+
+def GetTransformArgs(t):
+    return (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2], t[0][3], t[1][3], t[2][3])
+
+
+def GetMatrixArgs(t):
+    return (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2])
+
+
+# Transforms are exported as plain text for RT engine
+#
+# Transform format of the current export; checked from the scene
+# render engine when not set
+AsciiTransform = None
+
+
+def SetAsciiTransform(ascii):
+    global AsciiTransform
+    AsciiTransform = ascii
+
+
+def UseAsciiTransform():
+    if AsciiTransform is not None:
+        return AsciiTransform
+    return bpy.context.scene.render.engine == 'VRAY_RENDER_RT'
 
 
 # Return value in .vrscene format
@@ -117,11 +176,11 @@ def FormatValue(t, subtype=None, quotes=False, ascii=False):
         return "%.6g"%(t)
     elif type(t) is mathutils.Matrix:
         if len(t.col) == 4:
-            if ascii or bpy.context.scene.render.engine == 'VRAY_RENDER_RT':
-                return "Transform(Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g)),Vector(%.12f,%.12f,%.12f))" % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2], t[0][3], t[1][3], t[2][3])
+            if ascii or UseAsciiTransform():
+                return TransformFormat % GetTransformArgs(t)
             return _vray_for_blender.getTransformHex(t.copy())
         else:
-            return "Matrix(Vector(%.6g,%f,%f),Vector(%.6g,%.6g,%.6g),Vector(%.6g,%.6g,%.6g))" % (t[0][0], t[1][0], t[2][0], t[0][1], t[1][1], t[2][1], t[0][2], t[1][2], t[2][2])
+            return MatrixFormat % GetMatrixArgs(t)
     elif type(t) is mathutils.Vector:
         return "Vector(%.3g,%.3g,%.3g)" % (t.x,t.y,t.z)
     elif type(t) is mathutils.Color:
@@ -138,6 +197,73 @@ def FormatValue(t, subtype=None, quotes=False, ascii=False):
     return t
 
 
+def GetValueType(t):
+    if type(t) is bool:
+        return 'BOOL'
+    elif type(t) is int:
+        return 'INT'
+    elif type(t) is float:
+        return 'FLOAT'
+    elif type(t) is mathutils.Vector:
+        return 'VECTOR'
+    elif type(t) is mathutils.Color:
+        return 'COLOR'
+    elif type(t) is mathutils.Matrix:
+        return 'TRANSFORM' if len(t[0]) == 4 else 'MATRIX'
+    elif type(t) in {list, tuple} and len(t):
+        # Matrix is a sequence of 3 or 4 rows of 3 or 4 components
+        if all(type(row) in {list, tuple, mathutils.Vector} for row in t):
+            if len(t) in {3, 4} and len(t[0]) in {3, 4}:
+                return 'TRANSFORM' if len(t[0]) == 4 else 'MATRIX'
+        # Plain (x, y, z) is a vector
+        elif len(t) == 3 and all(type(c) in {int, float} for c in t):
+            return 'VECTOR'
+    return None
+
+
+# Returns values of the same type in .vrscene format joined with 'sep'.
+# Uses the same precision as FormatValue().
+#
+# @values    - sequence or NumPy array of floats (N), vectors / colors (N,3)
+#              or matrices (N,3,3) / (N,4,4); other values are formatted
+#              one by one with FormatValue()
+# @valueType - 'BOOL', 'INT', 'FLOAT', 'VECTOR', 'COLOR', 'TRANSFORM', 'MATRIX';
+#              detected from the first value if not set
+#
+def FormatValues(values, valueType=None, subtype=None, ascii=False, sep=","):
+    # NumPy array
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+
+    if not len(values):
+        return ""
+
+    if valueType is None:
+        valueType = GetValueType(values[0])
+
+    if valueType == 'COLOR' and subtype:
+        valueType = 'ACOLOR'
+
+    if valueType in {'BOOL', 'INT', 'FLOAT'}:
+        fmt = ValueFormat[valueType]
+        return sep.join([fmt % v for v in values])
+
+    elif valueType in {'VECTOR', 'COLOR', 'ACOLOR'}:
+        fmt = ValueFormat[valueType]
+        return sep.join([fmt % (v[0], v[1], v[2]) for v in values])
+
+    elif valueType == 'MATRIX':
+        return sep.join([MatrixFormat % GetMatrixArgs(t) for t in values])
+
+    elif valueType == 'TRANSFORM':
+        if ascii or UseAsciiTransform():
+            return sep.join([TransformFormat % GetTransformArgs(t) for t in values])
+        getTransformHex = _vray_for_blender.getTransformHex
+        return sep.join([getTransformHex(t.copy() if type(t) is mathutils.Matrix else mathutils.Matrix(t)) for t in values])
+
+    return sep.join([FormatValue(t, subtype=subtype, ascii=ascii) for t in values])
+
+
 # This funciton will substitue special format sequences with
 # the correspondent values
 #
@@ -0,0 +1,180 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import binascii
+import struct
+import zlib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# List type: (struct format, components per item, ASCII item format)
+ListTypes = {
+    'ListInt'    : ('i', 1, "%i"),
+    'ListFloat'  : ('f', 1, "%.9g"),
+    'ListVector' : ('f', 3, "Vector(%.9g,%.9g,%.9g)"),
+    'ListColor'  : ('f', 3, "Color(%.9g,%.9g,%.9g)"),
+}
+
+
+# Typed list of numeric values.
+# Formatted according to VRayExporter.data_format by the plugin exporters.
+#
+class ListValue:
+    def __init__(self, listType, values):
+        self.listType = listType
+        self.values   = values
+
+    def __eq__(self, other):
+        if type(other) is not ListValue:
+            return False
+        return self.listType == other.listType and FlattenValues(self.listType, self.values) == FlattenValues(other.listType, other.values)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def ListInt(values):
+    return ListValue('ListInt', list(values))
+
+def ListFloat(values):
+    return ListValue('ListFloat', list(values))
+
+def ListVector(values):
+    return ListValue('ListVector', list(values))
+
+def ListColor(values):
+    return ListValue('ListColor', list(values))
+
+
+def FlattenValues(listType, values):
+    itemSize = ListTypes[listType][1]
+    if itemSize == 1:
+        return list(values)
+    return [c for item in values for c in tuple(item)[:itemSize]]
+
+
+# Returns list data as little-endian binary
+#
+def PackValues(listType, values):
+    itemFormat = ListTypes[listType][0]
+    if numpy is not None:
+        dtype = '<i4' if itemFormat == 'i' else '<f4'
+        return numpy.asarray(FlattenValues(listType, values), dtype=dtype).tobytes()
+    flat = FlattenValues(listType, values)
+    return struct.pack("<%i%s" % (len(flat), itemFormat), *flat)
+
+
+def UnpackValues(listType, data):
+    itemFormat, itemSize, asciiFormat = ListTypes[listType]
+    flat = struct.unpack("<%i%s" % (len(data) // 4, itemFormat), data)
+    if itemSize == 1:
+        return list(flat)
+    return [flat[i:i+itemSize] for i in range(0, len(flat), itemSize)]
+
+
+def GetHex(data):
+    return binascii.hexlify(data).decode('ascii').upper()
+
+
+# Compressed data is stored as:
+#   "ZIPB" <uncompressed size : 8 hex digits> <compressed size : 8 hex digits> <hex data>
+#
+def GetZip(data):
+    compressed = zlib.compress(data)
+    return "ZIPB%08X%08X%s" % (len(data), len(compressed), GetHex(compressed))
+
+
+def FormatListAscii(listType, values):
+    itemFormat, itemSize, asciiFormat = ListTypes[listType]
+    if itemSize == 1:
+        items = (asciiFormat % v for v in values)
+    else:
+        items = (asciiFormat % tuple(item)[:itemSize] for item in values)
+    return "%s(%s)" % (listType, ",".join(items))
+
+
+# Returns list in .vrscene format
+#
+# @dataFormat - VRayExporter.data_format value: 'ZIP', 'HEX' or 'ASCII'
+#
+def FormatList(listValue, dataFormat='ASCII'):
+    listType = listValue.listType
+    values   = listValue.values
+
+    if dataFormat == 'ASCII' or not len(values):
+        return FormatListAscii(listType, values)
+
+    data = PackValues(listType, values)
+
+    hexData = None
+    if dataFormat == 'ZIP':
+        hexData = GetZip(data)
+        # Compression doesn't make sense for a short lists
+        if len(hexData) >= len(data) * 2:
+            hexData = None
+    if hexData is None:
+        hexData = GetHex(data)
+
+    return '%sHex("%s")' % (listType, hexData)
+
+
+# Returns binary data of the hex or compressed list string
+#
+def DecodeHex(s):
+    if s.startswith("ZIPB"):
+        size           = int(s[4:12],  16)
+        compressedSize = int(s[12:20], 16)
+        data = zlib.decompress(binascii.unhexlify(s[20:20+compressedSize*2]))
+        if len(data) != size:
+            raise ValueError("Invalid compressed list size!")
+        return data
+    return binascii.unhexlify(s)
+
+
+# Parses list in .vrscene format written by FormatList()
+#
+def ParseList(s):
+    listType, sep, data = s.partition("(")
+    data = data[:-1]
+
+    if listType.endswith("Hex"):
+        listType = listType[:-3]
+        return ListValue(listType, UnpackValues(listType, DecodeHex(data.strip('"'))))
+
+    if not data:
+        return ListValue(listType, [])
+
+    if ListTypes[listType][1] == 1:
+        cast = int if listType == 'ListInt' else float
+        return ListValue(listType, [cast(v) for v in data.split(",")])
+
+    items = []
+    for item in data.split("),"):
+        item = item.partition("(")[2].rstrip(")")
+        items.append(tuple(float(c) for c in item.split(",")))
+    return ListValue(listType, items)
@@ -74,6 +74,17 @@ def Quotes(path, force=False):
     return '"%s"' % (path)
 
 
+# Returns the list of (filepath, keys) for filepaths used more than once
+#
+# @filepaths - { key : filepath }
+#
+def GetDuplicateFilepaths(filepaths):
+    keys = {}
+    for key, filepath in sorted(filepaths.items()):
+        keys.setdefault(os.path.normcase(os.path.normpath(filepath)), []).append(key)
+    return [(filepath, fileKeys) for filepath, fileKeys in sorted(keys.items()) if len(fileKeys) > 1]
+
+
 def GetPreviewDir():
     previewRoot   = tempfile.gettempdir()
     previewSubdir = "vrayblender_preview_%s" % SysUtils.GetUsername()
@@ -126,7 +137,6 @@ def CopyDRAsset(bus, srcFilepath):
     VRayDR    = VRayScene.VRayDR
 
     srcFilepath = os.path.normpath(srcFilepath)
-    dstRoot     = CreateDirectory(bpy.path.abspath(VRayDR.shared_dir))
 
     ExtToSubdir = {
         'ies'    : "ies",
@@ -141,12 +151,7 @@ def CopyDRAsset(bus, srcFilepath):
 
     srcFiletype = os.path.splitext(srcFilename)[1]
 
-    assetSubdir = ExtToSubdir.get(srcFiletype.lower(), "textures")
-
-    if assetSubdir:
-        dstRoot = CreateDirectory(os.path.join(dstRoot, assetSubdir))
-
-    dstFilepath = os.path.join(dstRoot, srcFilename)
+    assetSubdir = ExtToSubdir.get(srcFiletype.lower().lstrip('.'), "textures")
 
     if not os.path.exists(srcFilepath):
         # debug.PrintError('"%s" file does not exists!' % srcFilepath)
@@ -156,7 +161,20 @@ def CopyDRAsset(bus, srcFilepath):
         debug.PrintError('"%s" is not a file!' % srcFilepath)
         return srcFilepath
 
+    assetSync = bus.get('assetSync')
+    if assetSync:
+        # Copy is done by the asset sync threads,
+        # directories are created there too
+        dstFilepath = os.path.join(assetSync.sharedDir, assetSubdir, srcFilename)
+
+        assetSync.add(srcFilepath, dstFilepath)
+
     else:
+        dstRoot = CreateDirectory(bpy.path.abspath(VRayDR.shared_dir))
+        dstRoot = CreateDirectory(os.path.join(dstRoot, assetSubdir))
+
+        dstFilepath = os.path.join(dstRoot, srcFilename)
+
         if os.path.exists(dstFilepath):
             if not filecmp.cmp(srcFilepath, dstFilepath):
                 debug.Debug('Copying "%s" to "%s"'% (debug.Color(srcFilename, 'magenta'), dstRoot))
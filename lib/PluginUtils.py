@@ -22,11 +22,15 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import hashlib
 import json
 import os
 import pathlib
+import pickle
 import sys
 
+from vb30.debug import Debug
+
 from . import SysUtils
 
 
@@ -37,36 +41,111 @@ def GetPluginsDescDir():
     return os.path.join(SysUtils.GetExporterPath(), "plugins_desc")
 
 
-def LoadPluginDesc():
-    descDirpath = pathlib.Path(GetPluginsDescDir())
-
-    for filePath in descDirpath.glob("*/*.json"):
-        file = filePath.open()
-        pluginDesc = json.loads(file.read())
-        file.close()
-
-        pluginID      = pluginDesc.get('ID')
-        pluginParams  = pluginDesc.get('Parameters')
-        pluginName    = pluginDesc.get('Name')
-        pluginType    = pluginDesc.get('Type')
-        pluginSubType = pluginDesc.get('Subtype', None)
-        pluginIDDesc  = pluginDesc.get('Description', "")
-        pluginWidget  = pluginDesc.get('Widget', {})
-
-        PLUGINS_DESC[pluginID] = {
-            # To match plugin interface
-            # XXX: Refactor
-            'DESC'         : pluginIDDesc,
-            'ID'           : pluginID,
-            'NAME'         : pluginName,
-            'SUBTYPE'      : pluginSubType,
-            'TYPE'         : pluginType,
-            'Name'         : pluginName,
-            'Parameters'   : pluginParams,
-            'PluginParams' : pluginParams,
-            'PluginWidget' : pluginWidget,
-            'Widget'       : pluginWidget,
-        }
+# Bump when the layout of PLUGINS_DESC entries changes
+PluginsDescCacheVersion = 1
+
+
+# Every add-on installation (release, development checkout, etc)
+# has its own cache file, so switching between them doesn't
+# rebuild the cache every time
+#
+def GetPluginsDescCacheFilepath(descDirpath):
+    dirHash = hashlib.md5(os.path.abspath(str(descDirpath)).encode('utf-8')).hexdigest()
+    return os.path.join(SysUtils.GetUserConfigDir(), "plugins_desc_%s.cache" % dirHash)
+
+
+# Cache stamp: description directory and (path, mtime, size) of every JSON file;
+# any added, removed or modified description invalidates the cache.
+#
+def GetPluginsDescStamp(descDirpath, descFilepaths):
+    stamp = [PluginsDescCacheVersion, str(descDirpath)]
+    for filePath in descFilepaths:
+        fileStat = filePath.stat()
+        stamp.append((filePath.relative_to(descDirpath).as_posix(), fileStat.st_mtime_ns, fileStat.st_size))
+    return stamp
+
+
+def LoadPluginDescCache(cacheFilepath, stamp):
+    if not os.path.exists(cacheFilepath):
+        return None
+    try:
+        with open(cacheFilepath, 'rb') as f:
+            cache = pickle.load(f)
+    except Exception as e:
+        Debug("Plugin description cache \"%s\" is unreadable: %s" % (cacheFilepath, e), msgType='ERROR')
+        return None
+    if type(cache) is not dict or cache.get('stamp') != stamp:
+        return None
+    return cache.get('desc')
+
+
+def SavePluginDescCache(cacheFilepath, stamp, pluginsDesc):
+    tmpFilepath = "%s.tmp" % cacheFilepath
+    try:
+        with open(tmpFilepath, 'wb') as f:
+            pickle.dump({'stamp' : stamp, 'desc' : pluginsDesc}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpFilepath, cacheFilepath)
+    except Exception as e:
+        Debug("Unable to save plugin description cache \"%s\": %s" % (cacheFilepath, e), msgType='ERROR')
+
+
+def ReadPluginDesc(filePath):
+    file = filePath.open()
+    pluginDesc = json.loads(file.read())
+    file.close()
+
+    pluginID      = pluginDesc.get('ID')
+    pluginParams  = pluginDesc.get('Parameters')
+    pluginName    = pluginDesc.get('Name')
+    pluginType    = pluginDesc.get('Type')
+    pluginSubType = pluginDesc.get('Subtype', None)
+    pluginIDDesc  = pluginDesc.get('Description', "")
+    pluginWidget  = pluginDesc.get('Widget', {})
+
+    return pluginID, {
+        # To match plugin interface
+        # XXX: Refactor
+        'DESC'         : pluginIDDesc,
+        'ID'           : pluginID,
+        'NAME'         : pluginName,
+        'SUBTYPE'      : pluginSubType,
+        'TYPE'         : pluginType,
+        'Name'         : pluginName,
+        'Parameters'   : pluginParams,
+        'PluginParams' : pluginParams,
+        'PluginWidget' : pluginWidget,
+        'Widget'       : pluginWidget,
+    }
+
+
+# Parsing every JSON description is the slowest part of the registration,
+# so the resulting PLUGINS_DESC is stored in a single pickled file
+# and reused until any of the descriptions change.
+#
+def LoadPluginDesc(useCache=True):
+    descDirpath   = pathlib.Path(GetPluginsDescDir())
+    descFilepaths = sorted(descDirpath.glob("*/*.json"))
+
+    stamp = None
+    if useCache:
+        cacheFilepath = GetPluginsDescCacheFilepath(descDirpath)
+        stamp = GetPluginsDescStamp(descDirpath, descFilepaths)
+
+        pluginsDesc = LoadPluginDescCache(cacheFilepath, stamp)
+        if pluginsDesc is not None:
+            PLUGINS_DESC.update(pluginsDesc)
+            return
+
+    pluginsDesc = {}
+    for filePath in descFilepaths:
+        pluginID, pluginDesc = ReadPluginDesc(filePath)
+        pluginsDesc[pluginID] = pluginDesc
+
+    # Save before anything could modify the descriptions
+    if stamp is not None:
+        SavePluginDescCache(cacheFilepath, stamp, pluginsDesc)
+
+    PLUGINS_DESC.update(pluginsDesc)
 
 
 def loadPluginOnModule(plugin, pluginID):
@@ -0,0 +1,224 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+
+from vb30 import debug
+
+
+# Copies DR assets into the shared directory in background threads.
+#
+# Export only records (source, destination) pairs and continues, copies
+# are done by a thread pool. Manifest stored in the shared directory keeps
+# source size, mtime and content hash of every copied asset:
+#
+#   {
+#     "textures/wood.png" : {
+#       "src"   : "/projects/scene/textures/wood.png",
+#       "size"  : 1048576,
+#       "mtime" : 1420000000000000000,
+#       "hash"  : "sha1 hex digest",
+#     },
+#   }
+#
+# If the source size and mtime match the manifest and the destination is
+# there, the file is skipped without reading it. If only mtime differs the
+# source is hashed and the copy is skipped if the content is the same.
+#
+
+ManifestFilename = ".vb30_assets.json"
+ManifestVersion  = 1
+
+CopyBufferSize = 1024 * 1024
+
+
+def GetFileHash(filepath):
+    h = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CopyBufferSize), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def CopyFileHashed(srcFilepath, dstFilepath):
+    h = hashlib.sha1()
+
+    tmpFilepath = "%s.%i.tmp" % (dstFilepath, threading.get_ident())
+    try:
+        with open(srcFilepath, 'rb') as src, open(tmpFilepath, 'wb') as dst:
+            for chunk in iter(lambda: src.read(CopyBufferSize), b''):
+                h.update(chunk)
+                dst.write(chunk)
+        os.replace(tmpFilepath, dstFilepath)
+    except Exception:
+        if os.path.exists(tmpFilepath):
+            os.remove(tmpFilepath)
+        raise
+
+    return h.hexdigest()
+
+
+def FormatBytes(size):
+    if size < 1024:
+        return "%i B" % size
+    for unit in ("KiB", "MiB", "GiB", "TiB"):
+        size /= 1024.0
+        if size < 1024.0:
+            break
+    return "%.1f %s" % (size, unit)
+
+
+def LoadManifest(filepath):
+    if not os.path.isfile(filepath):
+        return {}
+    try:
+        with open(filepath, 'r') as f:
+            manifest = json.load(f)
+    except Exception as e:
+        debug.PrintError('Error reading asset manifest "%s": %s' % (filepath, e))
+        return {}
+    if type(manifest) is not dict or manifest.get('version') != ManifestVersion:
+        return {}
+    assets = manifest.get('assets')
+    if type(assets) is not dict:
+        return {}
+    # Drop malformed entries, assets are copied again then
+    return {key : entry for key, entry in assets.items() if type(entry) is dict}
+
+
+def SaveManifest(filepath, assets):
+    tmpFilepath = "%s.tmp" % filepath
+    try:
+        with open(tmpFilepath, 'w') as f:
+            json.dump({'version' : ManifestVersion, 'assets' : assets}, f, indent=1, sort_keys=True)
+        os.replace(tmpFilepath, filepath)
+    except Exception as e:
+        debug.PrintError('Error writing asset manifest "%s": %s' % (filepath, e))
+
+
+# Copies single asset if needed, runs in the worker thread.
+# Returns (copied, size, new manifest entry)
+#
+def SyncAsset(srcFilepath, dstFilepath, entry):
+    srcStat = os.stat(srcFilepath)
+
+    newEntry = {
+        'src'   : srcFilepath,
+        'size'  : srcStat.st_size,
+        'mtime' : srcStat.st_mtime_ns,
+        'hash'  : None,
+    }
+
+    dstSize = os.path.getsize(dstFilepath) if os.path.isfile(dstFilepath) else None
+
+    if entry and dstSize == srcStat.st_size == entry.get('size'):
+        if entry.get('mtime') == srcStat.st_mtime_ns and entry.get('src') == srcFilepath:
+            return False, srcStat.st_size, entry
+
+        # Source is touched or comes from other location,
+        # compare only local data with the stored hash
+        newEntry['hash'] = GetFileHash(srcFilepath)
+        if newEntry['hash'] == entry.get('hash'):
+            return False, srcStat.st_size, newEntry
+
+    dstDirpath = os.path.dirname(dstFilepath)
+    if not os.path.isdir(dstDirpath):
+        os.makedirs(dstDirpath, exist_ok=True)
+
+    newEntry['hash'] = CopyFileHashed(srcFilepath, dstFilepath)
+
+    return True, srcStat.st_size, newEntry
+
+
+class VRayAssetSync:
+    def __init__(self, sharedDir, threads=4):
+        self.sharedDir = sharedDir
+        self.manifestFilepath = os.path.join(sharedDir, ManifestFilename)
+        self.manifest = LoadManifest(self.manifestFilepath)
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, threads))
+        self.futures = {}
+
+        self.bytesCopied  = 0
+        self.bytesSkipped = 0
+        self.filesCopied  = 0
+        self.filesSkipped = 0
+        self.errors = []
+
+    def getManifestKey(self, dstFilepath):
+        return os.path.relpath(dstFilepath, self.sharedDir).replace(os.sep, '/')
+
+    # Schedules the copy; every destination is synced once per export
+    #
+    def add(self, srcFilepath, dstFilepath):
+        key = self.getManifestKey(dstFilepath)
+        if key in self.futures:
+            return
+        entry = self.manifest.get(key)
+        self.futures[key] = self.executor.submit(SyncAsset, srcFilepath, dstFilepath, entry)
+
+    # Waits for all the copies, updates the manifest and prints the report
+    #
+    def wait(self):
+        for key, future in self.futures.items():
+            try:
+                copied, size, entry = future.result()
+            except Exception as e:
+                self.errors.append(key)
+                debug.PrintError('Error syncing asset "%s": %s' % (key, e))
+                continue
+
+            self.manifest[key] = entry
+
+            if copied:
+                self.bytesCopied += size
+                self.filesCopied += 1
+            else:
+                self.bytesSkipped += size
+                self.filesSkipped += 1
+
+        self.executor.shutdown()
+
+        if self.futures:
+            SaveManifest(self.manifestFilepath, self.manifest)
+            self.printReport()
+
+        self.futures = {}
+
+    def hasErrors(self):
+        return bool(self.errors)
+
+    def getErrorsReport(self):
+        return ", ".join(self.errors)
+
+    def printReport(self):
+        debug.PrintInfo("DR assets: copied %i files (%s), skipped %i unchanged files (%s)%s" % (
+            self.filesCopied, FormatBytes(self.bytesCopied),
+            self.filesSkipped, FormatBytes(self.bytesSkipped),
+            ", %i errors" % len(self.errors) if self.errors else "",
+        ))
@@ -0,0 +1,534 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import array
+
+import mathutils
+
+from . import LibUtils
+
+
+KEY_BOOL    = 0
+KEY_INT     = 1
+KEY_FLOAT   = 2
+KEY_VECTOR  = 3
+KEY_COLOR   = 4
+KEY_MATRIX  = 5
+KEY_OBJECT  = 6
+
+
+# Single component value types
+ScalarKinds = {
+    bool  : KEY_BOOL,
+    int   : KEY_INT,
+    float : KEY_FLOAT,
+}
+
+# Value types cached without copying
+ImmutableTypes = {
+    bool,
+    int,
+    float,
+    str,
+}
+
+# Multiple component value types
+ComponentTypes = {
+    mathutils.Vector,
+    mathutils.Color,
+    mathutils.Matrix,
+}
+
+# Three component value types
+VectorKinds = {
+    mathutils.Vector : KEY_VECTOR,
+    mathutils.Color  : KEY_COLOR,
+}
+
+# Number of matrix components : matrix size;
+# only square matrices are stored as components
+MatrixSizes = {
+    9  : 3,
+    16 : 4,
+}
+
+# Returned by VRayKeyframeCache.compare() if value is not changed
+SLOT_UNCHANGED = -1
+
+
+def IsSquareMatrix(value):
+    size = len(value)
+    return size in MatrixSizes.values() and all(len(row) == size for row in value)
+
+
+# Returns value kind and value components as a flat tuple of floats
+# or None if value is not numeric
+#
+def GetValueComponents(value):
+    valueType = type(value)
+    if valueType is bool:
+        return KEY_BOOL, (float(value),)
+    elif valueType is int:
+        return KEY_INT, (float(value),)
+    elif valueType is float:
+        return KEY_FLOAT, (value,)
+    elif valueType is mathutils.Vector:
+        return KEY_VECTOR, tuple(value)
+    elif valueType is mathutils.Color:
+        return KEY_COLOR, tuple(value)
+    elif valueType is mathutils.Matrix and IsSquareMatrix(value):
+        return KEY_MATRIX, tuple(c for row in value for c in row)
+    return KEY_OBJECT, None
+
+
+# Restores value from the flat components
+#
+def MakeValue(kind, components):
+    if kind == KEY_BOOL:
+        return bool(components[0])
+    elif kind == KEY_INT:
+        return int(components[0])
+    elif kind == KEY_FLOAT:
+        return components[0]
+    elif kind == KEY_VECTOR:
+        return mathutils.Vector(components)
+    elif kind == KEY_COLOR:
+        return mathutils.Color(components)
+    elif kind == KEY_MATRIX:
+        size = MatrixSizes.get(len(components))
+        if size is None:
+            raise ValueError("Unsupported matrix components count: %i" % len(components))
+        return mathutils.Matrix([components[i*size:(i+1)*size] for i in range(size)])
+    return None
+
+
+# Stores last exported value of every animated plugin attribute
+#
+# Plugin and attribute names are interned into integer ids;
+# numeric values are kept unformatted in flat arrays:
+#
+#   pluginIds[pluginName]   = pluginId
+#   attrIds[attrName]       = attrId
+#   slots[pluginId][attrId] = slot
+#
+#   frames[slot]  - frame of the cached value
+#   kinds[slot]   - value kind (KEY_*)
+#   offsets[slot] - offset of value components in 'data'
+#   sizes[slot]   - number of value components
+#   data          - value components of all slots
+#   objects       - non-numeric values (strings, etc)
+#
+# Appending single items to arrays is slow, so new slots are collected
+# into lists first and moved to the arrays in bulk with commit().
+#
+class VRayKeyframeCache:
+    def __init__(self):
+        # Float values closer then tolerance are considered equal
+        self.tolerance = 0.0
+
+        self.pluginIds = dict()
+        self.attrIds   = dict()
+        self.slots     = list()
+
+        self.frames  = array.array('i')
+        self.kinds   = array.array('b')
+        self.offsets = array.array('i')
+        self.sizes   = array.array('b')
+        self.data    = array.array('d')
+        self.objects = dict()
+
+        self.numSlots = 0
+
+        # New slots (pluginId, attrName, frame, kind, value) not yet moved
+        # to the arrays; kind is None for scalar and string values
+        self.newSlots = list()
+        # Plugins with new slots only
+        self.newPluginIds = set()
+
+    def setTolerance(self, tolerance):
+        self.tolerance = tolerance
+
+    def getPluginId(self, pluginName):
+        pluginId = self.pluginIds.get(pluginName)
+        if pluginId is None:
+            pluginId = self.pluginIds[pluginName] = len(self.slots)
+            self.slots.append(dict())
+        return pluginId
+
+    # Checks if there are no cached or new values of the plugin;
+    # the plugin values are expected to be added right after
+    #
+    def isNewPlugin(self, pluginId):
+        if self.slots[pluginId] or pluginId in self.newPluginIds:
+            return False
+        self.newPluginIds.add(pluginId)
+        return True
+
+    def getSlot(self, pluginId, attrName):
+        if self.newSlots:
+            self.commit()
+        return self.slots[pluginId].get(self.attrIds.get(attrName))
+
+    # Moves new slots to the arrays
+    #
+    def commit(self):
+        slots   = self.slots
+        attrIds = self.attrIds
+        objects = self.objects
+
+        slot   = len(self.frames)
+        offset = len(self.data)
+
+        frames  = list()
+        kinds   = list()
+        offsets = list()
+        sizes   = list()
+        data    = list()
+
+        for pluginId, attrName, frame, kind, value in self.newSlots:
+            attrId = attrIds.get(attrName)
+            if attrId is None:
+                attrId = attrIds[attrName] = len(attrIds)
+            slots[pluginId][attrId] = slot
+            frames.append(frame)
+
+            if kind is None:
+                kind = ScalarKinds.get(type(value), KEY_OBJECT)
+                if kind != KEY_OBJECT:
+                    value = (value,)
+            kinds.append(kind)
+
+            if kind == KEY_OBJECT:
+                offsets.append(0)
+                sizes.append(0)
+                objects[slot] = value
+            else:
+                size = len(value)
+                offsets.append(offset)
+                sizes.append(size)
+                data.extend(value)
+                offset += size
+
+            slot += 1
+
+        self.frames.extend(frames)
+        self.kinds.extend(kinds)
+        self.offsets.extend(offsets)
+        self.sizes.extend(sizes)
+        self.data.extend(data)
+
+        self.newSlots     = list()
+        self.newPluginIds = set()
+
+    def getFrame(self, slot):
+        if self.newSlots:
+            self.commit()
+        return self.frames[slot]
+
+    def getValue(self, slot):
+        if self.newSlots:
+            self.commit()
+        kind = self.kinds[slot]
+        if kind == KEY_OBJECT:
+            return self.objects[slot]
+        offset = self.offsets[slot]
+        return MakeValue(kind, self.data[offset:offset+self.sizes[slot]])
+
+    def getFormattedValue(self, slot):
+        if self.newSlots:
+            self.commit()
+        if self.kinds[slot] == KEY_FLOAT:
+            return LibUtils.FormatValue(self.data[self.offsets[slot]])
+        return LibUtils.FormatValue(self.getValue(slot))
+
+    # Checks if value is equal to the cached one;
+    # float components are compared with tolerance
+    #
+    def isEqual(self, slot, value):
+        if self.newSlots:
+            self.commit()
+
+        kind = self.kinds[slot]
+
+        if kind == KEY_OBJECT:
+            if type(value) in ComponentTypes and GetValueComponents(value)[0] != KEY_OBJECT:
+                return False
+            return self.objects[slot] == value
+
+        valueKind, components = GetValueComponents(value)
+        if valueKind != kind:
+            return False
+        size = self.sizes[slot]
+        if len(components) != size:
+            return False
+        offset = self.offsets[slot]
+        if kind == KEY_BOOL or kind == KEY_INT:
+            return self.data[offset] == components[0]
+        tolerance = self.tolerance
+        for cached, c in zip(self.data[offset:offset+size], components):
+            if abs(cached - c) > tolerance:
+                return False
+        return True
+
+    # Returns:
+    #   None           - if there is no cached value
+    #   SLOT_UNCHANGED - if value is equal to the cached one
+    #   slot           - slot of the different cached value
+    #
+    def compare(self, pluginId, attrName, value):
+        if self.newSlots:
+            self.commit()
+        slot = self.slots[pluginId].get(self.attrIds.get(attrName))
+        if slot is None:
+            return None
+
+        # Inlined fast paths of isEqual() for the most common values
+        valueType = type(value)
+
+        if valueType is str:
+            # Only non-numeric values are stored in 'objects'
+            if self.objects.get(slot) == value:
+                return SLOT_UNCHANGED
+            return slot
+
+        if valueType is float:
+            if self.kinds[slot] == KEY_FLOAT and abs(self.data[self.offsets[slot]] - value) <= self.tolerance:
+                return SLOT_UNCHANGED
+            return slot
+
+        if valueType is bool or valueType is int:
+            if self.kinds[slot] == ScalarKinds[valueType] and self.data[self.offsets[slot]] == value:
+                return SLOT_UNCHANGED
+            return slot
+
+        if (valueType is mathutils.Color or valueType is mathutils.Vector) and len(value) == 3:
+            if self.kinds[slot] != VectorKinds[valueType] or self.sizes[slot] != 3:
+                return slot
+            data      = self.data
+            offset    = self.offsets[slot]
+            tolerance = self.tolerance
+            x, y, z = value
+            if abs(data[offset] - x) > tolerance or abs(data[offset+1] - y) > tolerance or abs(data[offset+2] - z) > tolerance:
+                return slot
+            return SLOT_UNCHANGED
+
+        return SLOT_UNCHANGED if self.isEqual(slot, value) else slot
+
+    # Adds slot for the attribute without the cached value;
+    # value is moved to the arrays on the next lookup
+    #
+    def add(self, pluginId, attrName, frame, value):
+        slot = self.numSlots
+        self.numSlots = slot + 1
+
+        valueType = type(value)
+        if valueType in ImmutableTypes:
+            self.newSlots.append((pluginId, attrName, frame, None, value))
+        elif valueType in VectorKinds:
+            self.newSlots.append((pluginId, attrName, frame, VectorKinds[valueType], tuple(value)))
+        else:
+            # Blender values may reference data changed on the next frame,
+            # so the components are copied right away
+            kind, components = GetValueComponents(value)
+            if not components:
+                # Non-square matrices are stored as is
+                components = value.copy() if valueType is mathutils.Matrix else value
+            self.newSlots.append((pluginId, attrName, frame, kind, components))
+
+        return slot
+
+    # @slot - slot returned by getSlot() or compare(), if known
+    #
+    def store(self, pluginId, attrName, frame, value, slot=None):
+        if slot is None:
+            slot = self.getSlot(pluginId, attrName)
+            if slot is None:
+                return self.add(pluginId, attrName, frame, value)
+
+        if self.newSlots:
+            self.commit()
+
+        # Fast path for the changed float value
+        if type(value) is float and self.kinds[slot] == KEY_FLOAT:
+            self.frames[slot] = frame
+            self.data[self.offsets[slot]] = value
+            return slot
+
+        kind, components = GetValueComponents(value)
+        size = len(components) if components else 0
+
+        self.frames[slot] = frame
+        self.kinds[slot]  = kind
+        # Value size may change only for non-numeric data,
+        # otherwise allocate new place for components
+        if size > self.sizes[slot]:
+            self.offsets[slot] = len(self.data)
+            self.data.extend(components)
+        elif size == 1:
+            self.data[self.offsets[slot]] = components[0]
+        elif components:
+            offset = self.offsets[slot]
+            self.data[offset:offset+size] = array.array('d', components)
+        self.sizes[slot] = size
+
+        if kind == KEY_OBJECT:
+            # Non-square matrices are stored as is
+            if type(value) is mathutils.Matrix:
+                value = value.copy()
+            self.objects[slot] = value
+        elif slot in self.objects:
+            del self.objects[slot]
+
+        return slot
+
+    # Drops cached value of the attribute
+    #
+    def remove(self, pluginId, attrName):
+        if self.newSlots:
+            self.commit()
+        slot = self.slots[pluginId].pop(self.attrIds.get(attrName), None)
+        if slot is not None:
+            self.objects.pop(slot, None)
+
+
+# Value kinds that could be linearly interpolated
+ReducibleKinds = {
+    KEY_FLOAT,
+    KEY_VECTOR,
+    KEY_COLOR,
+    KEY_MATRIX,
+}
+
+
+def IsReducible(value):
+    kind, components = GetValueComponents(value)
+    return kind in ReducibleKinds
+
+
+# Checks if value at 'frame' could be restored with linear interpolation
+# between (frame0, value0) and (frame1, value1)
+#
+def IsLinear(frame0, value0, frame, value, frame1, value1, epsilon):
+    if frame1 == frame0:
+        return False
+    t = (frame - frame0) / (frame1 - frame0)
+    for c0, c, c1 in zip(value0, value, value1):
+        if abs(c0 + (c1 - c0) * t - c) > epsilon:
+            return False
+    return True
+
+
+# Drops keyframes that could be restored with linear interpolation
+# of the neighbour keys.
+#
+# For every attribute the last written key is stored along with samples
+# exported after it. Last sample is written as a key only when the next value
+# makes any of these samples deviate from the line for more then epsilon.
+# Pending keys have to be written with flush() after the last frame is exported.
+#
+class VRayKeyframeReducer:
+    def __init__(self, epsilon):
+        self.epsilon = epsilon
+
+        # (pluginName, attrName) : (frame, kind, components)
+        self.lastKeys = dict()
+
+        # (pluginName, attrName) : [(frame, kind, components), ...]
+        self.pendingKeys = dict()
+
+        # pluginName : (pluginType, pluginID)
+        self.plugins = dict()
+
+    def _isLinear(self, lastKey, samples, frame, components):
+        for sample in samples:
+            if not IsLinear(lastKey[0], lastKey[2], sample[0], sample[2], frame, components, self.epsilon):
+                return False
+        return True
+
+    # Returns list of (frame, value) keys to write
+    #
+    def add(self, pluginType, pluginID, pluginName, attrName, frame, value):
+        kind, components = GetValueComponents(value)
+
+        key = (pluginName, attrName)
+        sample = (frame, kind, components)
+
+        self.plugins[pluginName] = (pluginType, pluginID)
+
+        lastKey = self.lastKeys.get(key)
+        if lastKey is None or lastKey[1] != kind:
+            # Last sample of the previous value kind can't be
+            # interpolated to the new value, so both are keys
+            keys = self.pop(pluginName, attrName)
+            keys.append((frame, value))
+            self.lastKeys[key] = sample
+            return keys
+
+        samples = self.pendingKeys.get(key)
+        if not samples:
+            self.pendingKeys[key] = [sample]
+            return []
+
+        if self._isLinear(lastKey, samples, frame, components):
+            samples.append(sample)
+            return []
+
+        lastSample = samples[-1]
+
+        self.lastKeys[key]    = lastSample
+        self.pendingKeys[key] = [sample]
+
+        return [(lastSample[0], MakeValue(lastSample[1], lastSample[2]))]
+
+    # Stops reducing the attribute (for example, when it gets
+    # a value that could not be interpolated);
+    # returns list with the pending (frame, value) key if any
+    #
+    def pop(self, pluginName, attrName):
+        key = (pluginName, attrName)
+
+        self.lastKeys.pop(key, None)
+
+        samples = self.pendingKeys.pop(key, None)
+        if not samples:
+            return []
+        frame, kind, components = samples[-1]
+        return [(frame, MakeValue(kind, components))]
+
+    # Returns pending keys grouped by plugin:
+    #   [(pluginType, pluginID, pluginName, {attrName: (frame, value)}), ...]
+    #
+    def flush(self):
+        pluginKeys = dict()
+        for (pluginName, attrName), samples in self.pendingKeys.items():
+            if not samples:
+                continue
+            frame, kind, components = samples[-1]
+            if pluginName not in pluginKeys:
+                pluginKeys[pluginName] = dict()
+            pluginKeys[pluginName][attrName] = (frame, MakeValue(kind, components))
+            self.lastKeys[(pluginName, attrName)] = samples[-1]
+        self.pendingKeys = dict()
+
+        return [self.plugins[pluginName] + (pluginName, pluginKeys[pluginName]) for pluginName in sorted(pluginKeys)]
@@ -0,0 +1,198 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import json
+import re
+import time
+
+
+# Parses V-Ray Standalone console output into progress events:
+#
+#   {
+#     'time'      : seconds since the process start,
+#     'frame'     : current frame or None,
+#     'task'      : task reported by the line, e.g. "Rendering image",
+#     'percent'   : task progress [0.0, 100.0] or None,
+#     'pass'      : progressive pass or None,
+#     'elapsed'   : task elapsed time (seconds) or None,
+#     'remaining' : task estimated time left (seconds) or None,
+#     'memory'    : memory usage (MiB) or None,
+#     'error'     : True for error messages,
+#     'message'   : line text,
+#   }
+#
+# Only the frame is kept between events, everything else
+# describes the parsed line only.
+#
+# Examples of parsed lines:
+#   [2015/Jan/12|12:00:00] Building light cache...: 45.00% [  0h  0m  1.2s] [  0h  0m  2.5s est]
+#   [2015/Jan/12|12:00:00] V-Ray: Rendering image...: done [  0h  0m 12.0s]
+#   [2015/Jan/12|12:00:00] Progressive rendering: pass 12
+#   [2015/Jan/12|12:00:00] Starting frame 3
+#   [2015/Jan/12|12:00:00] Memory usage: 1024.50 MB
+#   [2015/Jan/12|12:00:00] error: Failed to load "texture.png"
+#
+# Error summaries without errors ("0 error(s), 2 warning(s)") are ignored.
+#
+
+AnsiEscapeRe = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+TimestampRe  = re.compile(r'^\s*\[[^\]]*\]\s*')
+PrefixRe     = re.compile(r'^V-Ray:\s*')
+TaskRe       = re.compile(r'^(?P<task>[^:\[%]+?)\s*\.*\s*:\s*(?:(?P<percent>\d+(?:\.\d+)?)\s*%|(?P<done>done))')
+TimeRe       = re.compile(r'\[\s*(?:(?P<h>\d+)h)?\s*(?:(?P<m>\d+)m)?\s*(?:(?P<s>\d+(?:\.\d+)?)s)?\s*(?P<est>est)?\s*\]')
+PassRe       = re.compile(r'^Progressive(?:\s+rendering)?\s*\.*\s*:?\s*pass\s*#?(?P<pass>\d+)', re.IGNORECASE)
+FrameRe      = re.compile(r'^(?:starting|rendering|preparing)\s+frame\s+(?P<frame>-?\d+)', re.IGNORECASE)
+MemoryRe     = re.compile(r'^(?:used\s+)?memory(?:\s+usage)?\s*:\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>[KMGT]i?B)', re.IGNORECASE)
+ErrorRe      = re.compile(r'\berror(?:s|\(s\))?\b', re.IGNORECASE)
+ErrorCountRe = re.compile(r'\b(?P<count>\d+)\s+error(?:s|\(s\))?', re.IGNORECASE)
+
+MemoryUnits = {
+    'K' : 1.0 / 1024.0,
+    'M' : 1.0,
+    'G' : 1024.0,
+    'T' : 1024.0 * 1024.0,
+}
+
+
+def CleanLine(line):
+    return AnsiEscapeRe.sub("", line).strip()
+
+
+def GetSeconds(m):
+    if not any(m.group(k) for k in ('h', 'm', 's')):
+        return None
+    return int(m.group('h') or 0) * 3600.0 + int(m.group('m') or 0) * 60.0 + float(m.group('s') or 0.0)
+
+
+# Error message or summary with non-zero errors count
+#
+def IsError(message):
+    if not ErrorRe.search(message):
+        return False
+    counts = [int(m.group('count')) for m in ErrorCountRe.finditer(message)]
+    if counts:
+        return any(counts)
+    return True
+
+
+class VRayLogParser:
+    def __init__(self):
+        self.timeStart = time.perf_counter()
+
+        self.frame = None
+
+    # Returns event for lines with progress information, None otherwise
+    #
+    def parseLine(self, line):
+        line = CleanLine(line)
+        if not line:
+            return None
+
+        message = TimestampRe.sub("", line)
+        text    = PrefixRe.sub("", message)
+
+        event = {
+            'time'      : None,
+            'frame'     : None,
+            'task'      : None,
+            'percent'   : None,
+            'pass'      : None,
+            'elapsed'   : None,
+            'remaining' : None,
+            'memory'    : None,
+            'error'     : IsError(text),
+            'message'   : message,
+        }
+
+        hasInfo = event['error']
+
+        m = FrameRe.search(text)
+        if m:
+            self.frame = int(m.group('frame'))
+            hasInfo = True
+
+        m = TaskRe.search(text)
+        if m:
+            event['task']    = m.group('task').strip()
+            event['percent'] = 100.0 if m.group('done') else float(m.group('percent'))
+            hasInfo = True
+
+            for t in TimeRe.finditer(text, m.end()):
+                seconds = GetSeconds(t)
+                if t.group('est'):
+                    event['remaining'] = seconds
+                else:
+                    event['elapsed'] = seconds
+
+        m = PassRe.search(text)
+        if m:
+            event['pass'] = int(m.group('pass'))
+            hasInfo = True
+
+        m = MemoryRe.search(text)
+        if m:
+            event['memory'] = float(m.group('value')) * MemoryUnits[m.group('unit')[0].upper()]
+            hasInfo = True
+
+        if not hasInfo:
+            return None
+
+        event['time']  = time.perf_counter() - self.timeStart
+        event['frame'] = self.frame
+
+        return event
+
+
+def FormatSeconds(seconds):
+    seconds = int(seconds)
+    return "%i:%.2i:%.2i" % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+# Short status string for the Blender UI
+#
+def FormatEvent(event):
+    info = []
+    if event['frame'] is not None:
+        info.append("Frame %i" % event['frame'])
+    if event['task']:
+        if event['percent'] is not None:
+            info.append("%s %.1f%%" % (event['task'], event['percent']))
+        else:
+            info.append(event['task'])
+    if event['pass'] is not None:
+        info.append("Pass %i" % event['pass'])
+    if event['elapsed'] is not None:
+        info.append("Elapsed %s" % FormatSeconds(event['elapsed']))
+    if event['remaining'] is not None:
+        info.append("Remaining %s" % FormatSeconds(event['remaining']))
+    if event['memory'] is not None:
+        info.append("Mem %.0fM" % event['memory'])
+    if event.get('error'):
+        info.append(event['message'])
+    return " | ".join(info)
+
+
+def SaveLog(filepath, log):
+    with open(filepath, 'w') as f:
+        f.write(json.dumps(log, indent=2))
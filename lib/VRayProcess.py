@@ -25,6 +25,7 @@
 import bpy
 
 import os
+import queue
 import re
 import struct
 import subprocess
@@ -32,12 +33,15 @@ import signal
 import sys
 import shutil
 import tempfile
+import threading
+import time
 
 from vb30 import debug
 
 from . import PathUtils
 from . import BlenderUtils
 from . import SysUtils
+from . import VRayLog
 
 
 class VRayProcess:
@@ -55,6 +59,7 @@ class VRayProcess:
         # Input data
         self.sceneFile = ""
         self.include = ""
+        self.parameterOverrides = []
 
         # Animation
         self.frames = ""
@@ -114,6 +119,14 @@ class VRayProcess:
 
         self.gen_run_file = False
 
+        # Output capture: progress events are parsed in the reader thread
+        # and passed to 'progressCallback' from processEvents()
+        self.captureOutput    = False
+        self.logFilepath      = None
+        self.progressCallback = None
+        self.events           = queue.Queue()
+        self.readerThread     = None
+
     def setVRayStandalone(self, filepath):
         self.filepath = filepath
 
@@ -160,6 +173,11 @@ class VRayProcess:
         if frameStep is not None:
             self.frames += ",%d" % frameStep
 
+    # Overrides plugin parameter of the loaded scene
+    #
+    def addParameterOverride(self, pluginName, attrName, value):
+        self.parameterOverrides.append("%s::%s=%s" % (pluginName, attrName, value))
+
     def setDistributed(self, d):
         self.distributed = d
 
@@ -181,6 +199,16 @@ class VRayProcess:
     def setGenRunFile(self, v):
         self.gen_run_file = v
 
+    # Output should be captured only if Blender waits for the process,
+    # otherwise V-Ray will lose its output pipe
+    #
+    def setCaptureOutput(self, captureOutput, logFilepath=None):
+        self.captureOutput = captureOutput
+        self.logFilepath   = logFilepath
+
+    def setProgressCallback(self, callback):
+        self.progressCallback = callback
+
     def setRtEngine(self, deviceType, SettingsRTEngine):
         DEVICE = {
             'OPENCL' : 3,
@@ -226,6 +254,9 @@ class VRayProcess:
             cmd.append('-rtNoise=%.3f'     % self.rtNoise)
             cmd.append('-rtSampleLevel=%i' % self.rtSampleLevel)
 
+        for parameterOverride in self.parameterOverrides:
+            cmd.append('-parameterOverride=%s' % PathUtils.Quotes(parameterOverride))
+
         cmd.append('-sceneFile=%s' % PathUtils.Quotes(self.sceneFile))
 
         return cmd
@@ -289,13 +320,85 @@ class VRayProcess:
         os.environ['VRAY_VFB_THEME_FILE'] = vfbThemeFilepath
 
         if self.autorun:
-            self.process = subprocess.Popen(cmd)
+            if self.captureOutput:
+                self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                self.readerThread = threading.Thread(target=self._readOutput, args=(self.process, cmd))
+                self.readerThread.daemon = True
+                self.readerThread.start()
+            else:
+                self.process = subprocess.Popen(cmd)
+
             if self.waitExit:
+                if self.captureOutput:
+                    while self.is_running():
+                        self.processEvents()
+                        time.sleep(0.1)
+                    self.processEvents()
                 errCode = self.process.wait()
 
         return errCode
 
 
+    # Reader thread: echoes output to the console, parses progress events
+    # and saves the log when the process exits
+    #
+    def _readOutput(self, process, cmd):
+        parser = VRayLog.VRayLogParser()
+        log = {
+            'command' : cmd,
+            'start'   : time.time(),
+            'events'  : [],
+        }
+
+        pending = b""
+        for chunk in iter(lambda: process.stdout.read1(4096), b""):
+            if hasattr(sys.stdout, 'buffer'):
+                sys.stdout.buffer.write(chunk)
+            else:
+                sys.stdout.write(chunk.decode('utf-8', 'replace'))
+            sys.stdout.flush()
+
+            # Progress lines are updated in place with '\r'
+            lines = (pending + chunk).replace(b"\r", b"\n").split(b"\n")
+            pending = lines.pop()
+
+            for line in lines:
+                self._parseLine(parser, log, line)
+
+        self._parseLine(parser, log, pending)
+
+        process.stdout.close()
+
+        log['end']      = time.time()
+        log['exitCode'] = process.wait()
+
+        if self.logFilepath:
+            try:
+                VRayLog.SaveLog(self.logFilepath, log)
+            except OSError as e:
+                debug.PrintError("Error saving render log \"%s\": %s" % (self.logFilepath, e))
+
+
+    def _parseLine(self, parser, log, line):
+        event = parser.parseLine(line.decode('utf-8', 'replace'))
+        if event:
+            log['events'].append(event)
+            self.events.put(event)
+
+
+    # Passes parsed progress events to the callback;
+    # should be called from the main thread
+    #
+    def processEvents(self):
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return
+            if self.progressCallback:
+                self.progressCallback(event)
+
+
     def kill(self):
         if self.is_running():
             self.process.terminate()
@@ -308,3 +411,93 @@ class VRayProcess:
         if self.process.poll() is None:
             return True
         return False
+
+
+    # Returns exit code of the finished process or None
+    #
+    def getExitCode(self):
+        if self.process is None:
+            return None
+        return self.process.poll()
+
+
+# Runs up to 'maxProcesses' V-Ray processes at once.
+# Used to render frame N while exporting frame N+1.
+#
+# Non-zero exit codes are collected into 'failures' as (name, exitCode),
+# where name is passed to run() (frame number, bake job name, etc).
+#
+class VRayProcessPool:
+    def __init__(self, maxProcesses=1):
+        self.maxProcesses = max(1, maxProcesses)
+        self.processes = []
+        self.failures  = []
+
+    def _checkExitCode(self, p, name):
+        exitCode = p.getExitCode()
+        if exitCode:
+            debug.PrintError("V-Ray process \"%s\" exited with code %i" % (name, exitCode))
+            self.failures.append((name, exitCode))
+
+    def _cleanup(self):
+        running = []
+        for p, name in self.processes:
+            p.processEvents()
+            if p.is_running():
+                running.append((p, name))
+            else:
+                self._checkExitCode(p, name)
+        self.processes = running
+
+    def waitSlot(self, isAborted=None):
+        while True:
+            self._cleanup()
+            if len(self.processes) < self.maxProcesses:
+                return True
+            if isAborted and isAborted():
+                return False
+            time.sleep(0.1)
+
+    def hasFailures(self):
+        return bool(self.failures)
+
+    # Returns failures description for the error report
+    #
+    def getFailuresReport(self):
+        return ", ".join("%s (exit code %i)" % (name, exitCode) for name, exitCode in self.failures)
+
+    # Starts process when there is a free slot;
+    # returns None if aborted or some process has failed
+    #
+    def run(self, p, isAborted=None, name=None):
+        if not self.waitSlot(isAborted):
+            return None
+        if self.failures:
+            return None
+
+        if name is None:
+            name = p.sceneFile
+
+        p.setWaitExit(False)
+
+        errCode = p.run()
+        if p.is_running():
+            self.processes.append((p, name))
+        else:
+            self._checkExitCode(p, name)
+
+        return errCode
+
+    def wait(self, isAborted=None):
+        while True:
+            self._cleanup()
+            if not self.processes:
+                return True
+            if isAborted and isAborted():
+                return False
+            time.sleep(0.1)
+
+    def kill(self):
+        for p, name in self.processes:
+            p.kill()
+        self.processes = []
@@ -0,0 +1,101 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+# Plugin descriptions list (as returned by ParseVrscene / ParseVrmat) with
+# lookup indices. Importers resolve every plugin reference by name, so
+# with plain list scans importing large material libraries is quadratic.
+#
+# NOTE: Indices are built once; the list is not expected to change after that.
+#
+class VRaySceneDict(list):
+    def __init__(self, pluginDescs=()):
+        super().__init__(pluginDescs)
+
+        self.byName = {}
+        self.byType = {}
+
+        for pluginDesc in self:
+            # First description wins, like with the list scan
+            self.byName.setdefault(pluginDesc['Name'], pluginDesc)
+            self.byType.setdefault(pluginDesc['ID'], []).append(pluginDesc)
+
+    def getPluginByName(self, pluginName):
+        return self.byName.get(pluginName)
+
+    def getPluginByType(self, pluginID):
+        pluginDescs = self.byType.get(pluginID)
+        return pluginDescs[0] if pluginDescs else None
+
+    def getPluginsByType(self, pluginID):
+        return self.byType.get(pluginID, [])
+
+
+def GetVRaySceneDict(pluginDescs):
+    if isinstance(pluginDescs, VRaySceneDict):
+        return pluginDescs
+    return VRaySceneDict(pluginDescs)
+
+
+def GetPluginByName(vrsceneDict, pluginName):
+    if isinstance(vrsceneDict, VRaySceneDict):
+        return vrsceneDict.getPluginByName(pluginName)
+    for pluginDesc in vrsceneDict:
+        if pluginDesc['Name'] == pluginName:
+            return pluginDesc
+    return None
+
+
+def GetPluginByType(vrsceneDict, pluginID):
+    if isinstance(vrsceneDict, VRaySceneDict):
+        return vrsceneDict.getPluginByType(pluginID)
+    for pluginDesc in vrsceneDict:
+        if pluginDesc['ID'] == pluginID:
+            return pluginDesc
+    return None
+
+
+# Attribute name -> parameter description maps,
+# keyed by the parameters list id: (pluginParams, paramsLength, attrMap)
+# The list itself is kept to make sure the id is not reused.
+#
+ParamDescIndex = {}
+
+
+def GetParamDescMap(pluginParams):
+    key = id(pluginParams)
+
+    index = ParamDescIndex.get(key)
+    if index is None or index[1] != len(pluginParams):
+        attrMap = {}
+        for paramDesc in pluginParams:
+            attrMap.setdefault(paramDesc['attr'], paramDesc)
+        index = (pluginParams, len(pluginParams), attrMap)
+        ParamDescIndex[key] = index
+
+    return index[2]
+
+
+def GetParamDesc(pluginParams, attrName):
+    return GetParamDescMap(pluginParams).get(attrName)
@@ -0,0 +1,403 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import mmap
+import os
+import re
+import struct
+import zlib
+
+from vb30 import debug
+
+from . import ListUtils
+
+
+# Streaming .vrscene reader.
+#
+# The file is memory mapped and only plugin headers are scanned; attribute
+# bodies are parsed for plugins passing the filter, so pulling a few materials
+# out of a scene with embedded geometry doesn't load the geometry.
+#
+# Parsed values:
+#   numbers -> int / float, strings -> str, plugin references -> str,
+#   Color / AColor / Vector -> tuple, Matrix -> tuple of column tuples,
+#   Transform -> (Matrix, Vector),
+#   TransformHex / MatrixHex -> uncompressed hex string (as the importer
+#   and the old ParseVrscene() expect it),
+#   lists (including hex and compressed ones) -> list,
+#   interpolate(...) -> value of the first key.
+#
+# Values that can't be parsed are reported and skipped.
+#
+
+# Values larger than this (in bytes) are read only when accessed
+LazyValueSize = 64 * 1024
+
+PluginHeaderRe = re.compile(rb'([A-Za-z_][A-Za-z0-9_]*)[ \t\r\n]+([^\s{]+)[ \t\r\n]*\{')
+IncludeRe      = re.compile(rb'#include[ \t]+"([^"\r\n]*)"')
+AttrNameRe     = re.compile(rb'[ \t\r\n]*([A-Za-z_][A-Za-z0-9_]*)[ \t\r\n]*=')
+BlockEndRe     = re.compile(rb'[}"]')
+ValueEndRe     = re.compile(rb'[;"]')
+SpaceRe        = re.compile(rb'[ \t\r\n]*')
+
+TokenRe = re.compile(r'''\s*(?:
+    (?P<str>"(?:[^"\\]|\\.)*")|
+    (?P<num>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?(?![^\s=;,()"]))|
+    (?P<punct>[(),])|
+    (?P<word>[^\s=;,()"]+)
+)''', re.VERBOSE)
+
+
+# Value that is parsed from the file on the first access
+#
+class VRaySceneLazyValue:
+    def __init__(self, filepath, attrName, start, end):
+        self.filepath = filepath
+        self.attrName = attrName
+        self.start    = start
+        self.end      = end
+
+    def get(self):
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.start)
+            data = f.read(self.end - self.start)
+        return ParseAttributeValue(data.decode('utf-8', 'replace'), self.attrName)
+
+
+# Plugin attributes; lazy values are resolved on access
+#
+class VRaySceneAttributes(dict):
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) is VRaySceneLazyValue:
+            value = value.get()
+            if value is None:
+                # Malformed value is dropped, same as eagerly parsed ones
+                dict.__delitem__(self, key)
+                raise KeyError(key)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        items = []
+        for key in list(dict.keys(self)):
+            try:
+                items.append((key, self[key]))
+            except KeyError:
+                pass
+        return items
+
+    def values(self):
+        return [value for key, value in self.items()]
+
+
+##     ##    ###    ##       ##     ## ########  ######
+##     ##   ## ##   ##       ##     ## ##       ##    ##
+##     ##  ##   ##  ##       ##     ## ##       ##
+##     ## ##     ## ##       ##     ## ######    ######
+ ##   ##  ######### ##       ##     ## ##             ##
+  ## ##   ##     ## ##       ##     ## ##       ##    ##
+   ###    ##     ## ########  #######  ########  ######
+
+def Tokenize(s):
+    tokens = []
+    pos = 0
+    end = len(s)
+    while pos < end:
+        m = TokenRe.match(s, pos)
+        if m is None or m.end() == pos:
+            break
+        pos = m.end()
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind)))
+    return tokens
+
+
+def GetNumber(s):
+    try:
+        return int(s)
+    except ValueError:
+        return float(s)
+
+
+def GetString(s):
+    return s[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+
+
+# Returns (value, next token index)
+#
+def ParseTokens(tokens, i):
+    kind, token = tokens[i]
+
+    if kind == 'str':
+        return GetString(token), i+1
+
+    if kind == 'num':
+        return GetNumber(token), i+1
+
+    if kind == 'punct':
+        if token != '(':
+            raise ValueError("Unexpected '%s'" % token)
+        args, i = ParseArgs(tokens, i)
+        return tuple(args), i
+
+    # Plugin reference or identifier
+    if i+1 >= len(tokens) or tokens[i+1] != ('punct', '('):
+        return token, i+1
+
+    args, i = ParseArgs(tokens, i+1)
+
+    if token.endswith("Hex"):
+        data = ListUtils.DecodeHex(args[0]) if args else b""
+        listType = token[:-3]
+        if listType in ListUtils.ListTypes:
+            return ListUtils.UnpackValues(listType, data), i
+        # TransformHex, MatrixHex, etc.
+        return ListUtils.GetHex(data), i
+
+    if token == 'interpolate':
+        # First key value: interpolate((frame, value), ...)
+        return args[0][1] if args and len(args[0]) > 1 else None, i
+
+    if token.startswith('List'):
+        return list(args), i
+
+    if token == 'Transform':
+        return (args[0], args[1]), i
+
+    return tuple(args), i
+
+
+def ParseArgs(tokens, i):
+    args = []
+    # Skip '('
+    i += 1
+    while i < len(tokens):
+        if tokens[i] == ('punct', ')'):
+            return args, i+1
+        if tokens[i] == ('punct', ','):
+            i += 1
+            continue
+        value, i = ParseTokens(tokens, i)
+        args.append(value)
+    raise ValueError("Unexpected end of value")
+
+
+def ParseValue(s):
+    tokens = Tokenize(s)
+    if not tokens:
+        return None
+    value, i = ParseTokens(tokens, 0)
+    return value
+
+
+# Same as ParseValue(), but reports malformed value and returns None
+#
+def ParseAttributeValue(s, attrName):
+    try:
+        return ParseValue(s)
+    except (ValueError, IndexError, struct.error, zlib.error) as e:
+        debug.PrintError('Error parsing attribute "%s": %s' % (attrName, e))
+    return None
+
+
+ ######   ######     ###    ##    ##
+##    ## ##    ##   ## ##   ###   ##
+##       ##        ##   ##  ####  ##
+ ######  ##       ##     ## ## ## ##
+      ## ##       ######### ##  ####
+##    ## ##    ## ##     ## ##   ###
+ ######   ######  ##     ## ##    ##
+
+# Returns position after the closing quote
+#
+def SkipString(data, pos):
+    while True:
+        end = data.find(b'"', pos)
+        if end == -1:
+            return len(data)
+        # Count escaping backslashes
+        slashes = 0
+        while end - slashes - 1 >= pos and data[end-slashes-1:end-slashes] == b'\\':
+            slashes += 1
+        if slashes % 2 == 0:
+            return end + 1
+        pos = end + 1
+
+
+# Finds 'until' character skipping quoted strings
+#
+def FindOutsideString(data, pos, endPos, untilRe):
+    while True:
+        m = untilRe.search(data, pos, endPos)
+        if m is None:
+            return -1
+        if data[m.start():m.start()+1] != b'"':
+            return m.start()
+        pos = SkipString(data, m.start()+1)
+
+
+def SkipLine(data, pos):
+    end = data.find(b'\n', pos)
+    return len(data) if end == -1 else end + 1
+
+
+# Yields (filepath, pluginID, pluginName, bodyStart, bodyEnd)
+# for every plugin in the file (and included files)
+#
+def ScanVrscene(filepath, followIncludes=True, _visited=None):
+    if _visited is None:
+        _visited = set()
+
+    filepath = os.path.normpath(os.path.abspath(filepath))
+    if filepath in _visited or not os.path.isfile(filepath) or not os.path.getsize(filepath):
+        return
+    _visited.add(filepath)
+
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        pos  = 0
+        size = len(data)
+
+        while pos < size:
+            pos = SpaceRe.match(data, pos).end()
+            if pos >= size:
+                break
+
+            lead = data[pos:pos+2]
+
+            if lead == b'//':
+                pos = SkipLine(data, pos)
+
+            elif lead == b'/*':
+                end = data.find(b'*/', pos+2)
+                pos = size if end == -1 else end + 2
+
+            elif lead[:1] == b'#':
+                m = IncludeRe.match(data, pos)
+                if m and followIncludes:
+                    includeFilepath = m.group(1).decode('utf-8', 'replace')
+                    if not os.path.isabs(includeFilepath):
+                        includeFilepath = os.path.join(os.path.dirname(filepath), includeFilepath)
+                    yield from ScanVrscene(includeFilepath, followIncludes, _visited)
+                pos = SkipLine(data, pos)
+
+            else:
+                m = PluginHeaderRe.match(data, pos)
+                if m is None:
+                    pos = SkipLine(data, pos)
+                    continue
+
+                bodyStart = m.end()
+                bodyEnd   = FindOutsideString(data, bodyStart, size, BlockEndRe)
+                if bodyEnd == -1:
+                    bodyEnd = size
+
+                yield (
+                    filepath,
+                    m.group(1).decode('utf-8', 'replace'),
+                    m.group(2).decode('utf-8', 'replace'),
+                    bodyStart,
+                    bodyEnd,
+                )
+
+                pos = bodyEnd + 1
+
+
+def ParseAttributes(filepath, data, bodyStart, bodyEnd, lazySize=LazyValueSize):
+    pluginAttrs = VRaySceneAttributes()
+
+    pos = bodyStart
+    while pos < bodyEnd:
+        m = AttrNameRe.match(data, pos, bodyEnd)
+        if m is None:
+            break
+
+        valueStart = m.end()
+        valueEnd   = FindOutsideString(data, valueStart, bodyEnd, ValueEndRe)
+        if valueEnd == -1:
+            valueEnd = bodyEnd
+
+        attrName = m.group(1).decode('ascii')
+
+        if lazySize and valueEnd - valueStart > lazySize:
+            dict.__setitem__(pluginAttrs, attrName, VRaySceneLazyValue(filepath, attrName, valueStart, valueEnd))
+        else:
+            value = ParseAttributeValue(data[valueStart:valueEnd].decode('utf-8', 'replace'), attrName)
+            if value is not None:
+                dict.__setitem__(pluginAttrs, attrName, value)
+
+        pos = valueEnd + 1
+
+    return pluginAttrs
+
+
+# Yields plugin descriptions {'ID', 'Name', 'Attributes'}.
+#
+# @pluginFilter - set of plugin IDs or callable(pluginID, pluginName);
+#                 attributes of other plugins are not parsed at all
+#
+def IterVrscene(filepath, pluginFilter=None, followIncludes=True, lazySize=LazyValueSize):
+    if pluginFilter is None:
+        usePlugin = None
+    elif callable(pluginFilter):
+        usePlugin = pluginFilter
+    else:
+        usePlugin = lambda pluginID, pluginName: pluginID in pluginFilter
+
+    openFilepath = None
+    openFile     = None
+    data         = None
+
+    try:
+        for plugFilepath, pluginID, pluginName, bodyStart, bodyEnd in ScanVrscene(filepath, followIncludes):
+            if usePlugin and not usePlugin(pluginID, pluginName):
+                continue
+
+            if plugFilepath != openFilepath:
+                if data is not None:
+                    data.close()
+                    openFile.close()
+                openFilepath = plugFilepath
+                openFile     = open(plugFilepath, 'rb')
+                data         = mmap.mmap(openFile.fileno(), 0, access=mmap.ACCESS_READ)
+
+            yield {
+                'ID'         : pluginID,
+                'Name'       : pluginName,
+                'Attributes' : ParseAttributes(plugFilepath, data, bodyStart, bodyEnd, lazySize),
+            }
+    finally:
+        if data is not None:
+            data.close()
+            openFile.close()
+
+
+def ParseVrsceneFiltered(filepath, pluginFilter=None, followIncludes=True):
+    return list(IterVrscene(filepath, pluginFilter, followIncludes))
@@ -27,13 +27,16 @@ import mathutils
 
 import time
 import datetime
+import hashlib
 import os
 import sys
 
-from vb30.debug import Debug
+from vb30.debug import Debug, GetProfiler
 
 from . import LibUtils, PathUtils, SysUtils, BlenderUtils
 from . import PluginUtils
+from . import ListUtils
+from . import VRayKeyframes
 
 
 PluginTypeToFile = {
@@ -57,6 +60,39 @@ NoAttrPlugins = {
     'FilterCatmullRom',
 }
 
+# SettingsOutput.img_format to file extension
+ImageFormatExtensions = {
+    '0' : "png",
+    '1' : "jpg",
+    '2' : "tiff",
+    '3' : "tga",
+    '4' : "sgi",
+    '5' : "exr",
+    '6' : "vrimg",
+}
+
+# Output buffer size for *.vrscene files.
+# Data is flushed to disk once per frame (see VRayExportFiles.flush())
+DefaultBufferSize = 4 * 1024 * 1024
+
+
+# Returns plugin block in .vrscene format.
+# Plugins have only a few attributes, so in-place string
+# concatenation is faster than collecting parts for join().
+#
+def FormatPluginBlock(pluginID, pluginName, pluginAttrs):
+    p = "\n%s %s {" % (pluginID, pluginName)
+    for attrName in sorted(pluginAttrs):
+        p += "\n\t%s=%s;" % (attrName, pluginAttrs[attrName])
+    p += "\n}\n"
+    return p
+
+
+# Returns keyframes list [(frame, value), ...] in .vrscene format
+#
+def FormatKeyframes(keys):
+    return "interpolate(%s)" % ",".join("(%i,%s)" % (frame, LibUtils.FormatValue(value)) for frame, value in keys)
+
 
 ########     ###    ######## ##     ##  ######
 ##     ##   ## ##      ##    ##     ## ##    ##
@@ -199,16 +235,7 @@ class VRayFilePaths:
                 self.imgDirectory = PathUtils.CreateDirectory(output_filepath)
 
                 # Render output file name
-                img_format = {
-                    '0' : "png",
-                    '1' : "jpg",
-                    '2' : "tiff",
-                    '3' : "tga",
-                    '4' : "sgi",
-                    '5' : "exr",
-                    '6' : "vrimg",
-                }
-                ext = img_format[SettingsOutput.img_format]
+                ext = ImageFormatExtensions[SettingsOutput.img_format]
 
                 file_name = "render"
                 if SettingsOutput.img_file:
@@ -224,6 +251,69 @@ class VRayFilePaths:
                 self.imgLoadFilename = "%s.%s" % (load_file_name, ext)
 
 
+########  ######     ###     ######  ##     ## ########
+##       ##    ##   ## ##   ##    ## ##     ## ##
+##       ##        ##   ##  ##       ##     ## ##
+######   ##       ##     ## ##       ######### ######
+##       ##       ######### ##       ##     ## ##
+##       ##    ## ##     ## ##    ## ##     ## ##
+########  ######  ##     ##  ######  ##     ## ########
+
+# Splits .vrscene data into plugin blocks;
+# yields (isPlugin, data), data outside of plugin blocks
+# is yielded line by line
+#
+def IterPluginBlocks(f):
+    block = None
+    for line in f:
+        if block is None:
+            if line.rstrip().endswith("{"):
+                block = [line]
+            else:
+                yield False, line
+        else:
+            block.append(line)
+            if line.strip() == "}":
+                yield True, "".join(block)
+                block = None
+    if block:
+        yield False, "".join(block)
+
+
+# Removes least recently used files from the geometry cache
+# until its size fits 'maxSize' bytes
+#
+# @keep - file names used by the current export
+#
+def EvictGeometryCache(cacheDir, maxSize, keep=()):
+    if not os.path.isdir(cacheDir):
+        return
+
+    cacheSize = 0
+    entries   = []
+    for entry in os.scandir(cacheDir):
+        if not entry.name.endswith(".vrscene") or not entry.is_file():
+            continue
+        stat = entry.stat()
+        cacheSize += stat.st_size
+        if entry.name not in keep:
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    # Oldest first; file time is updated on every use
+    entries.sort()
+
+    for mtime, size, filepath in entries:
+        if cacheSize <= maxSize:
+            break
+        try:
+            os.remove(filepath)
+        except OSError as e:
+            Debug("Error removing cached geometry \"%s\": %s" % (filepath, e), msgType='ERROR')
+            continue
+        Debug("Geometry cache: removed %s" % os.path.basename(filepath))
+        cacheSize -= size
+
+
 ######## #### ##       ########  ######
 ##        ##  ##       ##       ##    ##
 ##        ##  ##       ##       ##
@@ -258,6 +348,18 @@ class VRayExportFiles:
         # Use this prefix instead of directory path
         self.explicitPrefix = None
 
+        # Output files buffer size
+        self.bufferSize = DefaultBufferSize
+
+        # Final files paths; with geometry cache geometry is written
+        # into temporary file first
+        self.filepaths = {}
+
+        # Store geometry plugins in content addressed cache directory
+        self.geometryCacheDir = None
+        # Max. geometry cache size in bytes; None - no limit
+        self.geometryCacheSize = None
+
     def setSeparateFiles(self, separateFiles):
         self.setSeparateFiles = separateFiles
 
@@ -273,17 +375,93 @@ class VRayExportFiles:
     def setPrefix(self, prefix):
         self.explicitPrefix = prefix
 
+    def setBufferSize(self, bufferSize):
+        self.bufferSize = bufferSize
+
+    def setGeometryCacheDir(self, geometryCacheDir):
+        self.geometryCacheDir = geometryCacheDir
+
+    def setGeometryCacheSize(self, geometryCacheSize):
+        self.geometryCacheSize = geometryCacheSize
+
+    def useGeometryCache(self, fileType):
+        return self.geometryCacheDir and fileType == 'geometry'
+
+    def _openFile(self, fileType, filepath, fmode):
+        self.filepaths[fileType] = filepath
+        if fmode == 'w' and self.useGeometryCache(fileType):
+            filepath = "%s.tmp" % filepath
+        return open(filepath, fmode, buffering=self.bufferSize)
+
+    # Returns path to use in #include
+    #
+    def getIncludePath(self, filepath):
+        try:
+            relpath = os.path.relpath(filepath, self.exportDir)
+        except ValueError:
+            # Different drive
+            return filepath
+        if relpath.startswith(os.pardir):
+            return filepath
+        if self.explicitPrefix:
+            return os.path.join(self.explicitPrefix, relpath)
+        if self.includeRelative:
+            return relpath
+        return filepath
+
+    # Stores every geometry plugin in the cache directory under its data hash
+    # and makes geometry file include them.
+    # Unchanged plugins are not written again and identical plugins
+    # are stored once.
+    #
+    def _commitGeometry(self, tmpFilepath, filepath):
+        cacheDir = PathUtils.CreateDirectory(self.geometryCacheDir)
+
+        usedFilenames = set()
+        numStored     = 0
+
+        with open(tmpFilepath, 'r') as f, open(filepath, 'w', buffering=self.bufferSize) as geometryFile:
+            for isPlugin, data in IterPluginBlocks(f):
+                if not isPlugin:
+                    geometryFile.write(data)
+                    continue
+
+                cacheFilename = "%s.vrscene" % hashlib.md5(data.encode('utf-8')).hexdigest()
+                if cacheFilename in usedFilenames:
+                    continue
+                usedFilenames.add(cacheFilename)
+
+                cacheFilepath = os.path.join(cacheDir, cacheFilename)
+                if os.path.exists(cacheFilepath):
+                    # Mark as recently used
+                    os.utime(cacheFilepath, None)
+                else:
+                    with open("%s.tmp" % cacheFilepath, 'w') as cacheFile:
+                        cacheFile.write(data)
+                    os.replace("%s.tmp" % cacheFilepath, cacheFilepath)
+                    numStored += 1
+
+                geometryFile.write('#include "%s"\n' % self.getIncludePath(cacheFilepath))
+
+        os.remove(tmpFilepath)
+
+        Debug("Geometry cache: %i plugins, %i stored" % (len(usedFilenames), numStored))
+
+        if self.geometryCacheSize:
+            EvictGeometryCache(cacheDir, self.geometryCacheSize, usedFilenames)
+
     def getPathManager(self):
         return self.pm
 
     def init(self):
-        self.files = {}
+        self.files     = {}
+        self.filepaths = {}
 
         if not self.separateFiles:
             filename = "%s.vrscene" % self.baseName
             filepath = os.path.join(self.exportDir, filename)
 
-            self.files['scene'] = open(filepath, 'w')
+            self.files['scene'] = self._openFile('scene', filepath, 'w')
         else:
             for pluginType in PluginTypeToFile:
                 fileType = PluginTypeToFile[pluginType]
@@ -297,7 +475,7 @@ class VRayExportFiles:
                 if fileType == 'geometry' and not self.overwriteGeometry:
                     fmode = 'r'
 
-                self.files[fileType] = open(filepath, fmode)
+                self.files[fileType] = self._openFile(fileType, filepath, fmode)
 
         self.writeHeaders()
 
@@ -328,18 +506,17 @@ class VRayExportFiles:
             if fileType == 'scene':
                 continue
 
-            f = self.files[fileType]
-            filepath = f.name
-            filename = os.path.basename(filepath)
+            mainFile.write('\n#include "%s"' % self.getIncludePath(self.filepaths[fileType]))
+        mainFile.write('\n')
 
-            includeFilepath = filepath
-            if self.includeRelative:
-                includeFilepath = filename
-            if self.explicitPrefix:
-                includeFilepath = os.path.join(self.explicitPrefix, filename)
 
-            mainFile.write('\n#include "%s"' % includeFilepath)
-        mainFile.write('\n')
+    def flush(self):
+        if not self.files:
+            return
+        for fileType in self.files:
+            f = self.files[fileType]
+            if f and not f.closed and f.writable():
+                f.flush()
 
 
     def closeFiles(self):
@@ -351,6 +528,13 @@ class VRayExportFiles:
             if f and not f.closed:
                 f.close()
 
+        for fileType in self.files:
+            f = self.files[fileType]
+            if f.mode != 'w':
+                continue
+            if self.useGeometryCache(fileType):
+                self._commitGeometry(f.name, self.filepaths[fileType])
+
 
     def getFileByPluginType(self, pluginType):
         if not self.separateFiles:
@@ -368,10 +552,10 @@ class VRayExportFiles:
 
 
     def getOutputFilepath(self, pluginType=None):
-        f = self.getOutputFile(pluginType)
-        if f:
-            return f.name
-        return None
+        fileType = 'scene'
+        if self.separateFiles and pluginType:
+            fileType = PluginTypeToFile[pluginType]
+        return self.filepaths.get(fileType)
 
 
 ######## ##     ## ########   #######  ########  ########
@@ -394,7 +578,13 @@ class VRayPluginExporter:
 
         # Param cache
         # Used to export only changed attributes
-        self.pluginCache = dict()
+        self.pluginCache = VRayKeyframes.VRayKeyframeCache()
+        # Cache id of the currently processed plugin and
+        # if the plugin has no cached values yet
+        self.pluginCacheId  = None
+        self.pluginCacheNew = False
+        # Used to drop linearly interpolated keyframes
+        self.keyframeReducer = None
         # Used to export data only once per frame
         self.namesCache  = set()
 
@@ -411,6 +601,9 @@ class VRayPluginExporter:
         self.isPreview   = False
         self.imgFile     = ""
 
+        # List data format: 'ZIP', 'HEX' or 'ASCII'
+        self.dataFormat  = 'ASCII'
+
     def setAnimation(self, animation):
         self.isAnimation = animation
 
@@ -423,16 +616,41 @@ class VRayPluginExporter:
     def setFrameStep(self, frameStep):
         self.frameStep = frameStep
 
+    # @epsilon - max allowed deviation of the dropped keyframe value;
+    #            None disables keyframe reduction
+    #
+    def setKeyframeReduction(self, epsilon):
+        self.keyframeReducer = None
+        if epsilon is not None:
+            self.keyframeReducer = VRayKeyframes.VRayKeyframeReducer(epsilon)
+
+    # @tolerance - float values that differ from the last exported
+    #              value less then tolerance are not exported
+    #
+    def setKeyframeTolerance(self, tolerance):
+        self.pluginCache.setTolerance(tolerance)
+
     def setFrame(self, frame):
+        # Previous frame data is complete - write it out
+        if self.fileManager:
+            self.fileManager.flush()
+
         self.frameNumber = frame
         self.namesCache  = set()
 
+        profiler = GetProfiler()
+        if profiler:
+            profiler.setFrame(frame)
+
     def setFileManager(self, fm):
         self.fileManager = fm
 
     def setPreview(self, isPreview):
         self.isPreview = isPreview
 
+    def setDataFormat(self, dataFormat):
+        self.dataFormat = dataFormat
+
     def isPreviewRender(self):
         return self.isPreview
 
@@ -447,6 +665,8 @@ class VRayPluginExporter:
         self.pluginName  = pluginName
         self.pluginAttrs = {}
 
+        self.pluginCacheId = None
+
 
     # Useless right now; keep for compatibility
     #
@@ -461,32 +681,18 @@ class VRayPluginExporter:
     # This function will fill pluginAttrs dict
     # Actual write is perfomed by writeFooter
     #
-    # self.pluginCache = {
-    #   'PluginName' : {
-    #       'attrName': (frameNumber, attrValue),
-    #       ...
-    #   },
-    #   ...
-    # }
+    # In animation mode last exported values are stored in
+    # self.pluginCache (see VRayKeyframes.VRayKeyframeCache)
     #
-    def _getCachedValue(self, attrName):
-        if self.pluginName not in self.pluginCache:
-            self.pluginCache[self.pluginName] = {}
-            return None,None
-        if attrName in self.pluginCache[self.pluginName]:
-            attrCache = self.pluginCache[self.pluginName][attrName]
-            return attrCache[0], attrCache[1]
-        return None,None
-
-    def _storeValueInCache(self, attrName, attrValue):
-        self.pluginCache[self.pluginName][attrName] = (self.frameNumber, attrValue)
-
     def writeAttibute(self, attrName, val):
         # Could also mean that plugin is already exported
         #
         if not self.pluginID and not self.pluginName:
             return
 
+        if type(val) is ListUtils.ListValue:
+            val = ListUtils.FormatList(val, self.dataFormat)
+
         # If it's not an animation export simply write attr value
         #
         if not self.isAnimation:
@@ -495,19 +701,55 @@ class VRayPluginExporter:
         # If it's an animation we should check the cache and export
         # new value or ever create a keyframe
         #
-        else:
-            newValue = LibUtils.FormatValue(val)
-            cFrame, cValue = self._getCachedValue(attrName)
+        elif self.keyframeReducer and VRayKeyframes.IsReducible(val):
+            keys = self.keyframeReducer.add(self.pluginType, self.pluginID, self.pluginName, attrName, self.frameNumber, val)
+            if keys:
+                self.pluginAttrs[attrName] = FormatKeyframes(keys)
+
+            # Attribute could get a non-reducible value later,
+            # it has to be compared with this value, not the cached one
+            if self.pluginCacheId is None:
+                self.pluginCacheId  = self.pluginCache.getPluginId(self.pluginName)
+                self.pluginCacheNew = self.pluginCache.isNewPlugin(self.pluginCacheId)
+            if not self.pluginCacheNew:
+                self.pluginCache.remove(self.pluginCacheId, attrName)
 
+        else:
             attrValue = None
 
-            if cValue is None:
-                attrValue  = "interpolate((%i,%s))" % (self.frameNumber, newValue)
+            if self.pluginCacheId is None:
+                self.pluginCacheId  = self.pluginCache.getPluginId(self.pluginName)
+                self.pluginCacheNew = self.pluginCache.isNewPlugin(self.pluginCacheId)
+
+            slot = None
+            if not self.pluginCacheNew:
+                slot = self.pluginCache.compare(self.pluginCacheId, attrName, val)
+
+            if slot is None:
+                newValue  = LibUtils.FormatValue(val)
+                attrValue = "interpolate((%i,%s))" % (self.frameNumber, newValue)
+
+                # Attribute had reducible values before - write
+                # the last of them
+                if self.keyframeReducer:
+                    keys = self.keyframeReducer.pop(self.pluginName, attrName)
+                    if keys:
+                        attrValue = FormatKeyframes(keys + [(self.frameNumber, val)])
+
+                # Store in cache
+                self.pluginCache.add(self.pluginCacheId, attrName, self.frameNumber, val)
             else:
-                if newValue == cValue:
+                if slot == VRayKeyframes.SLOT_UNCHANGED:
                     # New value is the same no need to export
                     return
+
+                newValue = LibUtils.FormatValue(val)
+                cValue   = self.pluginCache.getFormattedValue(slot)
+                if newValue == cValue:
+                    # Value differs, but not in the exported precision
+                    return
                 else:
+                    cFrame    = self.pluginCache.getFrame(slot)
                     prevFrame = self.frameNumber - self.frameStep
 
                     # Cached value is more then frame step back -
@@ -523,8 +765,7 @@ class VRayPluginExporter:
                     else:
                         attrValue  = "interpolate((%i,%s))" % (self.frameNumber, newValue)
 
-            # Store in cache
-            self._storeValueInCache(attrName, newValue)
+                self.pluginCache.store(self.pluginCacheId, attrName, self.frameNumber, val, slot)
 
             # Store value for writing
             self.pluginAttrs[attrName] = attrValue
@@ -546,10 +787,7 @@ class VRayPluginExporter:
         if not self.pluginAttrs and self.pluginID not in NoAttrPlugins:
             return
 
-        p = "\n%s %s {" % (self.pluginID, self.pluginName)
-        for attrName in sorted(self.pluginAttrs.keys()):
-            p += "\n\t%s=%s;" % (attrName, self.pluginAttrs[attrName])
-        p += "\n}\n"
+        p = FormatPluginBlock(self.pluginID, self.pluginName, self.pluginAttrs)
 
         outputFile = self.fileManager.getOutputFile(self.pluginType)
         if self.pluginID == 'VRayStereoscopicSettings':
@@ -557,6 +795,10 @@ class VRayPluginExporter:
 
         outputFile.write(p)
 
+        profiler = GetProfiler()
+        if profiler:
+            profiler.addPluginWrite(self.pluginID, len(p))
+
         # Reset current plugin
         self.pluginType  = None
         self.pluginID    = None
@@ -573,6 +815,24 @@ class VRayPluginExporter:
 
         self.fileManager.getFileByPluginType(pluginType).write(data)
 
+        profiler = GetProfiler()
+        if profiler:
+            profiler.addDataWrite(pluginType, len(data))
+
+
+    # Writes keyframes held by the keyframe reducer;
+    # must be called after the last animation frame is exported
+    #
+    def writePendingKeyframes(self):
+        if not self.keyframeReducer:
+            return
+
+        for pluginType, pluginID, pluginName, keys in self.keyframeReducer.flush():
+            self.set(pluginType, pluginID, pluginName)
+            for attrName in keys:
+                self.pluginAttrs[attrName] = FormatKeyframes([keys[attrName]])
+            self.writeFooter()
+
 
     def resetNamesCache(self):
         self.namesCache = set()
@@ -588,7 +848,7 @@ class VRayPluginExporter:
 
 class VRaySimplePluginExporter:
     def __init__(self, outputFilepath=None, outputFile=None):
-        self.output = outputFile if outputFile else open(outputFilepath, 'w')
+        self.output = outputFile if outputFile else open(outputFilepath, 'w', buffering=DefaultBufferSize)
 
         self.namesCache = set()
 
@@ -598,9 +858,15 @@ class VRaySimplePluginExporter:
         self.pluginName  = None
         self.pluginAttrs = None
 
+        # List data format: 'ZIP', 'HEX' or 'ASCII'
+        self.dataFormat  = 'ASCII'
+
     def __del__(self):
         self.done()
 
+    def setDataFormat(self, dataFormat):
+        self.dataFormat = dataFormat
+
     # Set params for currently exported plugin
     #
     def set(self, pluginType, pluginID, pluginName):
@@ -619,6 +885,8 @@ class VRaySimplePluginExporter:
         # Could also mean that plugin is already exported
         if not self.pluginID and not self.pluginName:
             return
+        if type(val) is ListUtils.ListValue:
+            val = ListUtils.FormatList(val, self.dataFormat)
         # Store value for writing
         self.pluginAttrs[attrName] = LibUtils.FormatValue(val)
 
@@ -631,10 +899,7 @@ class VRaySimplePluginExporter:
         if not self.pluginAttrs:
             return
 
-        p = "\n%s %s {" % (self.pluginID, PluginUtils.PluginName(self.pluginName))
-        for attrName in sorted(self.pluginAttrs.keys()):
-            p += "\n\t%s=%s;" % (attrName, self.pluginAttrs[attrName])
-        p += "\n}\n"
+        p = FormatPluginBlock(self.pluginID, PluginUtils.PluginName(self.pluginName), self.pluginAttrs)
 
         self.output.write(p)
 
@@ -32,6 +32,8 @@ import mathutils
 from vb30.plugins import PLUGINS_ID
 from vb30.lib     import AttributeUtils
 from vb30.lib     import PathUtils
+from vb30.lib     import VRaySceneDict
+from vb30.lib     import VRaySceneStream
 
 from vb30 import debug
 
@@ -67,25 +69,53 @@ def getOutputSocket(pluginID):
     return "Output"
 
 
+# Wrap parser results with this to get indexed lookups
+#
+def getVRaySceneDict(pluginDescs):
+    return VRaySceneDict.GetVRaySceneDict(pluginDescs)
+
+
+# Plugins needed to import materials: everything material and texture
+# related plus object nodes and displacement for ImportMaterialWithDisplacement
+#
+MaterialPluginTypes = {'MATERIAL', 'BRDF', 'TEXTURE', 'UVWGEN'}
+
+MaterialPluginIDs = {
+    'Node',
+    'GeomDisplacedMesh',
+    'BRDFLayered',
+    'TexLayered',
+    'BitmapBuffer',
+    'TexGradRamp',
+    'TexRemap',
+}
+
+
+def getMaterialPluginFilter():
+    pluginFilter = set(MaterialPluginIDs)
+    for pluginID, pluginModule in PLUGINS_ID.items():
+        if getattr(pluginModule, 'TYPE', None) in MaterialPluginTypes:
+            pluginFilter.add(pluginID)
+    return pluginFilter
+
+
+# Streams the .vrscene file parsing only plugins from the filter,
+# so huge scenes (with geometry) don't have to be loaded
+#
+def parseVrsceneFiltered(filePath, pluginFilter):
+    return getVRaySceneDict(VRaySceneStream.IterVrscene(filePath, pluginFilter))
+
+
 def getPluginByName(vrsceneDict, pluginName):
-    for pluginDesc in vrsceneDict:
-        if pluginDesc['Name'] == pluginName:
-            return pluginDesc
-    return None
+    return VRaySceneDict.GetPluginByName(vrsceneDict, pluginName)
 
 
 def getPluginByType(vrsceneDict, pluginID):
-    for pluginDesc in vrsceneDict:
-        if pluginDesc['ID'] == pluginID:
-            return pluginDesc
-    return None
+    return VRaySceneDict.GetPluginByType(vrsceneDict, pluginID)
 
 
 def getParamDesc(pluginParams, attrName):
-    for paramDesc in pluginParams:
-        if paramDesc['attr'] == attrName:
-            return paramDesc
-    return None
+    return VRaySceneDict.GetParamDesc(pluginParams, attrName)
 
 
 def getSocketName(pluginParams, attrName):
@@ -488,9 +518,8 @@ def createNode(ntree, prevNode, vrsceneDict, pluginDesc):
     pluginName  = pluginDesc['Name']
     pluginAttrs = pluginDesc['Attributes']
 
-    for n in ntree.nodes:
-        if n.name == pluginName:
-            return ntree.nodes[pluginName]
+    if pluginName in ntree.nodes:
+        return ntree.nodes[pluginName]
 
     if pluginID == 'TexLayered':
         return createNodeTexLayered(ntree, prevNode, vrsceneDict, pluginDesc)
@@ -525,6 +554,10 @@ def createNode(ntree, prevNode, vrsceneDict, pluginDesc):
         for attrName in pluginAttrs:
             attrValue = pluginAttrs[attrName]
 
+            # Malformed value, error is already reported by the parser
+            if attrValue is None:
+                continue
+
             # NOTE: Fixes vrscene exported from other applications using deprecated 'bump_tex'
             # attribute
             fixBump = False
@@ -22,6 +22,7 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import os
 import re
 import math
 import sys
@@ -33,7 +34,7 @@ import nodeitems_utils
 
 from vb30.plugins import PLUGINS, PLUGINS_ID
 from vb30.debug   import Debug, PrintDict
-from vb30.lib     import AttributeUtils, ClassUtils, CallbackUI, DrawUtils, LibUtils
+from vb30.lib     import AttributeUtils, BlenderUtils, ClassUtils, CallbackUI, DrawUtils, LibUtils
 from vb30.ui      import classes
 
 from .        import tree
@@ -510,12 +511,107 @@ def VRayNodeDrawLabel(self):
 
 DynamicClasses = []
 
+# Dynamic node classes that could be registered: {bl_idname : (pluginType, pluginName)}
+DynamicNodes = {}
 
-def LoadDynamicNodes():
+# Node tree ID property with the comma separated list of used node types;
+# stored on save, because nodes of unregistered types are loaded as "NodeUndefined"
+NodeTypesProperty = 'vray_node_types'
+
+
+# Lazy registration is opt-in (VRAY_FOR_BLENDER_LAZY_NODES=1) until loading files
+# with every node type through it is covered by tests
+#
+def UseLazyNodes():
+    if not bpy.app.background:
+        return False
+    return os.environ.get('VRAY_FOR_BLENDER_LAZY_NODES', '0') not in {'', '0'}
+
+
+def RegisterDynamicNode(pluginType, pluginName):
+    vrayPlugin  = PLUGINS[pluginType][pluginName]
+    textureMenuType = getattr(vrayPlugin, 'MENU', None)
+
+    DynNodeClassName = "VRayNode%s" % (pluginName)
+
+    DynNodeClassAttrs = {
+        'bl_idname' : DynNodeClassName,
+        'bl_label'  : vrayPlugin.NAME,
+        'bl_icon'   : VRayNodeTypeIcon.get(pluginType, 'VRAY_LOGO_MONO'),
+        'bl_menu'   : textureMenuType,
+
+        'init'             : VRayNodeInit,
+        'copy'             : VRayNodeCopy,
+        'free'             : VRayNodeFree,
+        'draw_buttons'     : VRayNodeDraw,
+        'draw_buttons_ext' : VRayNodeDrawSide,
+        'draw_label'       : VRayNodeDrawLabel,
+
+        'vray_type'   : bpy.props.StringProperty(default=pluginType),
+        'vray_plugin' : bpy.props.StringProperty(default=pluginName),
+    }
+
+    DynNodeClass = type(
+        DynNodeClassName,  # Name
+        (bpy.types.Node,), # Inheritance
+        DynNodeClassAttrs  # Attributes
+    )
+
+    if pluginName in  {'TexGradRamp', 'TexRemap', 'BitmapBuffer'}:
+        NodeUtils.CreateFakeTextureAttribute(DynNodeClass)
+
+    if pluginName == 'TexSoftbox':
+        NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_grad_vert')
+        NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_grad_horiz')
+        NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_grad_rad')
+        NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_frame')
+
+    bpy.utils.register_class(DynNodeClass)
+
+    ClassUtils.RegisterPluginPropertyGroup(DynNodeClass, vrayPlugin)
+
+    VRayNodeTypes[pluginType].append(getattr(bpy.types, DynNodeClassName))
+
+    DynamicClasses.append(DynNodeClass)
+
+
+# Registers dynamic node types from the list if they are not registered yet;
+# unknown and non-dynamic types are ignored.
+#
+def EnsureNodeTypes(nodeTypes):
+    for nodeType in nodeTypes:
+        if nodeType in DynamicNodes and not hasattr(bpy.types, nodeType):
+            RegisterDynamicNode(*DynamicNodes[nodeType])
+
+
+def EnsureAllNodeTypes():
+    EnsureNodeTypes(sorted(DynamicNodes))
+
+
+def GetUsedNodeTypes():
+    nodeTypes = set()
+    for nt in bpy.data.node_groups:
+        if not nt.bl_idname.startswith('VRayNodeTree'):
+            continue
+        treeNodeTypes = nt.get(NodeTypesProperty)
+        if treeNodeTypes is None:
+            if any(node.bl_idname == 'NodeUndefined' for node in nt.nodes):
+                # Saved without the node types list, so
+                # there is no way to tell what is needed
+                return None
+        else:
+            nodeTypes.update(treeNodeTypes.split(','))
+        nodeTypes.update(node.bl_idname for node in nt.nodes)
+    return nodeTypes
+
+
+def LoadDynamicNodes(lazy=False):
     global DynamicClasses
+    global DynamicNodes
     global VRayNodeTypes
 
     DynamicClasses = []
+    DynamicNodes   = {}
 
     # Runtime Node classes generation
     #
@@ -534,51 +630,11 @@ def LoadDynamicNodes():
             if not hasattr(bpy.types, typeName):
                 continue
 
-            vrayPlugin  = PLUGINS[pluginType][pluginName]
-            textureBpyType = getattr(bpy.types, typeName)
-            textureMenuType = getattr(vrayPlugin, 'MENU', None)
-
-            DynNodeClassName = "VRayNode%s" % (pluginName)
-
-            DynNodeClassAttrs = {
-                'bl_idname' : DynNodeClassName,
-                'bl_label'  : vrayPlugin.NAME,
-                'bl_icon'   : VRayNodeTypeIcon.get(pluginType, 'VRAY_LOGO_MONO'),
-                'bl_menu'   : textureMenuType,
-
-                'init'             : VRayNodeInit,
-                'copy'             : VRayNodeCopy,
-                'free'             : VRayNodeFree,
-                'draw_buttons'     : VRayNodeDraw,
-                'draw_buttons_ext' : VRayNodeDrawSide,
-                'draw_label'       : VRayNodeDrawLabel,
-
-                'vray_type'   : bpy.props.StringProperty(default=pluginType),
-                'vray_plugin' : bpy.props.StringProperty(default=pluginName),
-            }
-
-            DynNodeClass = type(
-                DynNodeClassName,  # Name
-                (bpy.types.Node,), # Inheritance
-                DynNodeClassAttrs  # Attributes
-            )
-
-            if pluginName in  {'TexGradRamp', 'TexRemap', 'BitmapBuffer'}:
-                NodeUtils.CreateFakeTextureAttribute(DynNodeClass)
+            DynamicNodes["VRayNode%s" % pluginName] = (pluginType, pluginName)
 
-            if pluginName == 'TexSoftbox':
-                NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_grad_vert')
-                NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_grad_horiz')
-                NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_grad_rad')
-                NodeUtils.CreateFakeTextureAttribute(DynNodeClass, 'ramp_frame')
-
-            bpy.utils.register_class(DynNodeClass)
-
-            ClassUtils.RegisterPluginPropertyGroup(DynNodeClass, vrayPlugin)
-
-            VRayNodeTypes[pluginType].append(getattr(bpy.types, DynNodeClassName))
-
-            DynamicClasses.append(DynNodeClass)
+            # Lazy mode will register only node types used in the loaded file
+            if not lazy:
+                RegisterDynamicNode(pluginType, pluginName)
 
     # Add manually defined classes
     VRayNodeTypes['BRDF'].append(bpy.types.VRayNodeBRDFLayered)
@@ -587,6 +643,34 @@ def LoadDynamicNodes():
     VRayNodeTypes['MATERIAL'].append(bpy.types.VRayNodeMtlMulti)
 
 
+# Files saved before the node types list was introduced have no
+# 'vray_node_types' property; all node types are registered for them,
+# the property is written on the next save.
+#
+@bpy.app.handlers.persistent
+def register_used_nodes(e):
+    nodeTypes = GetUsedNodeTypes()
+    if nodeTypes is None:
+        Debug("Node types are not stored in the file; registering all node types")
+        EnsureAllNodeTypes()
+    else:
+        EnsureNodeTypes(sorted(nodeTypes))
+
+
+@bpy.app.handlers.persistent
+def store_used_nodes(e):
+    for nt in bpy.data.node_groups:
+        if not nt.bl_idname.startswith('VRayNodeTree'):
+            continue
+        nodeTypes = set(node.bl_idname for node in nt.nodes)
+        if 'NodeUndefined' in nodeTypes:
+            # Keep types we can't see anymore
+            nodeTypes.update(nt.get(NodeTypesProperty, "").split(','))
+        nodeTypes.discard('NodeUndefined')
+        nodeTypes.discard('')
+        nt[NodeTypesProperty] = ','.join(sorted(nodeTypes))
+
+
 ########  ########  ######   ####  ######  ######## ########     ###    ######## ####  #######  ##    ##
 ##     ## ##       ##    ##   ##  ##    ##    ##    ##     ##   ## ##      ##     ##  ##     ## ###   ##
 ##     ## ##       ##         ##  ##          ##    ##     ##  ##   ##     ##     ##  ##     ## ####  ##
@@ -597,12 +681,25 @@ def LoadDynamicNodes():
 
 
 def register():
-    LoadDynamicNodes()
+    lazy = UseLazyNodes()
+
+    LoadDynamicNodes(lazy)
+
+    if lazy:
+        # Data is not accessible during the add-on loading,
+        # types will be registered on file load then
+        if hasattr(bpy.data, 'node_groups'):
+            register_used_nodes(None)
+        BlenderUtils.AddEvent(bpy.app.handlers.load_post, register_used_nodes)
+    BlenderUtils.AddEvent(bpy.app.handlers.save_pre, store_used_nodes)
 
     nodeitems_utils.register_node_categories('VRAY_NODES', GetCategories())
 
 
 def unregister():
+    BlenderUtils.DelEvent(bpy.app.handlers.load_post, register_used_nodes)
+    BlenderUtils.DelEvent(bpy.app.handlers.save_pre,  store_used_nodes)
+
     nodeitems_utils.unregister_node_categories('VRAY_NODES')
 
     for regClass in DynamicClasses:
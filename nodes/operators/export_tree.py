@@ -64,6 +64,7 @@ class VRAY_OT_export_nodetree(bpy.types.Operator):
         debug.PrintInfo('Exporting "%s" to: "%s"' % (ntree.name, outputFilepath))
 
         o = VRayStream.VRaySimplePluginExporter(outputFilepath)
+        o.setDataFormat(VRayExporter.data_format)
 
         exporter = _vray_for_blender.init(
             engine  = 0,
@@ -33,7 +33,6 @@ from vb30.plugins import PLUGINS, PLUGINS_ID
 from vb30.nodes import importing as NodesImport
 from vb30.nodes import tools     as NodesTools
 
-from vb30.vray_tools.VRaySceneParser import ParseVrscene
 from vb30.vray_tools.VrmatParser     import ParseVrmat
 
 from vb30.ui import classes
@@ -53,9 +52,9 @@ def ImportMaterialWithDisplacement(context, filePath, use_fake_user=True):
     vrsceneDict = {}
 
     if filePath.endswith(".vrscene"):
-        vrsceneDict = ParseVrscene(filePath)
+        vrsceneDict = NodesImport.parseVrsceneFiltered(filePath, NodesImport.getMaterialPluginFilter())
     else:
-        vrsceneDict = ParseVrmat(filePath)
+        vrsceneDict = NodesImport.getVRaySceneDict(ParseVrmat(filePath))
 
     nodeNames = []
     for pluginDesc in vrsceneDict:
@@ -153,9 +152,9 @@ def ImportMaterials(context, filePath, baseMaterial, use_fake_user=True):
     vrsceneDict = {}
 
     if filePath.endswith(".vrscene"):
-        vrsceneDict = ParseVrscene(filePath)
+        vrsceneDict = NodesImport.parseVrsceneFiltered(filePath, NodesImport.getMaterialPluginFilter())
     else:
-        vrsceneDict = ParseVrmat(filePath)
+        vrsceneDict = NodesImport.getVRaySceneDict(ParseVrmat(filePath))
 
     MaterialTypeFilter = {
         'STANDARD' : {
@@ -222,7 +221,7 @@ def ImportMaterials(context, filePath, baseMaterial, use_fake_user=True):
 def ImportSettings(context, filePath, pluginFilter=None):
     debug.PrintInfo('Importing settings from "%s"' % filePath)
 
-    vrsceneDict = ParseVrscene(filePath)
+    vrsceneDict = NodesImport.parseVrsceneFiltered(filePath, set(PLUGINS['SETTINGS']))
 
     for pluginDesc in vrsceneDict:
         pluginID    = pluginDesc['ID']
@@ -241,12 +240,16 @@ def ImportSettings(context, filePath, pluginFilter=None):
 
         propGroup = getattr(context.scene.vray, pluginID)
 
-        for attrName in pluginAttrs:
+        for attrName in list(pluginAttrs.keys()):
             attrDesc  = NodesImport.getParamDesc(pluginModule.PluginParams, attrName)
             if attrDesc is None:
                 continue
 
-            attrValue = pluginAttrs[attrName]
+            # Malformed values are dropped by the parser
+            attrValue = pluginAttrs.get(attrName)
+            if attrValue is None:
+                continue
+
             if attrDesc['type'] == 'ENUM':
                 attrValue = str(attrValue)
 
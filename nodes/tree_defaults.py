@@ -27,6 +27,7 @@ import bpy
 from vb30.lib import LibUtils
 
 from . import tools as NodesTools
+from . import nodes as NodesNodes
 
 
 def AddWorldNodeTree(world):
@@ -56,6 +57,8 @@ def AddLampNodeTree(lamp):
 
     lightPluginName = LibUtils.GetLightPluginName(lamp)
 
+    NodesNodes.EnsureNodeTypes(('VRayNode%s' % lightPluginName,))
+
     nt.nodes.new('VRayNode%s' % lightPluginName)
     NodesTools.deselectNodes(nt)
 
@@ -186,6 +186,10 @@ def CreateNode(ntree, nodeType, nodeName=None, unique=True):
         else:
             nodeName = LibUtils.GetUUID() + nodeName
 
+    # Imported here, because 'nodes' module depends on this one
+    from .nodes import EnsureNodeTypes
+    EnsureNodeTypes((nodeType,))
+
     node = ntree.nodes.new(nodeType)
     node.name  = nodeName
     node.label = nodeLabel
@@ -29,6 +29,7 @@ import imp
 
 import bpy
 
+from vb30       import debug
 from vb30.debug import Debug
 from vb30.lib   import ClassUtils
 from vb30.lib   import SysUtils
@@ -785,6 +786,14 @@ class VRayDR(bpy.types.PropertyGroup):
 		default= 'WW'
 	)
 
+	asset_sync_threads = bpy.props.IntProperty(
+		name        = "Copy Threads",
+		description = "Number of threads copying assets to the shared directory",
+		min         = 1,
+		max         = 32,
+		default     = 4
+	)
+
 	nodes= bpy.props.CollectionProperty(
 		name= "Render Nodes",
 		type=  VRayRenderNode,
@@ -850,8 +859,11 @@ def register():
 	global PLUGINS
 	global PLUGINS_ID
 
-	PluginUtils.LoadPluginDesc()
-	LoadPlugins(PLUGINS, PLUGINS_ID)
+	with debug.StartupPhase("Plugin descriptions"):
+		PluginUtils.LoadPluginDesc()
+
+	with debug.StartupPhase("Plugin modules"):
+		LoadPlugins(PLUGINS, PLUGINS_ID)
 
 	for jsonPluginName in PluginUtils.PLUGINS_DESC:
 		if jsonPluginName not in PLUGINS_ID:
@@ -982,32 +994,34 @@ def register():
 
 	# Register properties
 	#
-	for pluginName in PLUGINS_ID:
-		plugin = PLUGINS_ID[pluginName]
-		if hasattr(plugin, 'register'):
-			plugin.register()
-
-	LoadPluginAttributes(PLUGINS['BRDF'],          VRayMaterial)
-	LoadPluginAttributes(PLUGINS['CAMERA'],        VRayCamera)
-	LoadPluginAttributes(PLUGINS['EFFECT'],        VRayScene)
-	LoadPluginAttributes(PLUGINS['GEOMETRY'],      VRayMesh)
-	LoadPluginAttributes(PLUGINS['LIGHT'],         VRayLight)
-	LoadPluginAttributes(PLUGINS['MATERIAL'],      VRayMaterial)
-	LoadPluginAttributes(PLUGINS['OBJECT'],        VRayObject)
-	LoadPluginAttributes(PLUGINS['RENDERCHANNEL'], VRayRenderChannel)
-	LoadPluginAttributes(PLUGINS['SETTINGS'],      VRayScene)
-	LoadPluginAttributes(PLUGINS['TEXTURE'],       VRayTexture)
-	LoadPluginAttributes(PLUGINS['UVWGEN'],        VRayTexture)
-
-	LoadPluginAttributes(PLUGINS['UTILITIES'],       VRayScene)
-	LoadPluginAttributes(PLUGINS['SYSTEM'],          VRayScene)
-	LoadPluginAttributes(PLUGINS['SETTINGS_GLOBAL'], VRayScene)
-
-	VRayScene.Exporter = bpy.props.PointerProperty(
-		name = "Exporter",
-		type =  bpy.types.VRayExporter,
-		description = "Global exporting settings"
-	)
+	with debug.StartupPhase("Plugin property groups"):
+		for pluginName in PLUGINS_ID:
+			plugin = PLUGINS_ID[pluginName]
+			if hasattr(plugin, 'register'):
+				plugin.register()
+
+	with debug.StartupPhase("Plugin attributes"):
+		LoadPluginAttributes(PLUGINS['BRDF'],          VRayMaterial)
+		LoadPluginAttributes(PLUGINS['CAMERA'],        VRayCamera)
+		LoadPluginAttributes(PLUGINS['EFFECT'],        VRayScene)
+		LoadPluginAttributes(PLUGINS['GEOMETRY'],      VRayMesh)
+		LoadPluginAttributes(PLUGINS['LIGHT'],         VRayLight)
+		LoadPluginAttributes(PLUGINS['MATERIAL'],      VRayMaterial)
+		LoadPluginAttributes(PLUGINS['OBJECT'],        VRayObject)
+		LoadPluginAttributes(PLUGINS['RENDERCHANNEL'], VRayRenderChannel)
+		LoadPluginAttributes(PLUGINS['SETTINGS'],      VRayScene)
+		LoadPluginAttributes(PLUGINS['TEXTURE'],       VRayTexture)
+		LoadPluginAttributes(PLUGINS['UVWGEN'],        VRayTexture)
+
+		LoadPluginAttributes(PLUGINS['UTILITIES'],       VRayScene)
+		LoadPluginAttributes(PLUGINS['SYSTEM'],          VRayScene)
+		LoadPluginAttributes(PLUGINS['SETTINGS_GLOBAL'], VRayScene)
+
+		VRayScene.Exporter = bpy.props.PointerProperty(
+			name = "Exporter",
+			type =  bpy.types.VRayExporter,
+			description = "Global exporting settings"
+		)
 
 
 def unregister():
@@ -28,7 +28,7 @@ from pprint import pprint
 
 import bpy
 
-from vb30.vray_tools.VRaySceneParser import GetMaterialsNames, ParseVrscene
+from vb30.vray_tools.VRaySceneParser import GetMaterialsNames
 from vb30.vray_tools.VrmatParser     import GetXMLMaterialsNames, ParseVrmat
 
 from vb30.nodes import importing as NodesImport
@@ -154,9 +154,9 @@ class VRayMaterialExpand(bpy.types.Operator):
         namePrefix  = ""
         vrsceneDict = []
         if filePath.endswith(".vrscene"):
-            vrsceneDict = ParseVrscene(filePath)
+            vrsceneDict = NodesImport.parseVrsceneFiltered(filePath, NodesImport.getMaterialPluginFilter())
         else:
-            vrsceneDict = ParseVrmat(filePath)
+            vrsceneDict = NodesImport.getVRaySceneDict(ParseVrmat(filePath))
             namePrefix  = "/"
 
         # Preview data from the file
@@ -27,6 +27,7 @@ import bpy
 from vb30.lib import ExportUtils
 from vb30.lib import PluginUtils
 from vb30.lib import BlenderUtils
+from vb30.lib import ListUtils
 
 
 PluginUtils.loadPluginOnModule(globals(), __name__)
@@ -69,10 +70,10 @@ def writeDatablock(bus, pluginModule, pluginName, propGroup, overrideParams):
             overrideParams['render_mask_objects'] = "List(%s)" % ",".join(ob_names)
 
     elif propGroup.render_mask_mode == '3':
-        if not propGroup.render_mask_object_ids:
+        mask_object_ids = [int(i) for i in propGroup.render_mask_object_ids.split(";") if i.strip().isdigit()]
+        if not mask_object_ids:
             overrideParams['render_mask_mode'] = '0'
         else:
-            mask_object_ids = propGroup.render_mask_object_ids.split(";")
-            overrideParams['render_mask_object_ids'] = "ListInt(%s)" % ",".join(mask_object_ids)
+            overrideParams['render_mask_object_ids'] = ListUtils.ListInt(mask_object_ids)
 
     return ExportUtils.WritePluginCustom(bus, pluginModule, pluginName, propGroup, overrideParams)
@@ -48,12 +48,13 @@ DESC = "Custom export sets"
 ##        ##   ##  ##        ##     ## ##    ##     ##
 ######## ##     ## ##         #######  ##     ##    ##
 
-def ExportObjects(objects, filepath, animation='NONE', frameStart=1, frameEnd=10):
+def InitSetExporter(filepath):
     scene = bpy.context.scene
 
     vrsceneFile = open(filepath, 'w')
 
     o = VRayStream.VRaySimplePluginExporter(outputFile=vrsceneFile)
+    o.setDataFormat(scene.vray.Exporter.data_format)
 
     exporter = _vray_for_blender.init(
         engine  = 0,
@@ -72,14 +73,23 @@ def ExportObjects(objects, filepath, animation='NONE', frameStart=1, frameEnd=10
         drSharePath = "",
     )
 
-    def _export_objects(objects):
-        # Init stuff for dupli / particles / etc
-        _vray_for_blender.exportObjectsPre(exporter)
-        for ob in objects:
-            print(ob.name)
-            _vray_for_blender.exportObject(ob.as_pointer(), bpy.data.as_pointer(), exporter)
-        # Write dupli / particles / etc
-        _vray_for_blender.exportObjectsPost(exporter)
+    return o, vrsceneFile, exporter
+
+
+def ExportSetObjects(exporter, objects):
+    # Init stuff for dupli / particles / etc
+    _vray_for_blender.exportObjectsPre(exporter)
+    for ob in objects:
+        print(ob.name)
+        _vray_for_blender.exportObject(ob.as_pointer(), bpy.data.as_pointer(), exporter)
+    # Write dupli / particles / etc
+    _vray_for_blender.exportObjectsPost(exporter)
+
+
+def ExportObjects(objects, filepath, animation='NONE', frameStart=1, frameEnd=10):
+    scene = bpy.context.scene
+
+    o, vrsceneFile, exporter = InitSetExporter(filepath)
 
     # NOTE: Have to do it before export pre init
     if animation not in {'NONE'}:
@@ -95,11 +105,11 @@ def ExportObjects(objects, filepath, animation='NONE', frameStart=1, frameEnd=10
             scene.frame_set(frameStart)
             _vray_for_blender.setFrame(frameStart)
 
-            _export_objects(objects)
+            ExportSetObjects(exporter, objects)
 
             frameStart += scene.frame_step
     else:
-        _export_objects(objects)
+        ExportSetObjects(exporter, objects)
 
     o.done()
     vrsceneFile.close()
@@ -108,10 +118,7 @@ def ExportObjects(objects, filepath, animation='NONE', frameStart=1, frameEnd=10
     _vray_for_blender.exit(exporter)
 
 
-def ExportExportSetItem(item):
-    scene = bpy.context.scene
-    frameCurrent = scene.frame_current
-
+def GetExportSetFilepath(item):
     dirPath  = item.dirpath
     fileName = item.filename
     if not fileName.endswith(".vrscene"):
@@ -121,12 +128,27 @@ def ExportExportSetItem(item):
     dirPath = BlenderUtils.GetFullFilepath(dirPath)
     dirPath = PathUtils.CreateDirectory(dirPath)
 
-    vrsceneFilepath = os.path.join(dirPath, fileName)
-    objects         = BlenderUtils.GetGroupObjects(item.group)
+    return os.path.join(dirPath, fileName)
+
+
+def GetExportSetFrameRange(item):
+    scene = bpy.context.scene
 
     frameStart = item.frame_start if item.use_animation == 'MANUAL' else scene.frame_start
     frameEnd   = item.frame_end   if item.use_animation == 'MANUAL' else scene.frame_end
 
+    return frameStart, frameEnd
+
+
+def ExportExportSetItem(item):
+    scene = bpy.context.scene
+    frameCurrent = scene.frame_current
+
+    vrsceneFilepath = GetExportSetFilepath(item)
+    objects         = BlenderUtils.GetGroupObjects(item.group)
+
+    frameStart, frameEnd = GetExportSetFrameRange(item)
+
     ExportObjects(objects, vrsceneFilepath, item.use_animation, frameStart, frameEnd)
 
     # Restore current frame
@@ -135,6 +157,26 @@ def ExportExportSetItem(item):
     return vrsceneFilepath
 
 
+# Returns the list of the file paths used by more then one set
+# with the indexes of these sets
+#
+def GetDuplicateFilepaths(items):
+    return PathUtils.GetDuplicateFilepaths({i : GetExportSetFilepath(item) for i, item in enumerate(items)})
+
+
+# Every set is exported with its own exporter one after another:
+# animation range, current frame and exported data cache are global
+# in _vray_for_blender, so exporters can't be used at the same time.
+#
+# Returns the list of (item index, vrscene filepath)
+#
+def ExportExportSetItems(items):
+    result = []
+    for i, item in enumerate(items):
+        result.append((i, ExportExportSetItem(item)))
+    return result
+
+
 ########  ########   #######  ########         ######   ########   #######  ##     ## ########
 ##     ## ##     ## ##     ## ##     ##       ##    ##  ##     ## ##     ## ##     ## ##     ##
 ##     ## ##     ## ##     ## ##     ##       ##        ##     ## ##     ## ##     ## ##     ##
@@ -255,6 +297,37 @@ class VRayOpExportSetAll(bpy.types.Operator):
     bl_description = "Export sets"
 
     def execute(self, context):
+        VRayScene = context.scene.vray
+        ExportSets    = VRayScene.ExportSets
+
+        items = [listItem for listItem in ExportSets.list_items if listItem.use]
+        if not items:
+            return {'CANCELLED'}
+
+        duplicateFilepaths = GetDuplicateFilepaths(items)
+        if duplicateFilepaths:
+            for filepath, indexes in duplicateFilepaths:
+                self.report({'ERROR'}, "Export sets %s use the same file: \"%s\"" % (
+                    ", ".join('"%s"' % items[i].name for i in indexes), filepath))
+            return {'CANCELLED'}
+
+        exportedSets = ExportExportSetItems(items)
+
+        if ExportSets.generate_preview:
+            jobs = []
+            for i, vrsceneFilepath in exportedSets:
+                jobs.append((i, {
+                    'vrsceneFilepath' : vrsceneFilepath,
+                    'previewFaces'    : ExportSets.max_preview_faces,
+                    'previewOnly'     : True,
+                }))
+
+            errors = ProxyTools.LaunchPly2VrmeshPool(jobs)
+
+            failedSets = ['"%s"' % items[i].name for i in sorted(errors) if errors[i] is not None]
+            if failedSets:
+                self.report({'ERROR'}, "Error generating preview for: %s" % ", ".join(failedSets))
+
         return {'FINISHED'}
 
 
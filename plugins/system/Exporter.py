@@ -196,6 +196,37 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = True
     )
 
+    use_geometry_cache = bpy.props.BoolProperty(
+        name = "Geometry Cache",
+        description = "Store exported geometry in cache directory by its content hash and reuse it for the same geometry",
+        default = False
+    )
+
+    geometry_cache_size = bpy.props.IntProperty(
+        name = "Cache Size",
+        description = "Geometry cache size limit in MiB; least recently used geometry is removed (0 - no limit)",
+        min = 0,
+        default = 4096
+    )
+
+    export_profile = bpy.props.BoolProperty(
+        name = "Profile Export",
+        description = "Save export timings and written data statistics into JSON file next to the scene file",
+        default = False
+    )
+
+    capture_output = bpy.props.BoolProperty(
+        name = "Progress In Blender",
+        description = "Read V-Ray output to show render progress and statistics in Blender (only when Blender waits for the render)",
+        default = True
+    )
+
+    render_log = bpy.props.BoolProperty(
+        name = "Render Log",
+        description = "Save parsed render progress into JSON file next to the scene file",
+        default = False
+    )
+
     debug = bpy.props.BoolProperty(
         name = "Debug",
         description = "Enable script\'s debug output",
@@ -280,6 +311,56 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = 'NONE'
     )
 
+    frame_by_frame_pipeline = bpy.props.BoolProperty(
+        name = "Pipeline Frames",
+        description = "Export next frame while the previous one is rendering",
+        default = False
+    )
+
+    frame_by_frame_processes = bpy.props.IntProperty(
+        name = "Max Processes",
+        description = "Max number of V-Ray processes running at once",
+        min = 1,
+        soft_max = 8,
+        default = 1
+    )
+
+    export_animated_only = bpy.props.BoolProperty(
+        name = "Export Animated Objects Only",
+        description = "Export static objects only for the first frame of the animation or motion blur range",
+        default = False
+    )
+
+    camera_loop_visibility_diff = bpy.props.BoolProperty(
+        name = "Export Visibility Changes Only",
+        description = "With \"Hide From View\" export only objects which visibility changes between the loop cameras",
+        default = False
+    )
+
+    use_keyframe_reduction = bpy.props.BoolProperty(
+        name = "Reduce Keyframes",
+        description = "Don't export keyframes that could be restored with linear interpolation",
+        default = False
+    )
+
+    keyframe_reduction_epsilon = bpy.props.FloatProperty(
+        name = "Reduction Tolerance",
+        description = "Max allowed difference between the dropped keyframe value and the interpolated one",
+        min = 0.0,
+        soft_max = 0.1,
+        precision = 6,
+        default = 0.0001
+    )
+
+    keyframe_tolerance = bpy.props.FloatProperty(
+        name = "Keyframe Tolerance",
+        description = "Don't export animated float values that differ from the last exported value less than this",
+        min = 0.0,
+        soft_max = 0.1,
+        precision = 6,
+        default = 0.0
+    )
+
     draft = bpy.props.BoolProperty(
         name = "Draft Render",
         description = "Render with low settings",
@@ -298,6 +379,27 @@ class VRayExporter(bpy.types.PropertyGroup):
         default = False
     )
 
+    image_to_blender_progressive = bpy.props.BoolProperty(
+        name = "Progressive",
+        description = "Update image in Blender while rendering when the watched file changes",
+        default = False
+    )
+
+    image_to_blender_interval = bpy.props.FloatProperty(
+        name = "Update Interval",
+        description = "Minimum time between image updates (seconds)",
+        min = 0.1,
+        soft_max = 60.0,
+        default = 2.0
+    )
+
+    image_to_blender_watch_file = bpy.props.StringProperty(
+        name = "Watch File",
+        subtype = 'FILE_PATH',
+        description = "Intermediate image to watch while rendering (output image is used if empty)",
+        default = ""
+    )
+
     ########  ########   #######   ######  ########  ######   ######
     ##     ## ##     ## ##     ## ##    ## ##       ##    ## ##    ##
     ##     ## ##     ## ##     ## ##       ##       ##       ##
@@ -156,7 +156,7 @@ class VRayPresetExecuteBase:
         #
         debug.PrintInfo('Applying preset from "%s"' % filepath)
 
-        vrsceneDict = ParseVrscene(filepath)
+        vrsceneDict = NodesImport.getVRaySceneDict(ParseVrscene(filepath))
 
         return self._execute(context, vrsceneDict)
 
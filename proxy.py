@@ -22,6 +22,7 @@
 # All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
 #
 
+import concurrent.futures
 import math
 import os
 import subprocess
@@ -38,12 +39,13 @@ from vb30.lib import BlenderUtils, PathUtils, LibUtils, SysUtils
 from vb30.lib import VRayStream
 
 from vb30.nodes import tools as NodesTools
+from vb30.nodes import nodes as NodesNodes
 
 from vb30.vray_tools import VRayProxy
 from vb30 import debug
 
 
-def LaunchPly2Vrmesh(vrsceneFilepath, vrmeshFilepath=None, nodeName=None, frames=None, applyTm=False, useVelocity=False, previewOnly=False, previewFaces=None):
+def GetPly2VrmeshCmd(vrsceneFilepath, vrmeshFilepath=None, nodeName=None, frames=None, applyTm=False, useVelocity=False, previewOnly=False, previewFaces=None):
     ply2vrmeshBin  = "ply2vrmesh{arch}{ext}"
     ply2vrmeshArch = ""
 
@@ -59,11 +61,11 @@ def LaunchPly2Vrmesh(vrsceneFilepath, vrmeshFilepath=None, nodeName=None, frames
 
     exporterPath = SysUtils.GetExporterPath()
     if not exporterPath:
-        return "Exporter path is not found!"
+        return None, "Exporter path is not found!"
 
     ply2vrmesh = os.path.join(exporterPath, "bin", ply2vrmeshBin)
     if not os.path.exists(ply2vrmesh):
-        return "ply2vrmesh binary not found!"
+        return None, "ply2vrmesh binary not found!"
 
     cmd = [ply2vrmesh]
     cmd.append(vrsceneFilepath)
@@ -85,6 +87,14 @@ def LaunchPly2Vrmesh(vrsceneFilepath, vrmeshFilepath=None, nodeName=None, frames
     if vrmeshFilepath is not None:
         cmd.append(vrmeshFilepath)
 
+    return cmd, None
+
+
+def LaunchPly2Vrmesh(vrsceneFilepath, vrmeshFilepath=None, nodeName=None, frames=None, applyTm=False, useVelocity=False, previewOnly=False, previewFaces=None):
+    cmd, err = GetPly2VrmeshCmd(vrsceneFilepath, vrmeshFilepath, nodeName, frames, applyTm, useVelocity, previewOnly, previewFaces)
+    if err is not None:
+        return err
+
     debug.PrintInfo("Calling: %s" % " ".join(cmd))
 
     err = subprocess.call(cmd)
@@ -94,6 +104,52 @@ def LaunchPly2Vrmesh(vrsceneFilepath, vrmeshFilepath=None, nodeName=None, frames
     return None
 
 
+# Runs a number of ply2vrmesh conversions concurrently
+#
+# @jobs    - list of (key, LaunchPly2Vrmesh() keyword arguments)
+# @threads - max number of simultaneous processes, CPU count by default
+#
+# Returns { key : error or None }
+#
+def LaunchPly2VrmeshPool(jobs, threads=None):
+    def run(filepath, cmd):
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        output = p.communicate()[0]
+        if p.returncode:
+            # Print the output of the failed tool only,
+            # so results of the different jobs are not mixed
+            debug.PrintError('ply2vrmesh failed for "%s":\n%s' % (filepath, output))
+            return "Error generating vrmesh file!"
+        return None
+
+    result = {}
+    if not jobs:
+        return result
+
+    threads = max(1, min(threads or os.cpu_count() or 1, len(jobs)))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = {}
+        for key, kwargs in jobs:
+            cmd, err = GetPly2VrmeshCmd(**kwargs)
+            if err is not None:
+                result[key] = err
+                continue
+
+            debug.PrintInfo("Calling: %s" % " ".join(cmd))
+
+            futures[key] = executor.submit(run, kwargs.get('vrmeshFilepath') or kwargs['vrsceneFilepath'], cmd)
+
+        for key, future in futures.items():
+            try:
+                result[key] = future.result()
+            except Exception as e:
+                debug.ExceptionInfo(e)
+                result[key] = str(e)
+
+    return result
+
+
 def ExportMeshSample(o, ob):
     nodeName = BlenderUtils.GetObjectName(ob)
     geomName = BlenderUtils.GetObjectName(ob, prefix='ME')
@@ -161,6 +217,8 @@ def CreateProxyNodetree(ob, proxyFilepath, isRelative=False):
 
     outputNode = nt.nodes.new('VRayNodeObjectOutput')
 
+    NodesNodes.EnsureNodeTypes(('VRayNodeGeomMeshFile',))
+
     proxyGeometry   = nt.nodes.new('VRayNodeGeomMeshFile')
     blenderMaterial = nt.nodes.new('VRayNodeBlenderOutputMaterial')
 
@@ -321,7 +379,8 @@ class VRAY_OT_create_proxy(bpy.types.Operator):
         # Use current active object UI for initial settings
         ob        = bpy.context.object
         selection = bpy.context.selected_objects
-        oneObject = len(selection)
+        exportObjects = [ob for ob in selection if ob.type not in BlenderUtils.NonGeometryTypes]
+        oneObject = len(exportObjects) == 1
 
         GeomMeshFile = ob.data.vray.GeomMeshFile
 
@@ -331,6 +390,22 @@ class VRAY_OT_create_proxy(bpy.types.Operator):
         outputDirpath = BlenderUtils.GetFullFilepath(GeomMeshFile.dirpath)
         outputDirpath = PathUtils.CreateDirectory(outputDirpath)
 
+        vrmeshFilepaths = {}
+        for ob in exportObjects:
+            vrmeshName = LibUtils.CleanString(ob.name)
+            if oneObject and GeomMeshFile.filename:
+                vrmeshName = GeomMeshFile.filename
+            vrmeshName += ".vrmesh"
+            vrmeshFilepaths[ob.name] = os.path.join(outputDirpath, vrmeshName)
+
+        # Generator jobs run in parallel and would overwrite each other's output
+        duplicateFilepaths = PathUtils.GetDuplicateFilepaths(vrmeshFilepaths)
+        if duplicateFilepaths:
+            for filepath, obNames in duplicateFilepaths:
+                self.report({'ERROR'}, "Objects %s use the same file: \"%s\"" % (
+                    ", ".join('"%s"' % obName for obName in obNames), filepath))
+            return {'CANCELLED'}
+
         # Create tmp export file
         vrsceneFilepath = os.path.join(tempfile.gettempdir(), "vrmesh.vrscene")
         vrsceneFile = open(vrsceneFilepath, 'w')
@@ -352,7 +427,6 @@ class VRAY_OT_create_proxy(bpy.types.Operator):
         useVelocity = GeomMeshFile.add_velocity
 
         # Export objects meshes and generate nodes name list
-        obPluginNames = []
         o = VRayStream.VRaySimplePluginExporter(outputFile=vrsceneFile)
 
         exporter = _vray_for_blender.init(
@@ -380,40 +454,50 @@ class VRAY_OT_create_proxy(bpy.types.Operator):
 
         _vray_for_blender.setFrame(frameStart)
 
-        for ob in selection:
-            if ob.type in BlenderUtils.NonGeometryTypes:
-                continue
-            nodeName = None
-            if not frames:
-                nodeName = ExportMeshSample(o, ob)
-            else:
-                sce = bpy.context.scene
-                frame_current = sce.frame_current
-                for f in range(frames[0], frames[1]+frames[2], frames[2]):
-                    bpy.context.scene.frame_set(f)
-                    _vray_for_blender.setFrame(f)
-                    nodeName = ExportMeshSample(o, ob)
-                    _vray_for_blender.clearCache()
-                sce.frame_set(frame_current)
-            obPluginNames.append([ob, nodeName])
+        # Every object is exported per frame, so the scene is evaluated
+        # once per frame and not once per frame per object
+        obNodeNames = {}
+        if not frames:
+            for ob in exportObjects:
+                obNodeNames[ob.name] = ExportMeshSample(o, ob)
+        else:
+            frame_current = sce.frame_current
+            for f in range(frames[0], frames[1]+frames[2], frames[2]):
+                sce.frame_set(f)
+                _vray_for_blender.setFrame(f)
+                for ob in exportObjects:
+                    obNodeNames[ob.name] = ExportMeshSample(o, ob)
+                _vray_for_blender.clearCache()
+            sce.frame_set(frame_current)
         o.done()
         vrsceneFile.close()
 
         _vray_for_blender.clearFrames()
         _vray_for_blender.exit(exporter)
 
-        # Launch the generator tool
-        err = None
-        for ob, nodeName in obPluginNames:
-            vrmeshName = LibUtils.CleanString(ob.name)
-            if oneObject and GeomMeshFile.filename:
-                vrmeshName = GeomMeshFile.filename
-            vrmeshName += ".vrmesh"
-            vrmeshFilepath = os.path.join(outputDirpath, vrmeshName)
-
-            err = LaunchPly2Vrmesh(vrsceneFilepath, vrmeshFilepath, nodeName, frames, applyTm, useVelocity)
+        # Launch the generator tool for all objects at once
+        jobs = []
+        for ob in exportObjects:
+            jobs.append((ob.name, {
+                'vrsceneFilepath' : vrsceneFilepath,
+                'vrmeshFilepath'  : vrmeshFilepaths[ob.name],
+                'nodeName'        : obNodeNames[ob.name],
+                'frames'          : frames,
+                'applyTm'         : applyTm,
+                'useVelocity'     : useVelocity,
+            }))
+
+        errors = LaunchPly2VrmeshPool(jobs)
+
+        failedObjects = []
+        for ob in exportObjects:
+            vrmeshFilepath = vrmeshFilepaths[ob.name]
+
+            err = errors.get(ob.name)
             if err is not None:
-                break
+                debug.PrintError('Object "%s": %s' % (ob.name, err))
+                failedObjects.append(ob.name)
+                continue
 
             if GeomMeshFile.proxy_attach_mode != 'NONE':
                 attachOb = ob
@@ -454,9 +538,8 @@ class VRAY_OT_create_proxy(bpy.types.Operator):
         # Remove temp export file
         os.remove(vrsceneFilepath)
 
-        if err:
-            self.report({'ERROR'}, "Error generating VRayProxy! Check system console!")
-            debug.PrintError(err)
+        if failedObjects:
+            self.report({'ERROR'}, "Error generating VRayProxy for %i of %i objects! Check system console!" % (len(failedObjects), len(exportObjects)))
             return {'CANCELLED'}
 
         self.report({'INFO'}, "Done creating proxy!")
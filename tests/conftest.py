@@ -0,0 +1,134 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+# Tests run with plain Python: minimal "bpy", "mathutils" and
+# "_vray_for_blender" modules are installed here and the add-on directory
+# is made importable as "vb30" without running its registration code.
+#
+
+import importlib.util
+import os
+import struct
+import sys
+import types
+
+
+ExporterDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Vector(tuple):
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return tuple.__new__(cls, values)
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+
+class Color(tuple):
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return tuple.__new__(cls, values)
+
+    r = property(lambda self: self[0])
+    g = property(lambda self: self[1])
+    b = property(lambda self: self[2])
+
+
+class Matrix(list):
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+        list.__init__(self, [list(row) for row in rows])
+
+    @property
+    def col(self):
+        return [[row[c] for row in self] for c in range(len(self[0]))]
+
+    def copy(self):
+        return Matrix(self)
+
+
+def GetTransformHex(tm):
+    data = struct.pack("fffffffffddd",
+        tm[0][0], tm[1][0], tm[2][0],
+        tm[0][1], tm[1][1], tm[2][1],
+        tm[0][2], tm[1][2], tm[2][2],
+        tm[0][3], tm[1][3], tm[2][3])
+    return 'TransformHex("%s")' % data.hex().upper()
+
+
+def InstallModules():
+    bpy = types.ModuleType('bpy')
+
+    class BlendData:
+        pass
+
+    class Props:
+        def __getattr__(self, name):
+            return lambda **kwargs: (name, kwargs)
+
+    bpy.types = types.SimpleNamespace(BlendData=BlendData)
+    bpy.props = Props()
+    bpy.data  = types.SimpleNamespace(filepath="", objects={}, groups={})
+    bpy.path  = types.SimpleNamespace(abspath=lambda filepath, library=None: filepath[2:] if filepath.startswith("//") else filepath)
+    bpy.context = types.SimpleNamespace(
+        scene = types.SimpleNamespace(
+            name   = "Scene",
+            camera = None,
+            render = types.SimpleNamespace(engine='VRAY_RENDER'),
+            vray   = types.SimpleNamespace(Exporter=types.SimpleNamespace(debug=False)),
+        ),
+    )
+
+    mathutils = types.ModuleType('mathutils')
+    mathutils.Vector = Vector
+    mathutils.Color  = Color
+    mathutils.Matrix = Matrix
+
+    vray = types.ModuleType('_vray_for_blender')
+    vray.getTransformHex = GetTransformHex
+
+    sys.modules['bpy'] = bpy
+    sys.modules['mathutils'] = mathutils
+    sys.modules['_vray_for_blender'] = vray
+
+
+def LoadExporterPackage():
+    spec = importlib.util.spec_from_loader('vb30', loader=None, is_package=True)
+    vb30 = importlib.util.module_from_spec(spec)
+    vb30.__path__ = [ExporterDir]
+    sys.modules['vb30'] = vb30
+
+
+try:
+    import bpy
+except ImportError:
+    InstallModules()
+
+if 'vb30' not in sys.modules:
+    LoadExporterPackage()
+
+# Allows tests to use data generators from "benchmark.py"
+if ExporterDir not in sys.path:
+    sys.path.insert(0, ExporterDir)
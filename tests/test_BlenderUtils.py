@@ -0,0 +1,228 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import types
+
+import bpy
+
+from vb30.lib import BlenderUtils
+
+
+def GetAnimationData():
+    return types.SimpleNamespace(action="Action", drivers=[])
+
+
+def GetModifier(mdType, **kwargs):
+    return types.SimpleNamespace(type=mdType, **kwargs)
+
+
+def GetObject(name, obType='MESH', modifiers=(), animated=False, parent=None, data=None):
+    return types.SimpleNamespace(
+        name              = name,
+        type              = obType,
+        data              = data,
+        animation_data    = GetAnimationData() if animated else None,
+        vray              = None,
+        constraints       = [],
+        rigid_body        = None,
+        dupli_type        = 'NONE',
+        particle_systems  = [],
+        modifiers         = list(modifiers),
+        material_slots    = [],
+        parent            = parent,
+    )
+
+
+def test_static_object():
+    assert not BlenderUtils.IsObjectAnimated(GetObject("Static"))
+
+
+def test_time_dependent_modifier():
+    ob = GetObject("Cloth", modifiers=[GetModifier('CLOTH')])
+    assert BlenderUtils.IsObjectAnimated(ob)
+
+
+def test_modifier_objects():
+    cutter = GetObject("Cutter", animated=True)
+    static = GetObject("StaticCutter")
+
+    assert BlenderUtils.IsObjectAnimated(GetObject("Boolean", modifiers=[GetModifier('BOOLEAN', object=cutter)]))
+    assert not BlenderUtils.IsObjectAnimated(GetObject("Boolean", modifiers=[GetModifier('BOOLEAN', object=static)]))
+
+    assert BlenderUtils.IsObjectAnimated(GetObject("Array", modifiers=[GetModifier('ARRAY', offset_object=None, start_cap=None, end_cap=cutter)]))
+    assert BlenderUtils.IsObjectAnimated(GetObject("Mirror", modifiers=[GetModifier('MIRROR', mirror_object=cutter)]))
+    assert BlenderUtils.IsObjectAnimated(GetObject("Deform", modifiers=[GetModifier('SIMPLE_DEFORM', origin=cutter)]))
+
+    projector = types.SimpleNamespace(object=cutter)
+    assert BlenderUtils.IsObjectAnimated(GetObject("Project", modifiers=[GetModifier('UV_PROJECT', projectors=[projector])]))
+
+
+def test_animated_texture():
+    texture = types.SimpleNamespace(animation_data=GetAnimationData())
+    assert BlenderUtils.IsObjectAnimated(GetObject("Displace", modifiers=[GetModifier('DISPLACE', texture=texture)]))
+
+
+def test_curve_bevel_taper():
+    bevel = GetObject("Bevel", animated=True)
+    data  = types.SimpleNamespace(animation_data=None, shape_keys=None, vray=None, bevel_object=bevel, taper_object=None)
+    assert BlenderUtils.IsObjectAnimated(GetObject("Curve", obType='CURVE', data=data))
+
+
+def test_dependency_cycle():
+    a = GetObject("A")
+    b = GetObject("B", modifiers=[GetModifier('BOOLEAN', object=a)])
+    a.modifiers.append(GetModifier('BOOLEAN', object=b))
+    assert not BlenderUtils.IsObjectAnimated(a)
+
+    b.animation_data = GetAnimationData()
+    assert BlenderUtils.IsObjectAnimated(a)
+
+
+def GetHideLists(**pointers):
+    hideLists = {hideType : set() for hideType in BlenderUtils.HideFromViewTypes}
+    for hideType, hidden in pointers.items():
+        hideLists[hideType] = set(hidden)
+    return hideLists
+
+
+def test_visibility_changes():
+    a = GetHideLists(camera=[1, 2], shadows=[3])
+    b = GetHideLists(camera=[2], shadows=[3, 4])
+
+    assert BlenderUtils.GetVisibilityChanges(a, b) == {1, 4}
+    assert BlenderUtils.GetVisibilityChanges(a, a) == set()
+
+
+def test_camera_loop_changes():
+    hideLists = [
+        GetHideLists(),
+        GetHideLists(camera=[1]),
+        GetHideLists(),
+        GetHideLists(),
+        GetHideLists(camera=[2]),
+    ]
+
+    changes = BlenderUtils.GetCameraLoopChanges(hideLists)
+
+    # Object 1 is keyed when it's hidden and when it's shown back;
+    # object 2 is keyed right before it's hidden to keep the value until then
+    assert changes == [{1}, {1}, {1}, {2}, {2}]
+
+    assert BlenderUtils.GetCameraLoopChanges([GetHideLists()]) == [set()]
+
+
+class PointerObject(types.SimpleNamespace):
+    def as_pointer(self):
+        return id(self)
+
+
+def test_dupli_group_instancers():
+    tree  = PointerObject(name="Tree",  dupli_type='NONE', dupli_group=None)
+    grass = PointerObject(name="Grass", dupli_type='NONE', dupli_group=None)
+
+    trees = types.SimpleNamespace(name="Trees", objects=[tree])
+
+    # Nested group instanced by the group object
+    forestEmpty = PointerObject(name="ForestTrees", dupli_type='GROUP', dupli_group=trees)
+    forest = types.SimpleNamespace(name="Forest", objects=[forestEmpty, grass])
+
+    treeEmpty   = PointerObject(name="TreeEmpty",   dupli_type='GROUP', dupli_group=trees)
+    forestRoot  = PointerObject(name="ForestEmpty", dupli_type='GROUP', dupli_group=forest)
+
+    instancers = BlenderUtils.GetDupliGroupInstancers([tree, treeEmpty, forestRoot])
+
+    assert instancers[tree.as_pointer()] == [treeEmpty, forestRoot]
+    assert instancers[grass.as_pointer()] == [forestRoot]
+    assert instancers[forestEmpty.as_pointer()] == [forestRoot]
+    assert treeEmpty.as_pointer() not in instancers
+
+    # Group instancing itself
+    loop = types.SimpleNamespace(name="Loop", objects=[])
+    loopEmpty = PointerObject(name="LoopEmpty", dupli_type='GROUP', dupli_group=loop)
+    loop.objects.append(loopEmpty)
+
+    assert BlenderUtils.GetDupliGroupInstancers([loopEmpty]) == {loopEmpty.as_pointer() : [loopEmpty]}
+
+
+def GetCamera(name):
+    VRayCamera = types.SimpleNamespace(hide_from_view=True)
+    for hideType in BlenderUtils.HideFromViewTypes:
+        setattr(VRayCamera, 'hf_%s' % hideType, False)
+        setattr(VRayCamera, 'hf_%s_auto' % hideType, False)
+        setattr(VRayCamera, 'hf_%s_objects' % hideType, "")
+        setattr(VRayCamera, 'hf_%s_groups' % hideType, "")
+    return types.SimpleNamespace(name=name, data=types.SimpleNamespace(vray=VRayCamera))
+
+
+def test_visibility_index_matches_object_list(monkeypatch):
+    objects = {name : PointerObject(name=name, dupli_type='NONE', dupli_group=None) for name in ("A", "B", "C", "D", "E")}
+    groups  = {name : types.SimpleNamespace(name=name, objects=[]) for name in ("Set", "Inst", "hf_Camera")}
+
+    objects["Empty"] = PointerObject(name="Empty", dupli_type='GROUP', dupli_group=groups["Inst"])
+
+    groups["Set"].objects       = [objects["B"], objects["Empty"]]
+    groups["Inst"].objects      = [objects["D"], objects["E"]]
+    groups["hf_Camera"].objects = [objects["C"]]
+
+    monkeypatch.setattr(bpy.data, 'objects', objects)
+    monkeypatch.setattr(bpy.data, 'groups',  groups)
+
+    camera = GetCamera("Camera")
+    VRayCamera = camera.data.vray
+
+    index = BlenderUtils.CameraVisibilityIndex()
+
+    def check():
+        assert index.getCameraHideLists(camera) == BlenderUtils.GetCameraHideLists(camera)
+
+    VRayCamera.hf_camera = True
+    VRayCamera.hf_camera_objects = "A;Empty;Missing"
+    VRayCamera.hf_camera_groups  = "Set"
+    VRayCamera.hf_shadows      = True
+    VRayCamera.hf_shadows_auto = True
+    check()
+
+    # "hf_*" property changes
+    VRayCamera.hf_camera_objects = "A"
+    check()
+
+    VRayCamera.hf_gi = True
+    VRayCamera.hf_gi_groups = "Inst;hf_Camera"
+    check()
+
+    VRayCamera.hf_shadows_auto = False
+    check()
+
+    # Group membership changes, with and without the objects count change
+    groups["Set"].objects = [objects["C"], objects["Empty"]]
+    check()
+
+    groups["hf_Camera"].objects.append(objects["A"])
+    groups["Inst"].objects = [objects["E"]]
+    check()
+
+    VRayCamera.hide_from_view = False
+    check()
+    assert not any(index.getCameraHideLists(camera).values())
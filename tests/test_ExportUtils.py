@@ -0,0 +1,121 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import os
+import random
+
+import pytest
+
+import benchmark
+
+from vb30.lib import ExportUtils
+
+
+def ReadPlugins(filepath):
+    with open(filepath, 'r') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_schema_matches_per_call_walk(tmpdir, seed):
+    rnd = random.Random(seed)
+
+    pluginModules, source = benchmark.GetSchemaPluginModules(rnd)
+    plugins = benchmark.GetSchemaPlugins(rnd, pluginModules, str(tmpdir), numInstances=2)
+
+    legacyFilepath = os.path.join(str(tmpdir), "legacy.vrscene")
+    schemaFilepath = os.path.join(str(tmpdir), "schema.vrscene")
+
+    ExportUtils.ClearExportSchemas()
+
+    benchmark.WriteSchemaPlugins(legacyFilepath, plugins, benchmark.LegacyWritePluginParams)
+    benchmark.WriteSchemaPlugins(schemaFilepath, plugins, ExportUtils.WritePluginParams)
+
+    legacy = ReadPlugins(legacyFilepath)
+    assert legacy.count("{") == len(plugins)
+    assert ReadPlugins(schemaFilepath) == legacy
+
+
+def test_schema_is_rebuilt_on_params_change():
+    rnd = random.Random(0)
+
+    pluginModule = benchmark.GetSyntheticPluginModules(rnd, numPlugins=1)[0]
+
+    schema = ExportUtils.GetExportSchema(pluginModule)
+    assert ExportUtils.GetExportSchema(pluginModule) is schema
+
+    pluginModule.PluginParams = pluginModule.PluginParams[:4]
+    assert len(ExportUtils.GetExportSchema(pluginModule)) <= 4
+
+
+def test_numeric_lists_use_data_format(tmpdir):
+    import types
+
+    import mathutils
+
+    from vb30.lib import ListUtils
+    from vb30.lib import VRayStream
+
+    pluginModule = types.SimpleNamespace(
+        ID   = 'TexLists',
+        TYPE = 'TEXTURE',
+        PluginParams = (
+            {'attr' : 'ints',    'type' : 'INT_LIST',    'default' : None},
+            {'attr' : 'floats',  'type' : 'FLOAT_LIST',  'default' : None},
+            {'attr' : 'vectors', 'type' : 'VECTOR_LIST', 'default' : None},
+            {'attr' : 'colors',  'type' : 'COLOR_LIST',  'default' : None},
+            {'attr' : 'plugins', 'type' : 'LIST',        'default' : None},
+        ),
+    )
+
+    mappedParams = {
+        'ints'    : [1, 2, 3],
+        'floats'  : (0.0, 0.25, 1.0),
+        'vectors' : [mathutils.Vector((0.0, 1.0, 2.0))],
+        'colors'  : [mathutils.Color((0.5, 0.25, 1.0)), (1.0, 1.0, 1.0)],
+        'plugins' : "List(Tex1,Tex2)",
+    }
+
+    filepath = os.path.join(str(tmpdir), "lists.vrscene")
+
+    o = VRayStream.VRaySimplePluginExporter(filepath)
+    o.setDataFormat('HEX')
+    ExportUtils.WritePluginCustom(benchmark.GetBus(o), pluginModule, "Lists", None, mappedParams)
+    o.done()
+
+    attrs = {}
+    for line in ReadPlugins(filepath).splitlines():
+        attrName, sep, attrValue = line.strip().partition("=")
+        if sep:
+            attrs[attrName] = attrValue.rstrip(";")
+
+    assert attrs['ints'].startswith('ListIntHex("')
+    assert ListUtils.ParseList(attrs['ints']) == ListUtils.ListInt([1, 2, 3])
+    assert ListUtils.ParseList(attrs['floats']) == ListUtils.ListFloat([0.0, 0.25, 1.0])
+    assert ListUtils.ParseList(attrs['vectors']) == ListUtils.ListVector([(0.0, 1.0, 2.0)])
+    assert ListUtils.ParseList(attrs['colors']) == ListUtils.ListColor([(0.5, 0.25, 1.0), (1.0, 1.0, 1.0)])
+
+    # Generic lists are not typed
+    assert attrs['plugins'] == "List(Tex1,Tex2)"
@@ -0,0 +1,110 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import random
+import struct
+
+import pytest
+
+from vb30.lib import ListUtils
+
+
+# Values exactly representable as 32-bit floats
+#
+def GetFloat(rnd):
+    return rnd.randint(-4096, 4096) / 64.0
+
+
+def GetValues(listType, count, seed=0):
+    rnd = random.Random(seed)
+    itemSize = ListUtils.ListTypes[listType][1]
+    if listType == 'ListInt':
+        return [rnd.randint(-2**31, 2**31 - 1) for i in range(count)]
+    if itemSize == 1:
+        return [GetFloat(rnd) for i in range(count)]
+    return [tuple(GetFloat(rnd) for c in range(itemSize)) for i in range(count)]
+
+
+@pytest.fixture(params=['numpy', 'struct'])
+def packer(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ListUtils, 'numpy', None)
+    return request.param
+
+
+@pytest.mark.parametrize('listType', sorted(ListUtils.ListTypes))
+@pytest.mark.parametrize('dataFormat', ['ASCII', 'HEX', 'ZIP'])
+@pytest.mark.parametrize('count', [0, 1, 5, 1000])
+def test_round_trip(packer, listType, dataFormat, count):
+    listValue = ListUtils.ListValue(listType, GetValues(listType, count))
+
+    s = ListUtils.FormatList(listValue, dataFormat)
+
+    assert ListUtils.ParseList(s) == listValue
+
+
+def test_zip_format(packer):
+    listValue = ListUtils.ListInt([7] * 1000)
+
+    s = ListUtils.FormatList(listValue, 'ZIP')
+    assert s.startswith('ListIntHex("ZIPB')
+
+    hexData = s[len('ListIntHex("'):-len('")')]
+    data = ListUtils.DecodeHex(hexData)
+    assert data == struct.pack("<1000i", *([7] * 1000))
+    assert ListUtils.UnpackValues('ListInt', data) == [7] * 1000
+
+
+def test_zip_short_list_is_not_compressed(packer):
+    s = ListUtils.FormatList(ListUtils.ListInt([1, 2]), 'ZIP')
+    assert s == 'ListIntHex("%s")' % ListUtils.GetHex(struct.pack("<2i", 1, 2))
+
+
+def test_pack_is_little_endian(packer):
+    data = ListUtils.PackValues('ListVector', [(1.0, 2.0, 3.0)])
+    assert data == struct.pack("<3f", 1.0, 2.0, 3.0)
+
+
+@pytest.mark.parametrize('listType', sorted(ListUtils.ListTypes))
+def test_numpy_matches_struct(monkeypatch, listType):
+    pytest.importorskip("numpy")
+
+    values = GetValues(listType, 100)
+    if listType == 'ListInt':
+        values += [-2**31, 2**31 - 1]
+
+    assert ListUtils.numpy is not None
+    numpyData = ListUtils.PackValues(listType, values)
+
+    monkeypatch.setattr(ListUtils, 'numpy', None)
+    assert ListUtils.PackValues(listType, values) == numpyData
+
+
+def test_decode_invalid_zip_size():
+    s = "ZIPB%08X" % 8 + ListUtils.GetZip(struct.pack("<i", 1))[12:]
+    with pytest.raises(ValueError):
+        ListUtils.DecodeHex(s)
@@ -0,0 +1,47 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import os
+
+from vb30.lib import PathUtils
+
+
+def test_duplicate_filepaths():
+    filepaths = {
+        0 : "/tmp/vrscene/Set.vrscene",
+        1 : "/tmp/vrscene/Other.vrscene",
+        2 : "/tmp/vrscene/../vrscene/Set.vrscene",
+        3 : "/tmp/vrscene/./Other.vrscene",
+        4 : "/tmp/vrscene/Unique.vrscene",
+    }
+
+    assert PathUtils.GetDuplicateFilepaths(filepaths) == [
+        (os.path.normcase(os.path.normpath("/tmp/vrscene/Other.vrscene")), [1, 3]),
+        (os.path.normcase(os.path.normpath("/tmp/vrscene/Set.vrscene")),   [0, 2]),
+    ]
+
+    del filepaths[2], filepaths[3]
+    assert PathUtils.GetDuplicateFilepaths(filepaths) == []
+    assert PathUtils.GetDuplicateFilepaths({}) == []
@@ -0,0 +1,158 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import json
+import os
+
+from vb30.lib import VRayAssetSync
+
+
+def WriteFile(filepath, data, mtime=None):
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    if mtime is not None:
+        os.utime(filepath, ns=(mtime, mtime))
+
+
+def GetPaths(tmpdir):
+    srcDir    = os.path.join(str(tmpdir), "src")
+    sharedDir = os.path.join(str(tmpdir), "shared")
+    os.makedirs(srcDir)
+    os.makedirs(sharedDir)
+    return os.path.join(srcDir, "wood.png"), sharedDir, os.path.join(sharedDir, "textures", "wood.png")
+
+
+def Sync(sharedDir, srcFilepath, dstFilepath):
+    assetSync = VRayAssetSync.VRayAssetSync(sharedDir, 2)
+    assetSync.add(srcFilepath, dstFilepath)
+    assetSync.wait()
+    return assetSync
+
+
+def test_copy(tmpdir):
+    srcFilepath, sharedDir, dstFilepath = GetPaths(tmpdir)
+    WriteFile(srcFilepath, b"wood", 1000)
+
+    assetSync = Sync(sharedDir, srcFilepath, dstFilepath)
+    assert assetSync.filesCopied == 1
+    assert not assetSync.hasErrors()
+
+    with open(dstFilepath, 'rb') as f:
+        assert f.read() == b"wood"
+
+    manifest = VRayAssetSync.LoadManifest(os.path.join(sharedDir, VRayAssetSync.ManifestFilename))
+    assert manifest['textures/wood.png'] == {
+        'src'   : srcFilepath,
+        'size'  : 4,
+        'mtime' : 1000,
+        'hash'  : VRayAssetSync.GetFileHash(srcFilepath),
+    }
+
+
+def test_skip_same_size_and_mtime(tmpdir):
+    srcFilepath, sharedDir, dstFilepath = GetPaths(tmpdir)
+    WriteFile(srcFilepath, b"wood", 1000)
+    Sync(sharedDir, srcFilepath, dstFilepath)
+
+    # Destination is not read, so changed content of the same size is kept
+    WriteFile(dstFilepath, b"oak!")
+
+    assetSync = Sync(sharedDir, srcFilepath, dstFilepath)
+    assert assetSync.filesSkipped == 1
+    assert assetSync.filesCopied == 0
+
+    with open(dstFilepath, 'rb') as f:
+        assert f.read() == b"oak!"
+
+
+def test_skip_same_hash(tmpdir):
+    srcFilepath, sharedDir, dstFilepath = GetPaths(tmpdir)
+    WriteFile(srcFilepath, b"wood", 1000)
+    Sync(sharedDir, srcFilepath, dstFilepath)
+    dstMtime = os.stat(dstFilepath).st_mtime_ns
+
+    # Touched source with the same content
+    WriteFile(srcFilepath, b"wood", 2000)
+
+    assetSync = Sync(sharedDir, srcFilepath, dstFilepath)
+    assert assetSync.filesSkipped == 1
+    assert os.stat(dstFilepath).st_mtime_ns == dstMtime
+
+    # New mtime is stored, the next sync doesn't hash the file
+    manifest = VRayAssetSync.LoadManifest(assetSync.manifestFilepath)
+    assert manifest['textures/wood.png']['mtime'] == 2000
+
+    # Touched source with new content
+    WriteFile(srcFilepath, b"pine", 3000)
+
+    assetSync = Sync(sharedDir, srcFilepath, dstFilepath)
+    assert assetSync.filesCopied == 1
+    with open(dstFilepath, 'rb') as f:
+        assert f.read() == b"pine"
+
+
+def test_copy_missing_destination(tmpdir):
+    srcFilepath, sharedDir, dstFilepath = GetPaths(tmpdir)
+    WriteFile(srcFilepath, b"wood", 1000)
+    Sync(sharedDir, srcFilepath, dstFilepath)
+
+    os.remove(dstFilepath)
+
+    assetSync = Sync(sharedDir, srcFilepath, dstFilepath)
+    assert assetSync.filesCopied == 1
+    assert os.path.isfile(dstFilepath)
+
+
+def test_corrupt_manifest(tmpdir):
+    srcFilepath, sharedDir, dstFilepath = GetPaths(tmpdir)
+    WriteFile(srcFilepath, b"wood", 1000)
+    Sync(sharedDir, srcFilepath, dstFilepath)
+
+    manifestFilepath = os.path.join(sharedDir, VRayAssetSync.ManifestFilename)
+
+    for data in ("{\"version\": 1, \"assets\": {", "[]", json.dumps({'version' : 1, 'assets' : []})):
+        with open(manifestFilepath, 'w') as f:
+            f.write(data)
+
+        assert VRayAssetSync.LoadManifest(manifestFilepath) == {}
+
+        # Everything is copied again and the manifest is rewritten
+        assetSync = Sync(sharedDir, srcFilepath, dstFilepath)
+        assert assetSync.filesCopied == 1
+        assert 'textures/wood.png' in VRayAssetSync.LoadManifest(manifestFilepath)
+
+    with open(manifestFilepath, 'w') as f:
+        json.dump({'version' : 1, 'assets' : {'textures/wood.png' : "wood"}}, f)
+    assert VRayAssetSync.LoadManifest(manifestFilepath) == {}
+
+
+def test_copy_error(tmpdir):
+    srcFilepath, sharedDir, dstFilepath = GetPaths(tmpdir)
+
+    # Source is removed after export has checked it
+    assetSync = Sync(sharedDir, srcFilepath, dstFilepath)
+    assert assetSync.hasErrors()
+    assert assetSync.getErrorsReport() == "textures/wood.png"
+    assert not os.path.exists(dstFilepath)
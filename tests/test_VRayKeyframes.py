@@ -0,0 +1,347 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import os
+
+import mathutils
+import pytest
+
+import benchmark
+
+from vb30.lib import VRayKeyframes
+
+
+def GetCache(tolerance=0.0):
+    cache = VRayKeyframes.VRayKeyframeCache()
+    cache.setTolerance(tolerance)
+    return cache, cache.getPluginId("Plugin")
+
+
+def test_interned_ids():
+    cache, pluginId = GetCache()
+
+    assert cache.getPluginId("Plugin") == pluginId
+    assert cache.getPluginId("Other") != pluginId
+
+    cache.store(pluginId, "value", 1, 0.5)
+    cache.store(cache.getPluginId("Other"), "value", 1, 0.5)
+    assert len(cache.attrIds) == 1
+
+
+def test_store_and_compare():
+    cache, pluginId = GetCache()
+
+    assert cache.getSlot(pluginId, "value") is None
+    assert cache.compare(pluginId, "value", 0.5) is None
+
+    slot = cache.store(pluginId, "value", 1, 0.5)
+    assert cache.getSlot(pluginId, "value") == slot
+    assert cache.getFrame(slot) == 1
+    assert cache.isEqual(slot, 0.5)
+    assert not cache.isEqual(slot, 0.5000001)
+    assert not cache.isEqual(slot, 1)
+    assert cache.compare(pluginId, "value", 0.5) == VRayKeyframes.SLOT_UNCHANGED
+    assert cache.compare(pluginId, "value", 0.5000001) == slot
+
+    cache.store(pluginId, "value", 2, 0.75, slot)
+    assert cache.getFrame(slot) == 2
+    assert cache.getValue(slot) == 0.75
+    assert cache.getFormattedValue(slot) == "0.75"
+
+
+def test_value_kinds():
+    cache, pluginId = GetCache()
+
+    values = {
+        'bool'   : True,
+        'int'    : 7,
+        'vector' : mathutils.Vector((1.0, 2.0, 3.0)),
+        'color'  : mathutils.Color((0.1, 0.2, 0.3)),
+        'matrix' : mathutils.Matrix(((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))),
+        'string' : '"name"',
+    }
+    slots = {attrName : cache.store(pluginId, attrName, 1, values[attrName]) for attrName in values}
+
+    for attrName, value in values.items():
+        assert cache.isEqual(slots[attrName], value), attrName
+        assert cache.compare(pluginId, attrName, value) == VRayKeyframes.SLOT_UNCHANGED, attrName
+
+    assert not cache.isEqual(slots['int'], True)
+    assert not cache.isEqual(slots['bool'], 1)
+    assert not cache.isEqual(slots['vector'], mathutils.Vector((1.0, 2.0, 3.5)))
+    assert not cache.isEqual(slots['vector'], mathutils.Color((1.0, 2.0, 3.0)))
+    assert not cache.isEqual(slots['string'], '"other"')
+    assert not cache.isEqual(slots['string'], mathutils.Vector((1.0, 2.0, 3.0)))
+
+    assert cache.compare(pluginId, 'int', True) == slots['int']
+    assert cache.compare(pluginId, 'vector', mathutils.Color((1.0, 2.0, 3.0))) == slots['vector']
+    assert cache.compare(pluginId, 'color', mathutils.Color((0.1, 0.2, 0.4))) == slots['color']
+    assert cache.compare(pluginId, 'string', '"other"') == slots['string']
+
+    assert tuple(cache.getValue(slots['vector'])) == (1.0, 2.0, 3.0)
+    assert cache.getValue(slots['matrix']) == values['matrix']
+    assert cache.getValue(slots['string']) == '"name"'
+
+
+def test_kind_change():
+    cache, pluginId = GetCache()
+
+    slot = cache.store(pluginId, "value", 1, '"name"')
+    cache.store(pluginId, "value", 2, mathutils.Vector((1.0, 2.0, 3.0)), slot)
+    assert cache.isEqual(slot, mathutils.Vector((1.0, 2.0, 3.0)))
+    assert slot not in cache.objects
+
+    cache.store(pluginId, "value", 3, 4.0, slot)
+    assert cache.isEqual(slot, 4.0)
+    assert cache.getValue(slot) == 4.0
+
+
+def test_new_plugin():
+    cache, pluginId = GetCache()
+
+    assert cache.isNewPlugin(pluginId)
+    # Plugin values are added but not yet moved to the arrays
+    assert not cache.isNewPlugin(pluginId)
+
+    matrix = mathutils.Matrix()
+    slot = cache.add(pluginId, "matrix", 1, matrix)
+    cache.add(pluginId, "value", 1, 0.5)
+
+    # Added value is copied, not referenced
+    matrix[0][3] = 5.0
+
+    assert cache.compare(pluginId, "value", 0.5) == VRayKeyframes.SLOT_UNCHANGED
+    assert cache.getValue(slot) == mathutils.Matrix()
+    assert cache.compare(pluginId, "matrix", matrix) == slot
+    assert not cache.isNewPlugin(pluginId)
+
+
+def test_tolerance():
+    cache, pluginId = GetCache(tolerance=0.01)
+
+    floatSlot  = cache.store(pluginId, "float", 1, 0.5)
+    vectorSlot = cache.store(pluginId, "vector", 1, mathutils.Vector((1.0, 2.0, 3.0)))
+    colorSlot  = cache.store(pluginId, "color", 1, mathutils.Color((0.1, 0.2, 0.3)))
+    matrixSlot = cache.store(pluginId, "matrix", 1, mathutils.Matrix())
+    intSlot    = cache.store(pluginId, "int", 1, 7)
+
+    assert cache.compare(pluginId, "float", 0.505) == VRayKeyframes.SLOT_UNCHANGED
+    assert cache.compare(pluginId, "float", 0.52) == floatSlot
+    assert cache.compare(pluginId, "vector", mathutils.Vector((1.005, 1.995, 3.0))) == VRayKeyframes.SLOT_UNCHANGED
+    assert cache.compare(pluginId, "vector", mathutils.Vector((1.0, 2.0, 3.02))) == vectorSlot
+    assert cache.compare(pluginId, "color", mathutils.Color((0.105, 0.2, 0.3))) == VRayKeyframes.SLOT_UNCHANGED
+    assert cache.compare(pluginId, "color", mathutils.Color((0.1, 0.22, 0.3))) == colorSlot
+
+    m = mathutils.Matrix()
+    m[0][3] = 0.005
+    assert cache.compare(pluginId, "matrix", m) == VRayKeyframes.SLOT_UNCHANGED
+    m[0][3] = 0.5
+    assert cache.compare(pluginId, "matrix", m) == matrixSlot
+
+    # Integers are always compared exactly
+    assert cache.compare(pluginId, "int", 8) == intSlot
+
+
+def test_matrix_shapes():
+    cache, pluginId = GetCache()
+
+    m3 = mathutils.Matrix(((1.0, 2.0, 3.0), (4.0, 5.0, 6.0), (7.0, 8.0, 9.0)))
+    m4 = mathutils.Matrix()
+    m34 = mathutils.Matrix(((1.0, 2.0, 3.0, 4.0), (5.0, 6.0, 7.0, 8.0), (9.0, 10.0, 11.0, 12.0)))
+
+    assert VRayKeyframes.GetValueComponents(m3)[0] == VRayKeyframes.KEY_MATRIX
+    assert VRayKeyframes.GetValueComponents(m4)[0] == VRayKeyframes.KEY_MATRIX
+    assert VRayKeyframes.GetValueComponents(m34) == (VRayKeyframes.KEY_OBJECT, None)
+
+    assert VRayKeyframes.MakeValue(VRayKeyframes.KEY_MATRIX, tuple(range(9))) == [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+    with pytest.raises(ValueError):
+        VRayKeyframes.MakeValue(VRayKeyframes.KEY_MATRIX, tuple(range(12)))
+
+    # Non-square matrix is cached as a copy
+    slot = cache.store(pluginId, "matrix", 1, m34)
+    m34[0][0] = 0.0
+    assert cache.compare(pluginId, "matrix", m34) == slot
+    cache.store(pluginId, "matrix", 2, m34, slot)
+    assert cache.compare(pluginId, "matrix", m34) == VRayKeyframes.SLOT_UNCHANGED
+    assert VRayKeyframes.IsReducible(m3)
+    assert not VRayKeyframes.IsReducible(m34)
+
+
+def WriteAnimation(o, values, tmpdir):
+    from vb30.lib import VRayStream
+
+    fm = VRayStream.VRayExportFiles(benchmark.BenchmarkFilePaths(str(tmpdir)))
+    fm.init()
+
+    o.setFileManager(fm)
+    o.setAnimation(True)
+    o.setFrameStart(1)
+    o.setFrameEnd(len(values))
+    o.setFrameStep(1)
+
+    for frame, value in enumerate(values, 1):
+        o.setFrame(frame)
+        o.set('TEXTURE', 'TexFloat', "Tex")
+        o.writeHeader()
+        o.writeAttibute("input", value)
+        o.writeFooter()
+    o.writePendingKeyframes()
+    o.done()
+
+    # Skip header with the export time
+    with open(os.path.join(str(tmpdir), "benchmark_textures.vrscene"), 'r') as f:
+        return "".join(line for line in f if not line.startswith("//"))
+
+
+def test_output_matches_legacy_writer(tmpdir):
+    from vb30.lib import VRayStream
+
+    values = [0.5, 0.5, 0.5, 0.75, 0.75000001, 1, True, '"name"', '"name"', mathutils.Vector((1.0, 2.0, 3.0))]
+
+    output = WriteAnimation(VRayStream.VRayPluginExporter(), values, tmpdir.mkdir("new"))
+    legacyOutput = WriteAnimation(benchmark.GetLegacyPluginExporter(), values, tmpdir.mkdir("old"))
+
+    assert output == legacyOutput
+    assert "interpolate((3,0.5),(4,0.75))" in output
+
+
+def test_tolerance_output(tmpdir):
+    from vb30.lib import VRayStream
+
+    o = VRayStream.VRayPluginExporter()
+    o.setKeyframeTolerance(0.1)
+
+    output = WriteAnimation(o, [0.5, 0.55, 0.58, 0.65], tmpdir)
+
+    # Changes are accumulated from the last exported value
+    assert "interpolate((1,0.5))" in output
+    assert "0.55" not in output
+    assert "0.58" not in output
+    assert "interpolate((3,0.5),(4,0.65))" in output
+
+
+def test_is_linear_epsilon():
+    # Deviation of the middle value from the line is compared with epsilon
+    assert VRayKeyframes.IsLinear(0, (0.0,), 1, (0.75,), 2, (1.0,), 0.25)
+    assert not VRayKeyframes.IsLinear(0, (0.0,), 1, (0.75,), 2, (1.0,), 0.125)
+    assert VRayKeyframes.IsLinear(0, (0.0,), 1, (0.5,), 2, (1.0,), 0.0)
+
+    # Every component is checked
+    assert not VRayKeyframes.IsLinear(0, (0.0, 0.0), 1, (0.5, 0.75), 2, (1.0, 1.0), 0.125)
+
+    assert not VRayKeyframes.IsLinear(1, (0.0,), 1, (0.0,), 1, (0.0,), 1.0)
+
+
+def AddKeys(reducer, values, attrName="input"):
+    return [reducer.add('TEXTURE', 'TexFloat', "Tex", attrName, frame, value) for frame, value in enumerate(values, 1)]
+
+
+def test_reducer_epsilon():
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.25)
+
+    # Frame 3 deviates from the (1,0) - (4,3) line for exactly epsilon
+    assert AddKeys(reducer, [0.0, 1.0, 2.25, 3.0]) == [[(1, 0.0)], [], [], []]
+
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.125)
+    assert AddKeys(reducer, [0.0, 1.0, 2.25, 3.0]) == [[(1, 0.0)], [], [], [(3, 2.25)]]
+
+
+def test_reducer_first_and_last_keys():
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.001)
+
+    assert AddKeys(reducer, [0.5 * i for i in range(10)]) == [[(1, 0.0)]] + [[]] * 9
+    assert reducer.flush() == [('TEXTURE', 'TexFloat', "Tex", {"input" : (10, 4.5)})]
+    assert reducer.flush() == []
+
+    # Constant value is written only once
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.001)
+    assert AddKeys(reducer, [1.0] * 5) == [[(1, 1.0)]] + [[]] * 4
+    assert reducer.flush() == [('TEXTURE', 'TexFloat', "Tex", {"input" : (5, 1.0)})]
+
+
+@pytest.mark.parametrize('valueType', [mathutils.Vector, mathutils.Color])
+def test_reducer_vectors(valueType):
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.001)
+
+    values = [valueType((i, 2.0 * i, 1.0)) for i in range(4)] + [valueType((4.0, 6.0, 1.0))]
+
+    keys = AddKeys(reducer, values)
+    assert keys[0] == [(1, values[0])]
+    assert keys[1:4] == [[], [], []]
+    # Second component is not on the line anymore
+    assert keys[4] == [(4, values[3])]
+    assert type(keys[4][0][1]) is valueType
+
+    assert reducer.flush() == [('TEXTURE', 'TexFloat', "Tex", {"input" : (5, values[4])})]
+
+
+def test_reducer_matrix():
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.001)
+
+    values = []
+    for i in range(4):
+        m = mathutils.Matrix()
+        m[0][3] = i * 0.5
+        values.append(m)
+    values[3][1][3] = 1.0
+
+    keys = AddKeys(reducer, values)
+    assert keys[:3] == [[(1, values[0])], [], []]
+    assert keys[3] == [(3, values[2])]
+    assert reducer.flush()[0][3]["input"] == (4, values[3])
+
+
+def test_reducer_kind_change():
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.001)
+
+    vector = mathutils.Vector((1.0, 2.0, 3.0))
+
+    # Pending float key is written along with the new value
+    keys = AddKeys(reducer, [0.0, 1.0, 2.0, vector])
+    assert keys == [[(1, 0.0)], [], [], [(3, 2.0), (4, vector)]]
+    assert reducer.flush() == []
+
+    # Attribute gets non-reducible value
+    reducer = VRayKeyframes.VRayKeyframeReducer(0.001)
+    AddKeys(reducer, [0.0, 1.0, 2.0])
+    assert reducer.pop("Tex", "input") == [(3, 2.0)]
+    assert reducer.pop("Tex", "input") == []
+    assert reducer.flush() == []
+
+
+def test_reducer_output(tmpdir):
+    from vb30.lib import VRayStream
+
+    o = VRayStream.VRayPluginExporter()
+    o.setKeyframeReduction(0.001)
+
+    values = [0.0, 1.0, 2.0, '"tex"', '"tex"', 3.0, 4.0, 5.0]
+    output = WriteAnimation(o, values, tmpdir)
+
+    assert output.count("input=") == 4
+    assert "input=interpolate((1,0));" in output
+    assert 'input=interpolate((3,2),(4,"tex"));' in output
+    assert "input=interpolate((6,3));" in output
+    # Pending key is written after the last frame
+    assert "input=interpolate((8,5));" in output
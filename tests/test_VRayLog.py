@@ -0,0 +1,158 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import glob
+import os
+
+import pytest
+
+from vb30.lib import VRayLog
+
+
+# "*_synthetic.log" files are written by hand following the line formats
+# listed in VRayLog.py, they are not captured from V-Ray.
+# Output captured from V-Ray Standalone ("vray ... > vray_<version>.log 2>&1")
+# is put into "fixtures/captured" and checked with test_captured_logs().
+#
+FixturesDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CapturedLogs = sorted(glob.glob(os.path.join(FixturesDir, "captured", "*.log")))
+
+
+def ParseLog(filename):
+    parser = VRayLog.VRayLogParser()
+    events = []
+    with open(os.path.join(FixturesDir, filename), 'r', errors='replace') as f:
+        # Progress lines are updated in place with '\r'
+        for line in f.read().replace("\r", "\n").split("\n"):
+            event = parser.parseLine(line)
+            if event:
+                events.append(event)
+    return events
+
+
+def FindEvent(events, text):
+    for event in events:
+        if text in event['message']:
+            return event
+    return None
+
+
+def test_task_progress():
+    events = ParseLog("vray_standalone_synthetic.log")
+
+    event = FindEvent(events, "Building light cache...: 45.00%")
+    assert event['frame']     == 1
+    assert event['task']      == "Building light cache"
+    assert event['percent']   == 45.0
+    assert event['elapsed']   == 1.2
+    assert event['remaining'] == 1.5
+    assert event['pass'] is None
+    assert not event['error']
+
+    event = FindEvent(events, "Rendering image...: done")
+    assert event['task']    == "Rendering image"
+    assert event['percent'] == 100.0
+    assert event['elapsed'] == 16.1
+
+
+def test_progressive_pass():
+    events = ParseLog("vray_standalone_synthetic.log")
+
+    event = FindEvent(events, "Progressive rendering: pass 5")
+    assert event['pass']    == 5
+    assert event['task']    is None
+    assert event['percent'] is None
+
+    assert FindEvent(events, "Number of raycast passes") is None
+    assert FindEvent(events, "64 passes done") is None
+
+
+def test_frames():
+    events = ParseLog("vray_standalone_synthetic.log")
+
+    assert FindEvent(events, "Starting frame 1")['frame'] == 1
+    assert FindEvent(events, "Rendering image...: 12.50%")['frame'] == 1
+    assert FindEvent(events, "Starting frame 2")['frame'] == 2
+
+
+def test_memory():
+    events = ParseLog("vray_standalone_synthetic.log")
+
+    assert FindEvent(events, "Memory usage")['memory'] == 312.5
+    assert FindEvent(events, "Used memory")['memory'] == 1280.0
+    assert FindEvent(events, "Rendering image...: done")['memory'] is None
+
+
+def test_errors():
+    events = ParseLog("vray_standalone_synthetic.log")
+
+    errors = [event for event in events if event['error']]
+    assert [event['message'] for event in errors] == ['error: Failed to load plugin "TexFoo"']
+
+    # Error event doesn't inherit the state of the previous events
+    event = errors[0]
+    assert event['task']    is None
+    assert event['percent'] is None
+    assert event['pass']    is None
+    assert event['memory']  is None
+
+    assert FindEvent(events, "0 error(s), 2 warning(s)") is None
+    assert FindEvent(events, "warning: Bitmap file") is None
+
+
+def test_ansi_and_carriage_return():
+    events = ParseLog("vray_ansi_synthetic.log")
+
+    assert [event['percent'] for event in events[:2]] == [50.0, 75.0]
+    assert events[1]['remaining'] == 4.0
+    assert events[1]['frame'] is None
+    assert events[2]['error']
+
+
+def test_format_event():
+    events = ParseLog("vray_standalone_synthetic.log")
+
+    event = FindEvent(events, "Building light cache...: 45.00%")
+    assert VRayLog.FormatEvent(event) == "Frame 1 | Building light cache 45.0% | Elapsed 0:00:01 | Remaining 0:00:01"
+
+
+@pytest.mark.skipif(not CapturedLogs, reason="no captured V-Ray output in fixtures/captured")
+@pytest.mark.parametrize('filepath', CapturedLogs)
+def test_captured_logs(filepath):
+    events = ParseLog(filepath)
+
+    # Every render reports some progress
+    assert any(event['percent'] is not None for event in events)
+
+    for event in events:
+        if event['percent'] is not None:
+            assert 0.0 <= event['percent'] <= 100.0
+            assert event['task']
+        for key in ('elapsed', 'remaining', 'memory'):
+            assert event[key] is None or event[key] >= 0.0
+
+    frames = [event['frame'] for event in events if event['frame'] is not None]
+    assert frames == sorted(frames)
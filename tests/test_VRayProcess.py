@@ -0,0 +1,131 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+from vb30.lib import VRayProcess
+
+
+# Stands in for VRayProcess; the test finishes it by setting 'exitCode'
+#
+class StubProcess:
+    def __init__(self, sceneFile, exitCode=None):
+        self.sceneFile = sceneFile
+        self.exitCode  = exitCode
+        self.started   = False
+        self.killed    = False
+        self.waitExit  = True
+        self.numEvents = 0
+
+    def setWaitExit(self, waitExit):
+        self.waitExit = waitExit
+
+    def run(self):
+        self.started = True
+        return None
+
+    def processEvents(self):
+        self.numEvents += 1
+
+    def is_running(self):
+        return self.started and not self.killed and self.exitCode is None
+
+    def getExitCode(self):
+        return self.exitCode
+
+    def kill(self):
+        self.killed = True
+
+
+def Aborted():
+    return True
+
+
+def test_slot_limit():
+    pool = VRayProcess.VRayProcessPool(2)
+
+    p1 = StubProcess("frame1.vrscene")
+    p2 = StubProcess("frame2.vrscene")
+    p3 = StubProcess("frame3.vrscene")
+
+    pool.run(p1)
+    pool.run(p2)
+    assert p1.started and p2.started
+    assert not p1.waitExit
+
+    # No free slot, waiting is aborted
+    assert pool.run(p3, Aborted) is None
+    assert not p3.started
+
+    p1.exitCode = 0
+    pool.run(p3, Aborted)
+    assert p3.started
+    assert [p for p, name in pool.processes] == [p2, p3]
+    assert p1.numEvents > 0
+    assert not pool.hasFailures()
+
+
+def test_abort():
+    pool = VRayProcess.VRayProcessPool(2)
+
+    p1 = StubProcess("frame1.vrscene")
+    pool.run(p1)
+
+    assert not pool.wait(Aborted)
+    assert not p1.killed
+
+    pool.kill()
+    assert p1.killed
+    assert pool.processes == []
+    assert pool.wait(Aborted)
+
+
+def test_exit_codes():
+    pool = VRayProcess.VRayProcessPool(2)
+
+    p1 = StubProcess("frame1.vrscene")
+    p2 = StubProcess("frame2.vrscene")
+    pool.run(p1, name="frame 1")
+    pool.run(p2, name="frame 2")
+
+    p1.exitCode = 0
+    p2.exitCode = 3
+    assert pool.wait()
+
+    assert pool.failures == [("frame 2", 3)]
+    assert pool.getFailuresReport() == "frame 2 (exit code 3)"
+
+    # Nothing is started after a failure
+    p3 = StubProcess("frame3.vrscene")
+    assert pool.run(p3, name="frame 3") is None
+    assert not p3.started
+
+
+def test_exit_code_of_finished_process():
+    pool = VRayProcess.VRayProcessPool(1)
+
+    # Process exits before run() returns
+    p1 = StubProcess("frame1.vrscene", exitCode=-11)
+    pool.run(p1)
+
+    assert pool.processes == []
+    assert pool.failures == [("frame1.vrscene", -11)]
@@ -0,0 +1,184 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import binascii
+import os
+import struct
+
+import pytest
+
+from vb30.lib import ListUtils
+from vb30.lib import VRaySceneStream
+
+
+Transform = ((1.0, 0.0, 0.0), (0.0, 0.0, 1.0), (0.0, -1.0, 0.0))
+Offset    = (1.0, 2.0, 3.0)
+
+
+def GetTransformHex():
+    data = struct.pack("fffffffffddd", *(Transform[0] + Transform[1] + Transform[2] + Offset))
+    return ListUtils.GetHex(data)
+
+
+def GetMatrixHex():
+    data = struct.pack("fffffffff", *(Transform[0] + Transform[1] + Transform[2]))
+    return ListUtils.GetHex(data)
+
+
+def WriteScene(dirpath):
+    filepath = os.path.join(str(dirpath), "scene.vrscene")
+    with open(filepath, 'w') as f:
+        f.write('UVWGenChannel uvw {\n')
+        f.write('  uvw_transform=TransformHex("%s");\n' % GetTransformHex())
+        f.write('  uvw_matrix=MatrixHex("%s");\n' % GetMatrixHex())
+        f.write('  wrap_u=1;\n')
+        f.write('}\n\n')
+        f.write('TexBitmap bitmap {\n')
+        f.write('  uvwgen=uvw;\n')
+        f.write('  broken_transform=TransformHex("XYZ");\n')
+        f.write('  broken_list=ListIntHex("ZIPB0000000400000002FF");\n')
+        f.write('  gamma=2.2;\n')
+        f.write('}\n')
+    return filepath
+
+
+# Same decoding as the importer's hex code path
+#
+def GetImportedTransform(attrValue):
+    tmArray = struct.unpack("fffffffffddd", binascii.unhexlify(bytes(attrValue, 'ascii')))
+    return tmArray[:9], tmArray[9:]
+
+
+def GetPlugins(filepath):
+    return {p['Name']: p for p in VRaySceneStream.IterVrscene(filepath)}
+
+
+def test_transform_hex(tmpdir):
+    plugins = GetPlugins(WriteScene(tmpdir))
+
+    attrValue = plugins['uvw']['Attributes']['uvw_transform']
+    assert attrValue == GetTransformHex()
+
+    tm, offs = GetImportedTransform(attrValue)
+    assert tm   == Transform[0] + Transform[1] + Transform[2]
+    assert offs == Offset
+
+
+def test_matrix_hex(tmpdir):
+    plugins = GetPlugins(WriteScene(tmpdir))
+
+    attrValue = plugins['uvw']['Attributes']['uvw_matrix']
+    assert attrValue == GetMatrixHex()
+    assert struct.unpack("fffffffff", binascii.unhexlify(bytes(attrValue, 'ascii'))) == Transform[0] + Transform[1] + Transform[2]
+
+
+def test_malformed_values_are_skipped(tmpdir):
+    plugins = GetPlugins(WriteScene(tmpdir))
+
+    attrs = plugins['bitmap']['Attributes']
+    assert 'broken_transform' not in attrs
+    assert 'broken_list' not in attrs
+    assert attrs['uvwgen'] == 'uvw'
+    assert attrs['gamma'] == pytest.approx(2.2)
+
+
+def test_lazy_malformed_value(tmpdir):
+    filepath = WriteScene(tmpdir)
+    plugins = {p['Name']: p for p in VRaySceneStream.IterVrscene(filepath, lazySize=1)}
+
+    attrs = plugins['bitmap']['Attributes']
+    assert attrs.get('broken_transform') is None
+    assert 'broken_transform' not in attrs
+    with pytest.raises(KeyError):
+        attrs['broken_list']
+    assert dict(attrs.items()) == {'uvwgen' : 'uvw', 'gamma' : pytest.approx(2.2)}
+    assert plugins['uvw']['Attributes']['uvw_transform'] == GetTransformHex()
+
+
+# Values as returned by vray_tools ParseVrscene() and decoded by
+# nodes/importing.py: plugin references are strings, colors and vectors
+# are sequences, Matrix is rows, Transform is (rows, offset) and hex
+# matrices are kept as hex strings.
+#
+ImporterValues = (
+    ('int_value',       '1',                           1),
+    ('float_value',     '2.5',                         2.5),
+    ('string_value',    '"path/bitmap.png"',           "path/bitmap.png"),
+    ('plugin_value',    'bitmap',                      "bitmap"),
+    ('output_value',    'bitmap::out_intensity',       "bitmap::out_intensity"),
+    ('color_value',     'Color(0.5, 0.25, 1)',         (0.5, 0.25, 1)),
+    ('acolor_value',    'AColor(0.5, 0.25, 1, 1)',     (0.5, 0.25, 1, 1)),
+    ('vector_value',    'Vector(1, 2, 3)',             (1, 2, 3)),
+    ('matrix_value',    'Matrix(Vector(1, 0, 0), Vector(0, 1, 0), Vector(0, 0, 1))',
+                        ((1, 0, 0), (0, 1, 0), (0, 0, 1))),
+    ('transform_value', 'Transform(Matrix(Vector(1, 0, 0), Vector(0, 1, 0), Vector(0, 0, 1)), Vector(1, 2, 3))',
+                        (((1, 0, 0), (0, 1, 0), (0, 0, 1)), (1, 2, 3))),
+    ('list_value',      'List(bitmap, uvw)',           ["bitmap", "uvw"]),
+    ('list_int_value',  'ListInt(1, 2, 3)',            [1, 2, 3]),
+    ('list_float_value','ListFloat(0.5, 1)',           [0.5, 1]),
+    ('transform_hex',   'TransformHex("%s")' % GetTransformHex(), GetTransformHex()),
+    ('matrix_hex',      'MatrixHex("%s")' % GetMatrixHex(),       GetMatrixHex()),
+)
+
+
+def WriteValuesScene(dirpath):
+    filepath = os.path.join(str(dirpath), "values.vrscene")
+    with open(filepath, 'w') as f:
+        f.write('TexValues values {\n')
+        for attrName, attrValue, value in ImporterValues:
+            f.write('  %s=%s;\n' % (attrName, attrValue))
+        f.write('}\n')
+    return filepath
+
+
+# Importer handles lists and tuples the same way
+#
+def GetComparable(value):
+    if type(value) in {list, tuple}:
+        return [GetComparable(v) for v in value]
+    return value
+
+
+def GetOldParserAttributes(filepath):
+    try:
+        from vb30.vray_tools.VRaySceneParser import ParseVrscene
+    except ImportError:
+        # Submodule is not checked out, use the known value shapes
+        return {attrName: value for attrName, attrValue, value in ImporterValues}
+    return {p['Name']: p for p in ParseVrscene(filepath)}['values']['Attributes']
+
+
+@pytest.mark.parametrize('lazySize', [VRaySceneStream.LazyValueSize, 1])
+def test_compare_with_vray_tools_parser(tmpdir, lazySize):
+    filepath = WriteValuesScene(tmpdir)
+
+    oldAttrs = GetOldParserAttributes(filepath)
+    newAttrs = {p['Name']: p for p in VRaySceneStream.IterVrscene(filepath, lazySize=lazySize)}['values']['Attributes']
+
+    assert sorted(newAttrs.keys()) == sorted(oldAttrs.keys())
+    for attrName in oldAttrs:
+        oldValue = GetComparable(oldAttrs[attrName])
+        newValue = GetComparable(newAttrs[attrName])
+        assert type(newValue) is type(oldValue), attrName
+        assert newValue == oldValue, attrName
@@ -0,0 +1,140 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+import os
+
+import benchmark
+
+from vb30.lib import VRayStream
+
+
+def GetMeshBlock(name, vertices):
+    return "\nGeomStaticMesh %s {\n\tvertices=ListVector(%s);\n\tfaces=ListInt(0,1,2);\n}\n" % (name, vertices)
+
+
+# Writes geometry plugins like _vray_for_blender module does
+#
+def ExportGeometry(dirpath, blocks, prefix=None, cacheSize=None):
+    fm = VRayStream.VRayExportFiles(benchmark.BenchmarkFilePaths(dirpath))
+    fm.setGeometryCacheDir(os.path.join(dirpath, "geometry_cache"))
+    fm.setGeometryCacheSize(cacheSize)
+    if prefix:
+        fm.setPrefix(prefix)
+    fm.init()
+
+    geometryFile = fm.getFileByPluginType('GEOMETRY')
+    for block in blocks:
+        geometryFile.write(block)
+
+    fm.writeIncludes()
+    fm.closeFiles()
+
+    with open(os.path.join(dirpath, "benchmark_geometry.vrscene"), 'r') as f:
+        return [line.strip() for line in f if line.startswith("#include")]
+
+
+def GetCacheFiles(dirpath):
+    cacheDir = os.path.join(dirpath, "geometry_cache")
+    return {filename : os.stat(os.path.join(cacheDir, filename)).st_ino for filename in os.listdir(cacheDir)}
+
+
+def test_geometry_cache_plugins(tmpdir):
+    dirpath = str(tmpdir)
+
+    blocks = [
+        GetMeshBlock("MECube", "Vector(0,0,0),Vector(1,0,0),Vector(0,1,0)"),
+        GetMeshBlock("MEPlane", "Vector(0,0,0),Vector(2,0,0),Vector(0,2,0)"),
+    ]
+
+    includes = ExportGeometry(dirpath, blocks)
+    cacheFiles = GetCacheFiles(dirpath)
+
+    # Every plugin is stored in its own file
+    assert len(includes) == 2
+    assert len(cacheFiles) == 2
+    for include in includes:
+        assert include.startswith('#include "geometry_cache%s' % os.sep)
+
+    cacheFilename = includes[0].split(os.sep)[1].rstrip('"')
+    with open(os.path.join(dirpath, "geometry_cache", cacheFilename), 'r') as f:
+        assert f.read() == blocks[0].lstrip()
+
+    # Geometry file doesn't contain plugin data
+    with open(os.path.join(dirpath, "benchmark_geometry.vrscene"), 'r') as f:
+        assert "GeomStaticMesh" not in f.read()
+
+    # Unchanged plugins are not written again
+    assert ExportGeometry(dirpath, blocks) == includes
+    assert GetCacheFiles(dirpath) == cacheFiles
+
+    # Only the changed plugin is stored
+    blocks[1] = GetMeshBlock("MEPlane", "Vector(0,0,0),Vector(3,0,0),Vector(0,3,0)")
+    newIncludes = ExportGeometry(dirpath, blocks)
+    newCacheFiles = GetCacheFiles(dirpath)
+
+    assert newIncludes[0] == includes[0]
+    assert newIncludes[1] != includes[1]
+    assert len(newCacheFiles) == 3
+    for filename in cacheFiles:
+        assert newCacheFiles[filename] == cacheFiles[filename]
+
+
+def test_geometry_cache_duplicates(tmpdir):
+    block = GetMeshBlock("MECube", "Vector(0,0,0),Vector(1,0,0),Vector(0,1,0)")
+
+    assert len(ExportGeometry(str(tmpdir), [block, block])) == 1
+
+
+def test_geometry_cache_prefix(tmpdir):
+    dirpath = str(tmpdir)
+
+    includes = ExportGeometry(dirpath, [GetMeshBlock("MECube", "Vector(0,0,0)")], prefix="/mnt/share")
+    assert includes[0].startswith('#include "%s' % os.path.join("/mnt/share", "geometry_cache", ""))
+
+    with open(os.path.join(dirpath, "benchmark_scene.vrscene"), 'r') as f:
+        assert '#include "%s"' % os.path.join("/mnt/share", "benchmark_geometry.vrscene") in f.read()
+
+
+def test_geometry_cache_eviction(tmpdir):
+    dirpath  = str(tmpdir)
+    cacheDir = os.path.join(dirpath, "geometry_cache")
+
+    os.makedirs(cacheDir)
+    for i in range(4):
+        filepath = os.path.join(cacheDir, "%i.vrscene" % i)
+        with open(filepath, 'w') as f:
+            f.write("x" * 100)
+        os.utime(filepath, (1000 + i, 1000 + i))
+
+    # Least recently used files are removed first,
+    # files used by the current export are kept
+    VRayStream.EvictGeometryCache(cacheDir, 250, keep={"0.vrscene"})
+    assert sorted(os.listdir(cacheDir)) == ["0.vrscene", "3.vrscene"]
+
+    # Export removes old files, but keeps its own
+    block = GetMeshBlock("MECube", "Vector(0,0,0)")
+    includes = ExportGeometry(dirpath, [block], cacheSize=len(block) + 100)
+    assert len(includes) == 1
+    assert len(os.listdir(cacheDir)) == 2
+    assert "0.vrscene" not in os.listdir(cacheDir)
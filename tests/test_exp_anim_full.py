@@ -0,0 +1,194 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import importlib
+import os
+import sys
+import types
+
+import bpy
+import mathutils
+import _vray_for_blender
+
+import benchmark
+
+from vb30 import exporting
+from vb30.lib import VRayStream
+
+
+# _vray_for_blender writes object nodes itself; here they are written
+# into the plugin stream, so the frame values are compared by the
+# Python keyframe cache like for any other plugin
+#
+def WriteNode(o, ob, frame):
+    o.set('OBJECT', 'Node', "OB%s" % ob.name)
+    o.writeHeader()
+    o.writeAttibute('position', ob.getPosition(frame))
+    o.writeFooter()
+
+
+class SceneObject(types.SimpleNamespace):
+    def as_pointer(self):
+        return id(self)
+
+
+def GetObject(name, getPosition, animated=False, parent=None):
+    return SceneObject(
+        name             = name,
+        type             = 'MESH',
+        data             = None,
+        animation_data   = types.SimpleNamespace(action="Action", drivers=[]) if animated else None,
+        vray             = None,
+        constraints      = [],
+        rigid_body       = None,
+        dupli_type       = 'NONE',
+        particle_systems = [],
+        modifiers        = [],
+        material_slots   = [],
+        parent           = parent,
+        getPosition      = getPosition,
+    )
+
+
+def GetScene():
+    moving = GetObject("Moving", lambda f: mathutils.Vector((f, 0.0, 0.0)), animated=True)
+
+    scene = types.SimpleNamespace(
+        frame_current = 1,
+        objects = [
+            GetObject("Static", lambda f: mathutils.Vector((1.0, 2.0, 3.0))),
+            moving,
+            # Follows the animated parent
+            GetObject("Child", lambda f: mathutils.Vector((f, 1.0, 0.0)), parent=moving),
+        ],
+        vray = types.SimpleNamespace(
+            VRayDR   = types.SimpleNamespace(on=False),
+            Exporter = types.SimpleNamespace(auto_meshes=False, export_animated_only=False),
+        ),
+    )
+    scene.frame_set = lambda f: setattr(scene, 'frame_current', f)
+
+    return scene
+
+
+def InstallExporter(monkeypatch, scene, o, calls):
+    objectsByPointer = {ob.as_pointer() : ob for ob in scene.objects}
+
+    def exportScene(exporter, exportNodes, exportGeometry):
+        calls.append('exportScene')
+        for ob in scene.objects:
+            WriteNode(o, ob, scene.frame_current)
+
+    def exportObject(obPointer, dataPointer, exporter):
+        calls.append('exportObject')
+        WriteNode(o, objectsByPointer[obPointer], scene.frame_current)
+
+    functions = {
+        'initAnimation'     : lambda *args: None,
+        'setFrame'          : lambda *args: None,
+        'setSkipObjects'    : lambda *args: None,
+        'setHideFromView'   : lambda *args: None,
+        'clearCache'        : lambda *args: None,
+        'exportObjectsPre'  : lambda *args: None,
+        'exportObjectsPost' : lambda *args: None,
+        'exportScene'       : exportScene,
+        'exportObject'      : exportObject,
+    }
+    for name, func in functions.items():
+        monkeypatch.setattr(_vray_for_blender, name, func, raising=False)
+
+    monkeypatch.setattr(bpy.data, 'as_pointer', lambda: 0, raising=False)
+
+
+# exp_scene and exp_camera import the plugin modules that need Blender,
+# so they are replaced with the object export part only
+#
+def ImportExpAnimFull(monkeypatch):
+    from vb30.exporting import exp_objects
+
+    exp_scene  = types.ModuleType('vb30.exporting.exp_scene')
+    exp_scene.ExportScene = lambda bus, exportNodes=True, exportMeshes=None: exp_objects.ExportObjects(bus, exportNodes, exportMeshes)
+
+    exp_camera = types.ModuleType('vb30.exporting.exp_camera')
+    exp_camera.ExportCamera = lambda bus: None
+
+    for module in (exp_scene, exp_camera):
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+        monkeypatch.setattr(exporting, module.__name__.rsplit('.', 1)[1], module, raising=False)
+
+    monkeypatch.delitem(sys.modules, 'vb30.exporting.exp_anim_full', raising=False)
+    return importlib.import_module('vb30.exporting.exp_anim_full')
+
+
+def ExportRange(monkeypatch, dirpath, animatedOnly):
+    exp_anim_full = ImportExpAnimFull(monkeypatch)
+
+    scene = GetScene()
+    scene.vray.Exporter.export_animated_only = animatedOnly
+
+    fm = VRayStream.VRayExportFiles(benchmark.BenchmarkFilePaths(dirpath))
+    fm.init()
+
+    o = VRayStream.VRayPluginExporter()
+    o.setFileManager(fm)
+    o.setAnimation(True)
+    o.setFrameStart(1)
+    o.setFrameEnd(5)
+    o.setFrameStep(1)
+
+    calls = []
+    InstallExporter(monkeypatch, scene, o, calls)
+
+    camera = types.SimpleNamespace(data=types.SimpleNamespace(vray=types.SimpleNamespace(hide_from_view=False)))
+
+    bus = {
+        'scene'       : scene,
+        'output'      : o,
+        'camera'      : camera,
+        'exporter'    : None,
+        'skipObjects' : set(),
+        'cache'       : {'plugins' : set()},
+    }
+
+    assert exp_anim_full.ExportFullRange(bus) is None
+    o.done()
+
+    with open(os.path.join(dirpath, "benchmark_nodes.vrscene"), 'r') as f:
+        return "".join(line for line in f if not line.startswith("//")), calls
+
+
+def test_animated_only_matches_full_export(tmpdir, monkeypatch):
+    os.makedirs(str(tmpdir.join("full")))
+    os.makedirs(str(tmpdir.join("animated")))
+
+    full, fullCalls = ExportRange(monkeypatch, str(tmpdir.join("full")), False)
+    animated, animatedCalls = ExportRange(monkeypatch, str(tmpdir.join("animated")), True)
+
+    assert "OBStatic" in full and "OBChild" in full
+    assert animated == full
+
+    # Rest of the frames export only "Moving" and "Child" objects
+    assert fullCalls == ['exportScene'] * 5
+    assert animatedCalls == ['exportScene'] + ['exportObject'] * 8
@@ -0,0 +1,119 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import types
+
+from vb30.lib import VRayProcess
+from vb30.exporting import exp_bake
+
+
+Jobs = [
+    {'name' : "Cube",   'bake_node' : "OBCube",   'uv_channel' : 1, 'img_file' : "/tmp/bake/Cube.exr"},
+    {'name' : "Sphere", 'bake_node' : "OBSphere", 'uv_channel' : 0, 'img_file' : "/tmp/bake/Sphere.exr"},
+]
+
+
+def test_job_overrides():
+    p = VRayProcess.VRayProcess()
+    p.setVRayStandalone("vray")
+    p.setSceneFile("/tmp/scene.vrscene")
+
+    exp_bake.SetBakeJobOverrides(p, Jobs[0])
+
+    cmd = [arg.replace('"', '') for arg in p.getCommandLine()]
+
+    assert "-parameterOverride=UVWbakeView::uvw_channel=1" in cmd
+    assert "-parameterOverride=BakeView::bake_node=OBCube" in cmd
+    assert "-imgFile=/tmp/bake/Cube.exr" in cmd
+
+    # Shared scene is rendered as is
+    assert cmd[-1] == "-sceneFile=/tmp/scene.vrscene"
+
+
+# Finishes as soon as it's started with the exit code set by the test
+#
+class StubProcess:
+    def __init__(self, job, exitCode):
+        self.job      = job
+        self.exitCode = exitCode
+        self.started  = False
+
+    def setWaitExit(self, waitExit):
+        pass
+
+    def run(self):
+        self.started = True
+
+    def processEvents(self):
+        pass
+
+    def is_running(self):
+        return False
+
+    def getExitCode(self):
+        return self.exitCode
+
+    def kill(self):
+        pass
+
+
+def GetBus(processes):
+    engine = types.SimpleNamespace(
+        update_stats    = lambda *args: None,
+        update_progress = lambda *args: None,
+        test_break      = lambda: False,
+    )
+    scene = types.SimpleNamespace(vray=types.SimpleNamespace(BatchBake=types.SimpleNamespace(processes=processes)))
+    fileManager = types.SimpleNamespace(getOutputFilepath=lambda: "/tmp/scene.vrscene")
+
+    return {
+        'scene'  : scene,
+        'engine' : engine,
+        'output' : types.SimpleNamespace(fileManager=fileManager),
+    }
+
+
+def test_failed_job(monkeypatch):
+    exitCodes = {"Cube" : 1, "Sphere" : 0}
+    processes = []
+
+    def GetBakeProcess(bus, sceneFilepath, job, numProcesses):
+        p = StubProcess(job, exitCodes[job['name']])
+        processes.append(p)
+        return p
+
+    monkeypatch.setattr(exp_bake, 'GetBakeProcess', GetBakeProcess)
+
+    assert exp_bake.RunBakeJobs(GetBus(1), Jobs) == "V-Ray failed: Cube (exit code 1)"
+
+    # Other jobs are not started after a failure
+    assert [p.job['name'] for p in processes] == ["Cube"]
+
+    exitCodes["Cube"] = 0
+    processes.clear()
+
+    assert exp_bake.RunBakeJobs(GetBus(2), Jobs) is None
+    assert all(p.started for p in processes)
+    assert len(processes) == 2
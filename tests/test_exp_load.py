@@ -0,0 +1,105 @@
+#
+# V-Ray For Blender
+#
+# http://chaosgroup.com
+#
+# Author: Andrei Izrantcev
+# E-Mail: andrei.izrantcev@chaosgroup.com
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# All Rights Reserved. V-Ray(R) is a registered trademark of Chaos Software.
+#
+
+
+import os
+import types
+
+from vb30.exporting import exp_load
+
+
+def GetScene(**renderSettings):
+    render = types.SimpleNamespace(
+        resolution_x          = 1920,
+        resolution_y          = 1080,
+        resolution_percentage = 50,
+        use_border            = False,
+        use_crop_to_border    = False,
+        border_min_x          = 0.0,
+        border_min_y          = 0.0,
+        border_max_x          = 1.0,
+        border_max_y          = 1.0,
+    )
+    for attrName, attrValue in renderSettings.items():
+        setattr(render, attrName, attrValue)
+    return types.SimpleNamespace(render=render)
+
+
+def test_result_region():
+    assert exp_load.GetResultRegion(GetScene()) == (960, 540, 0, 0)
+
+    # Border settings are ignored without 'use_border'
+    assert exp_load.GetResultRegion(GetScene(border_min_x=0.5)) == (960, 540, 0, 0)
+
+    border = {
+        'use_border'   : True,
+        'border_min_x' : 0.25,
+        'border_min_y' : 0.1,
+        'border_max_x' : 0.75,
+        'border_max_y' : 0.6,
+    }
+
+    # Offset is the same with and without crop, it's used
+    # only if the image is larger than the result
+    assert exp_load.GetResultRegion(GetScene(**border)) == (480, 270, 240, 54)
+    assert exp_load.GetResultRegion(GetScene(use_crop_to_border=True, **border)) == (480, 270, 240, 54)
+
+
+def SetImage(filepath, data, mtime):
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    os.utime(filepath, ns=(mtime, mtime))
+
+
+def test_image_watcher(tmpdir):
+    filepath = os.path.join(str(tmpdir), "render.exr")
+
+    watcher = exp_load.ImageWatcher(filepath)
+
+    # No file yet
+    assert not watcher.isReady()
+
+    # File has to be unchanged between two checks
+    SetImage(filepath, b"1", 1000)
+    assert not watcher.isReady()
+    assert watcher.isReady()
+
+    # Loaded image is not loaded again
+    watcher.setLoaded()
+    assert not watcher.isReady()
+
+    # Modified file is loaded when it's stable again
+    SetImage(filepath, b"12", 2000)
+    assert not watcher.isReady()
+    assert watcher.isReady()
+
+    # Same size, new modification time
+    SetImage(filepath, b"21", 3000)
+    assert not watcher.isReady()
+    assert watcher.isReady()
+
+    # File is removed while V-Ray writes it
+    os.remove(filepath)
+    assert not watcher.isReady()
+    assert not watcher.isReady()
@@ -25,6 +25,7 @@
 from vb30 import proxy as ProxyUtils
 from vb30.lib import BlenderUtils
 from vb30.nodes import tools as NodesTools
+from vb30.nodes import nodes as NodesNodes
 
 import os
 
@@ -220,6 +221,9 @@ class VRayOpAddObjectPlane(bpy.types.Operator):
 
         outputNode = nt.nodes.new('VRayNodeObjectOutput')
 
+        # Could be not registered yet in lazy mode
+        NodesNodes.EnsureNodeTypes(('VRayNodeGeomPlane',))
+
         planeGeometry   = nt.nodes.new('VRayNodeGeomPlane')
         blenderMaterial = nt.nodes.new('VRayNodeBlenderOutputMaterial')
 
@@ -225,6 +225,11 @@ class VRAY_RP_output(classes.VRayRenderPanel):
 		isStdExporter = bpy.context.scene.render.engine != 'VRAY_RENDER_RT' or VRayExporter.backend == 'STD'
 		if VRayExporter.animation_mode == 'NONE' and isStdExporter:
 			col.prop(VRayExporter, 'image_to_blender')
+			if VRayExporter.image_to_blender:
+				col.prop(VRayExporter, 'image_to_blender_progressive')
+				if VRayExporter.image_to_blender_progressive:
+					col.prop(VRayExporter, 'image_to_blender_interval')
+					col.prop(VRayExporter, 'image_to_blender_watch_file')
 
 
 ########  ######## ##    ## ########  ######## ########
@@ -256,10 +261,32 @@ class VRAY_RP_render(classes.VRayRenderPanel):
 			row.prop(rd, "use_lock_interface", text="")
 
 		layout.prop(VRayExporter, 'animation_mode', text="Animation")
+		if VRayExporter.animation_mode == 'FRAMEBYFRAME':
+			row = layout.row(align=True)
+			row.prop(VRayExporter, 'frame_by_frame_pipeline')
+			sub = row.row()
+			sub.active = VRayExporter.frame_by_frame_pipeline
+			sub.prop(VRayExporter, 'frame_by_frame_processes', text="Processes")
+		elif VRayExporter.animation_mode == 'CAMERA_LOOP':
+			layout.prop(VRayExporter, 'camera_loop_visibility_diff')
+		if VRayExporter.animation_mode not in {'NONE'}:
+			row = layout.row(align=True)
+			row.prop(VRayExporter, 'use_keyframe_reduction')
+			if VRayExporter.use_keyframe_reduction:
+				row.prop(VRayExporter, 'keyframe_reduction_epsilon', text="Tolerance")
+			else:
+				row.prop(VRayExporter, 'keyframe_tolerance', text="Tolerance")
+		if VRayExporter.animation_mode in {'NONE', 'FULL', 'FRAMEBYFRAME'}:
+			# Also used for the motion blur frames
+			layout.prop(VRayExporter, 'export_animated_only')
 		layout.separator()
 
 		if VRayExporter.useSeparateFiles:
-			layout.prop(VRayExporter, 'auto_meshes', text="Re-Export Meshes")
+			row = layout.row()
+			row.prop(VRayExporter, 'auto_meshes', text="Re-Export Meshes")
+			row.prop(VRayExporter, 'use_geometry_cache')
+			if VRayExporter.use_geometry_cache:
+				row.prop(VRayExporter, 'geometry_cache_size')
 
 		split= layout.split()
 		col= split.column()
@@ -619,6 +646,10 @@ class VRAY_RP_exporter(classes.VRayRenderPanel):
 		if wide_ui:
 			col = split.column()
 		col.prop(VRayExporter, 'gen_run_file')
+		col.prop(VRayExporter, 'export_profile')
+		col.prop(VRayExporter, 'capture_output')
+		if VRayExporter.capture_output:
+			col.prop(VRayExporter, 'render_log')
 
 		if sys.platform == "linux":
 			split = layout.split()
@@ -1245,6 +1276,7 @@ class VRAY_RP_dr(classes.VRayRenderPanel):
 			layout.prop(VRayDR, 'shared_dir')
 			if VRayDR.networkType == 'WW':
 				layout.prop(VRayDR, 'share_name')
+			layout.prop(VRayDR, 'asset_sync_threads')
 			layout.separator()
 
 		elif VRayDR.assetSharing == 'TRANSFER':
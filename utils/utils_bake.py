@@ -25,7 +25,8 @@
 import bpy
 
 from vb30.ui import classes
-from vb30.lib import LibUtils
+from vb30.lib import LibUtils, BlenderUtils
+from vb30.exporting import exp_bake
 from vb30 import debug
 
 
@@ -172,6 +173,14 @@ class VRayPropGroupMultiBake(bpy.types.PropertyGroup):
         max     = 100
     )
 
+    processes = bpy.props.IntProperty(
+        name        = "Processes",
+        description = "Number of V-Ray processes baking simultaneously",
+        min         = 1,
+        max         = 64,
+        default     = 2
+    )
+
 
 class VRayOpBatchBakeAddItems(bpy.types.Operator):
     bl_idname      = 'vray.batch_bake_add_selection'
@@ -266,6 +275,7 @@ class VRayPanelBake(classes.VRayRenderPanel):
         layout.separator()
         layout.prop(BatchBake, 'output_dirpath')
         layout.prop(BatchBake, 'output_filename')
+        layout.prop(BatchBake, 'processes')
 
 
 def RestoreSettings(scene):
@@ -331,15 +341,14 @@ class VRayOpBatchBake(bpy.types.Operator):
         if numObjects:
             VRayScene.Exporter.auto_save_render = True
 
-            # We have to wait for render end
-            # only if baking multiple objects
-            if numObjects > 1:
-                VRayScene.Exporter.wait = True
-                VRayScene.Exporter.autoclose = True
+            # Multiple objects are baked from a single export,
+            # every object is a job for the V-Ray process pool
+            bakeJobs = []
 
             try:
                 for ob in obList:
-                    debug.PrintInfo("Baking: %s..." % ob.name)
+                    if numObjects == 1:
+                        debug.PrintInfo("Baking: %s..." % ob.name)
                     VRayScene.Exporter.currentBakeObject = ob
 
                     # UV channel to use for baking
@@ -402,18 +411,42 @@ class VRayOpBatchBake(bpy.types.Operator):
                         debug.PrintError("UV Map is not found!")
                         continue
 
+                    # Setup vars
+                    formatDict['$O'] = ("Object Name", LibUtils.CleanString(ob.name, stripSigns=False))
+
+                    imgFile = LibUtils.FormatName(BatchBake.output_filename, formatDict)
+                    imgDir  = LibUtils.FormatName(BatchBake.output_dirpath,  formatDict)
+
+                    if numObjects > 1:
+                        bakeJobs.append({
+                            'name'       : ob.name,
+                            'bake_node'  : BlenderUtils.GetObjectName(ob),
+                            'uv_channel' : uv_channel,
+                            'img_file'   : exp_bake.GetBakeOutputFilepath(context.scene, imgDir, imgFile),
+                        })
+
+                        if len(bakeJobs) > 1:
+                            continue
+
                     # Bake settings
                     VRayScene.BakeView.bake_node  = ob.name
                     VRayScene.BakeView.uv_channel = uv_channel
 
-                    # Setup vars
-                    formatDict['$O'] = ("Object Name", LibUtils.CleanString(ob.name, stripSigns=False))
-
                     # Render
-                    VRayScene.SettingsOutput.img_file = LibUtils.FormatName(BatchBake.output_filename, formatDict)
-                    VRayScene.SettingsOutput.img_dir  = LibUtils.FormatName(BatchBake.output_dirpath,  formatDict)
-
-                    bpy.ops.render.render()
+                    VRayScene.SettingsOutput.img_file = imgFile
+                    VRayScene.SettingsOutput.img_dir  = imgDir
+
+                    if numObjects == 1:
+                        bpy.ops.render.render()
+
+                # Shared scene is exported with the first object
+                # set to BakeView, others are overridden per job
+                if bakeJobs:
+                    exp_bake.SetBakeJobs(bakeJobs)
+                    try:
+                        bpy.ops.render.render()
+                    finally:
+                        exp_bake.SetBakeJobs(None)
 
             except Exception as e:
                 debug.PrintError("Erorr baking objects!")